@@ -0,0 +1,121 @@
+"""
+Fleet Engine Benchmark for Wearable Biosignal Analysis System
+Measures the time per tick of N devices through one vectorized
+FleetEngine against N separate single-device pipelines, for the layer
+math alone and for the full responses
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from models.schemas import BiosignalData
+from services.fleet import FleetEngine
+
+
+def device_samples(devices: int, ticks: int, seed: int = 0) -> List[List[BiosignalData]]:
+    """``ticks`` rows of one simulated sample per device"""
+    rng = np.random.default_rng(seed)
+    heart_rate = np.clip(72 + np.cumsum(rng.normal(0, 2, (ticks, devices)), axis=0), 40, 180)
+    spo2 = rng.uniform(90, 100, (ticks, devices))
+    temperature = rng.normal(36.8, 0.6, (ticks, devices))
+    activity = rng.uniform(0, 150, (ticks, devices))
+    return [
+        [
+            BiosignalData(
+                heart_rate=round(float(heart_rate[t, d]), 1), spo2=round(float(spo2[t, d]), 1),
+                temperature=round(float(temperature[t, d]), 2), activity=round(float(activity[t, d]), 1)
+            )
+            for d in range(devices)
+        ]
+        for t in range(ticks)
+    ]
+
+
+def layer_math(engine: FleetEngine, device_ids: List[str], samples: List[BiosignalData], timestamp: datetime):
+    """Everything step() does except building the per-device responses"""
+    raw = np.array([(s.heart_rate, s.spo2, s.temperature, s.activity) for s in samples])
+    rows = np.array([engine.slot(device_id) for device_id in device_ids], dtype=np.intp)
+    clarity = engine.clarity.process(rows, raw)
+    ifrs = engine.ifrs.process(rows, clarity['processed_data'])
+    timesystems = engine.timesystems.process(
+        rows, ifrs['enhanced_data'], timestamp, np.ones(len(rows), dtype=bool)
+    )
+    features = engine.lia_engine.features(raw, clarity, ifrs, timesystems)
+    engine.lia_engine.analyze(features, [frozenset()] * len(rows))
+
+
+def time_ticks(ticks: List[List[BiosignalData]], warmup: int, run_tick: Callable) -> float:
+    """Mean milliseconds per tick after ``warmup`` ticks"""
+    start = datetime(2026, 1, 1, 12)
+    elapsed = 0.0
+    for t, samples in enumerate(ticks):
+        timestamp = start + timedelta(seconds=t / 10)
+        t0 = time.perf_counter()
+        run_tick(samples, timestamp)
+        if t >= warmup:
+            elapsed += time.perf_counter() - t0
+    return elapsed / (len(ticks) - warmup) * 1000
+
+
+def measure(devices: int, ticks: int, warmup: int) -> Dict[str, float]:
+    """
+    ms per tick of ``devices`` devices, fleet vs one engine per device
+
+    A single-row engine is what a DevicePipeline created on its own uses,
+    so the per-device columns are the cost of processing devices one by one.
+    """
+    device_ids = [f"BENCH_{i:04d}" for i in range(devices)]
+    samples = device_samples(devices, ticks + warmup)
+    skips = [frozenset()] * devices
+
+    fleet = FleetEngine(capacity=devices)
+    singles = [FleetEngine(capacity=1) for _ in device_ids]
+    fleet_math = time_ticks(samples, warmup, lambda tick, ts: layer_math(fleet, device_ids, tick, ts))
+    single_math = time_ticks(samples, warmup, lambda tick, ts: [
+        layer_math(engine, [device_id], [sample], ts)
+        for engine, device_id, sample in zip(singles, device_ids, tick)
+    ])
+
+    fleet = FleetEngine(capacity=devices)
+    singles = [FleetEngine(capacity=1) for _ in device_ids]
+    fleet_step = time_ticks(samples, warmup, lambda tick, ts: fleet.step(device_ids, tick, skips, ts))
+    single_step = time_ticks(samples, warmup, lambda tick, ts: [
+        engine.step([device_id], [sample], skips[:1], ts)
+        for engine, device_id, sample in zip(singles, device_ids, tick)
+    ])
+
+    return {
+        "fleet_math": fleet_math, "single_math": single_math,
+        "fleet_step": fleet_step, "single_step": single_step
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tick time of the vectorized fleet engine")
+    parser.add_argument("--devices", default="1,10,100,500", help="Device counts to compare")
+    parser.add_argument("--ticks", type=int, default=50, help="Measured ticks per device count")
+    parser.add_argument("--warmup", type=int, default=60, help="Ticks before measuring (fills the windows)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("  ms per tick: one FleetEngine vs one single-row engine per device")
+    print("=" * 80)
+    print(
+        f"{'devices':>8} {'fleet math':>12} {'per-device math':>16} "
+        f"{'fleet step':>12} {'per-device step':>16}"
+    )
+
+    for devices in map(int, args.devices.split(",")):
+        stats = measure(devices, args.ticks, args.warmup)
+        print(
+            f"{devices:>8} {stats['fleet_math']:>12.2f} {stats['single_math']:>16.2f} "
+            f"{stats['fleet_step']:>12.2f} {stats['single_step']:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Latency Benchmark for Wearable Biosignal Analysis System
+Measures /api/v1/health latency while many devices stream over WebSocket,
+once per pipeline executor mode, to show how much pipeline CPU work
+delays the event loop
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+import websockets
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0):
+    """Poll the health endpoint until the server answers"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"{base_url}/api/v1/health")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start in time")
+
+
+async def stream_device(ws_url: str, device_id: str, stop: asyncio.Event, frames: Dict[str, int]):
+    """Keep a WebSocket stream open for one device and count frames"""
+    async with websockets.connect(f"{ws_url}/ws/stream?device_id={device_id}", max_size=None) as ws:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(ws.recv(), timeout=1.0)
+                frames[device_id] = frames.get(device_id, 0) + 1
+            except asyncio.TimeoutError:
+                continue
+
+
+async def measure(port: int, devices: int, requests: int, warmup: float) -> Dict[str, float]:
+    """Stream ``devices`` devices and time ``requests`` health checks"""
+    base_url = f"http://127.0.0.1:{port}"
+    ws_url = f"ws://127.0.0.1:{port}"
+    await wait_until_ready(base_url)
+
+    stop = asyncio.Event()
+    frames: Dict[str, int] = {}
+    streams = [
+        asyncio.create_task(stream_device(ws_url, f"BENCH_{i:04d}", stop, frames))
+        for i in range(devices)
+    ]
+    await asyncio.sleep(warmup)
+
+    latencies: List[float] = []
+    started = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            await client.get(f"{base_url}/api/v1/health")
+            latencies.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0.01)
+    elapsed = time.monotonic() - started
+
+    stop.set()
+    await asyncio.gather(*streams, return_exceptions=True)
+
+    latencies = np.array(latencies)
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max()),
+        "frames_per_s": sum(frames.values()) / (elapsed + warmup)
+    }
+
+
+def run_mode(mode: str, workers: int, devices: int, requests: int, warmup: float) -> Dict[str, float]:
+    """Start a server with an executor mode, benchmark it and stop it"""
+    port = free_port()
+    env = dict(os.environ, PIPELINE_EXECUTOR_MODE=mode)
+    if workers:
+        env["PIPELINE_EXECUTOR_WORKERS"] = str(workers)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        return asyncio.run(measure(port, devices, requests, warmup))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Health check latency under streaming load")
+    parser.add_argument("--modes", default="inline,thread,process", help="Executor modes to compare")
+    parser.add_argument("--workers", type=int, default=0, help="Executor workers (0 = CPU count)")
+    parser.add_argument("--devices", type=int, default=50, help="Concurrently streamed devices")
+    parser.add_argument("--requests", type=int, default=300, help="Health checks per mode")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds of streaming before measuring")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"  /api/v1/health latency with {args.devices} streaming devices")
+    print("=" * 80)
+    print(f"{'mode':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10} {'frames/s':>10}")
+
+    for mode in args.modes.split(","):
+        stats = run_mode(mode, args.workers, args.devices, args.requests, args.warmup)
+        print(
+            f"{mode:<10} {stats['p50']:>10.2f} {stats['p99']:>10.2f} "
+            f"{stats['max']:>10.2f} {stats['frames_per_s']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,17 @@ Integrates LIA (Lifestyle Intelligence Analysis) with proprietary Reconnect laye
 - Clarity™: Signal quality and noise reduction
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+import os
+import zlib
 import uvicorn
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 
 from models.schemas import (
     ConnectionRequest, ConnectionResponse,
@@ -27,50 +30,121 @@ from models.schemas import (
     PatternType, CircadianPhase, RhythmClassification
 )
 from services.ble_simulator import BLESimulator
-from services.timesystems import TimesystemsLayer
-from services.ifrs import iFRSLayer
-from services.clarity import ClarityLayer
-from services.lia_integration import LIAEngine
+from services.broadcaster import StreamBroadcaster
+from services.executor import PipelineExecutor
+from services.inference import MicroBatcher, load_backend
+from services.pipeline import DevicePipeline, PipelineRegistry, with_processing_notes
 from services.session_manager import SessionManager
+from services.stream_runner import StreamRunner
 from utils.logger import setup_logger, get_processing_logger
+from utils.delta import DeltaCursor
+from utils.projection import FieldSelection, parse_fields
+from utils.serialization import negotiate_encoder
 
 # Setup logging
 logger = setup_logger(__name__)
 processing_logger = get_processing_logger()
 
+# Per-device pipeline settings
+PIPELINE_IDLE_TIMEOUT_SECONDS = 300
+PIPELINE_EVICTION_INTERVAL_SECONDS = 30
+PIPELINE_MAX_DEVICES = 10000
+
+# Streaming settings
+STREAM_SUBSCRIBER_QUEUE_SIZE = 8
+STREAM_SAMPLE_QUEUE_SIZE = 256
+STREAM_FIRST_RESULT_TIMEOUT_SECONDS = 1.0
+STREAM_DELTA_KEYFRAME_INTERVAL = 50
+
+# How long a REST reader's field selection keeps optional outputs computed
+STREAM_FIELD_DEMAND_TTL_SECONDS = 10.0
+
+# Fields the /predict view is built from
+PREDICTION_FIELDS = parse_fields(
+    "raw_signals,clarity_layer.quality_assessment,lia_insights.condition,"
+    "lia_insights.confidence,lia_insights.wellness_score,"
+    "lia_insights.probabilities,lia_insights.recommendation",
+    StreamDataResponse
+)
+
+# Where pipeline CPU work runs: 'inline', 'thread' or 'process'
+PIPELINE_EXECUTOR_MODE = os.environ.get("PIPELINE_EXECUTOR_MODE", "thread")
+PIPELINE_EXECUTOR_WORKERS = int(os.environ.get("PIPELINE_EXECUTOR_WORKERS", "0")) or None
+
+# Index of this shard, set by run_sharded.py (None when not sharded)
+SHARD_INDEX = int(os.environ["SHARD_INDEX"]) if "SHARD_INDEX" in os.environ else None
+
+# Model behind the LIA condition: 'rules', 'sklearn' or 'onnx' (unset: decision tables only)
+LIA_MODEL_BACKEND = os.environ.get("LIA_MODEL_BACKEND", "")
+LIA_MODEL_PATH = os.environ.get("LIA_MODEL_PATH")
+LIA_BATCH_MAX_ROWS = int(os.environ.get("LIA_BATCH_MAX_ROWS", "256"))
+LIA_BATCH_MAX_DELAY_MS = float(os.environ.get("LIA_BATCH_MAX_DELAY_MS", "20"))
+
 # Global services
 ble_simulator = None
-timesystems = None
-ifrs = None
-clarity = None
-lia_engine = None
+pipeline_registry = None
+stream_broadcaster = None
+stream_runner = None
+inference = None
 session_manager = None
 connected_clients = []
 
 
+async def evict_idle_pipelines():
+    """Background task that drops pipelines of devices that went quiet"""
+    while True:
+        await asyncio.sleep(PIPELINE_EVICTION_INTERVAL_SECONDS)
+        evicted = pipeline_registry.evict_idle()
+        for device_id in evicted:
+            await stream_runner.stop(device_id)
+        if evicted:
+            logger.info(f"🧹 Evicted {len(evicted)} idle device pipeline(s)")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown"""
-    global ble_simulator, timesystems, ifrs, clarity, lia_engine, session_manager
+    global ble_simulator, pipeline_registry, stream_broadcaster, stream_runner, inference, session_manager
 
     logger.info("🚀 Starting Wearable Biosignal Analysis Backend...")
 
     # Initialize services
     ble_simulator = BLESimulator()
-    timesystems = TimesystemsLayer()
-    ifrs = iFRSLayer()
-    clarity = ClarityLayer()
-    lia_engine = LIAEngine()
+    pipeline_registry = PipelineRegistry(
+        idle_timeout=PIPELINE_IDLE_TIMEOUT_SECONDS,
+        max_devices=PIPELINE_MAX_DEVICES
+    )
+    stream_broadcaster = StreamBroadcaster(queue_size=STREAM_SUBSCRIBER_QUEUE_SIZE)
+    inference = None
+    if LIA_MODEL_BACKEND:
+        inference = MicroBatcher(
+            load_backend(LIA_MODEL_BACKEND, LIA_MODEL_PATH),
+            max_batch_size=LIA_BATCH_MAX_ROWS,
+            max_delay=LIA_BATCH_MAX_DELAY_MS / 1000
+        )
+    executor = PipelineExecutor(PIPELINE_EXECUTOR_MODE, PIPELINE_EXECUTOR_WORKERS, inference)
+    stream_runner = StreamRunner(
+        ble_simulator, pipeline_registry, stream_broadcaster, executor,
+        queue_size=STREAM_SAMPLE_QUEUE_SIZE
+    )
     session_manager = SessionManager()
 
-    # Start BLE simulator
+    # Start pipeline workers and BLE simulator
+    await executor.start()
     await ble_simulator.start()
+    eviction_task = asyncio.create_task(evict_idle_pipelines())
     logger.info("✓ BLE Simulator started")
-    logger.info("✓ Timesystems™ layer initialized")
-    logger.info("✓ iFRS™ layer initialized")
-    logger.info("✓ Clarity™ layer initialized")
-    logger.info("✓ LIA Engine initialized")
+    logger.info("✓ Device pipeline registry initialized (Clarity™ → iFRS™ → Timesystems™ → LIA)")
+    logger.info("✓ Stream runner initialized (event-driven, one pipeline run per sample)")
+    logger.info(f"✓ Pipeline executor: {executor.mode} ({executor.workers} workers)")
+    if inference is not None:
+        logger.info(
+            f"✓ LIA model inference: {inference.backend.name} "
+            f"(batches of up to {inference.max_batch_size} rows / {LIA_BATCH_MAX_DELAY_MS:g} ms)"
+        )
     logger.info("✓ Session Manager initialized")
+    if SHARD_INDEX is not None:
+        logger.info(f"✓ Serving shard {SHARD_INDEX}")
     logger.info("=" * 80)
     logger.info("Backend ready to accept connections on http://localhost:8000")
     logger.info("=" * 80)
@@ -79,6 +153,8 @@ async def lifespan(app: FastAPI):
 
     # Cleanup
     logger.info("Shutting down services...")
+    eviction_task.cancel()
+    await stream_runner.close()
     await ble_simulator.stop()
     logger.info("Backend shutdown complete")
 
@@ -105,6 +181,11 @@ app.add_middleware(
 # HELPER FUNCTIONS
 # ============================================================================
 
+def resolve_device_id(device_id: Optional[str]) -> str:
+    """Fall back to the simulated wearable when no device is given"""
+    return device_id or ble_simulator.device_id
+
+
 def generate_mockup_prediction_data() -> PredictionResponse:
     """Generate mockup prediction data for fallback/error scenarios"""
     return PredictionResponse(
@@ -296,13 +377,12 @@ async def health_check():
         timestamp=datetime.now(),
         services={
             "ble_simulator": ble_simulator.is_running if ble_simulator else False,
-            "timesystems": timesystems is not None,
-            "ifrs": ifrs is not None,
-            "clarity": clarity is not None,
-            "lia": lia_engine is not None
+            "pipeline_registry": pipeline_registry is not None
         },
         connected_clients=len(connected_clients),
-        active_sessions=session_manager.get_active_session_count() if session_manager else 0
+        active_sessions=session_manager.get_active_session_count() if session_manager else 0,
+        shard=SHARD_INDEX,
+        inference=inference.stats() if inference else None
     )
 
 
@@ -324,6 +404,9 @@ async def connect_device(request: ConnectionRequest):
         }
         connected_clients.append(client_info)
 
+        # Create the device's processing pipeline up front
+        stream_runner.start(request.device_id)
+
         # Get device status from BLE simulator
         device_status = await ble_simulator.get_device_status()
 
@@ -348,62 +431,108 @@ async def connect_device(request: ConnectionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def get_latest_result(
+    device_id: Optional[str], fields: Optional[FieldSelection] = None
+) -> Tuple[DevicePipeline, StreamDataResponse]:
+    """
+    Latest cached pipeline result for a device (never processes a sample)
+
+    Samples are processed by the device's stream runner as they arrive.
+    The request's fields are registered as demand so the runner keeps
+    computing them; only the first request for a new device, or for
+    fields the cached result skipped, waits briefly for a result.
+    """
+    pipeline = stream_runner.start(resolve_device_id(device_id))
+    pipeline.demand(fields, STREAM_FIELD_DEMAND_TTL_SECONDS)
+    result = await pipeline.wait_for_result(STREAM_FIRST_RESULT_TIMEOUT_SECONDS, fields)
+    if result is None:
+        raise RuntimeError("No processed sample available yet")
+    return pipeline, result
+
+
+def representation_variant(notes: bool, fields: Optional[FieldSelection]) -> str:
+    """ETag suffix identifying how a cached result is rendered"""
+    parts = []
+    if notes:
+        parts.append("notes")
+    if fields is not None:
+        parts.append(f"{zlib.crc32(fields.key.encode()):08x}")
+    return "-".join(parts)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def build_prediction(stream_data: StreamDataResponse) -> PredictionResponse:
+    """Extract the prediction view from a processed stream result"""
+    lia = stream_data.lia_insights
+
+    return PredictionResponse(
+        timestamp=stream_data.timestamp,
+        condition=lia.condition,
+        confidence=lia.confidence,
+        wellness_score=lia.wellness_score,
+        probabilities=lia.probabilities,
+        signal_quality=stream_data.clarity_layer.quality_assessment,
+        recommendation=lia.recommendation,
+        metrics={
+            "heart_rate": stream_data.raw_signals.heart_rate,
+            "spo2": stream_data.raw_signals.spo2,
+            "temperature": stream_data.raw_signals.temperature,
+            "activity": stream_data.raw_signals.activity
+        }
+    )
+
+
 @app.get("/api/v1/stream", tags=["Data"], response_model=StreamDataResponse)
-async def get_stream_data():
+async def get_stream_data(
+    response: Response,
+    device_id: Optional[str] = Query(None, description="Device to stream"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated field paths, e.g. raw_signals,lia_insights.condition"
+    ),
+    notes: bool = Query(False, description="Include the layers' processing notes"),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get current biosignal data stream
-    Returns processed data through all three proprietary layers
+    Returns the latest sample processed through all three proprietary layers
+    ?fields= returns only the selected fields (plus timestamp); optional
+    layer outputs nobody selects are not computed at all
+    Processing notes are only rendered when asked for (?notes=true or a
+    selected processing_notes field)
+    Supports ETag/If-None-Match: 304 when no new sample has been processed
     Falls back to mockup data if errors occur
     """
     try:
-        # Get raw data from BLE simulator
-        raw_data = await ble_simulator.get_current_data()
-
-        # Process through Clarity™ layer (signal quality & noise reduction)
-        clarity_result = clarity.process(raw_data)
-        processing_logger.info(
-            f"CLARITY_LAYER | quality={clarity_result['quality_score']:.2f} | "
-            f"snr={clarity_result['signal_to_noise_ratio']:.1f}dB | "
-            f"noise_reduced={clarity_result['noise_reduction_applied']}"
-        )
+        selection = parse_fields(fields, StreamDataResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    notes = notes or (selection is not None and selection.requests("processing_notes"))
 
-        # Process through iFRS™ layer (frequency analysis)
-        ifrs_result = ifrs.process(clarity_result['processed_data'])
-        processing_logger.info(
-            f"IFRS_LAYER | dominant_freq={ifrs_result['dominant_frequency']:.2f}Hz | "
-            f"heart_rate_variability={ifrs_result['hrv_features'].hrv_score:.1f} | "
-            f"rhythm={ifrs_result['rhythm_classification']}"
-        )
+    try:
+        pipeline, result = await get_latest_result(device_id, selection)
 
-        # Process through Timesystems™ layer (temporal analysis)
-        timesystems_result = timesystems.process(ifrs_result['enhanced_data'])
-        processing_logger.info(
-            f"TIMESYSTEMS_LAYER | pattern={timesystems_result['pattern_type']} | "
-            f"circadian_phase={timesystems_result['circadian_phase']} | "
-            f"temporal_consistency={timesystems_result['temporal_consistency']:.2f}"
-        )
+        etag = pipeline.variant_etag(representation_variant(notes, selection))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
-        # Generate LIA insights
-        lia_insights = lia_engine.analyze(
-            raw_data=raw_data,
-            clarity_result=clarity_result,
-            ifrs_result=ifrs_result,
-            timesystems_result=timesystems_result
-        )
-        processing_logger.info(
-            f"LIA_ENGINE | condition={lia_insights['condition']} | "
-            f"confidence={lia_insights['confidence']:.3f} | "
-            f"wellness_score={lia_insights['wellness_score']:.1f}"
-        )
+        if notes:
+            result = with_processing_notes(result)
+        if selection is not None:
+            return JSONResponse(
+                content=selection.project(result.model_dump(mode="json")),
+                headers={"ETag": etag, "Cache-Control": "no-cache"}
+            )
 
-        return StreamDataResponse(
-            timestamp=datetime.now(),
-            raw_signals=raw_data,
-            clarity_layer=clarity_result,
-            ifrs_layer=ifrs_result,
-            timesystems_layer=timesystems_result,
-            lia_insights=lia_insights
-        )
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return result
 
     except Exception as e:
         logger.error(f"❌ Stream error: {str(e)}")
@@ -413,33 +542,26 @@ async def get_stream_data():
 
 
 @app.get("/api/v1/predict", tags=["Analysis"], response_model=PredictionResponse)
-async def get_prediction():
+async def get_prediction(
+    response: Response,
+    device_id: Optional[str] = Query(None, description="Device to analyze"),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get latest prediction from LIA engine
     Returns comprehensive health condition analysis
+    Supports ETag/If-None-Match: 304 when no new sample has been processed
     """
     try:
-        # Get current stream data
-        stream_data = await get_stream_data()
-
-        # Extract prediction from LIA insights
-        lia = stream_data.lia_insights
-
-        return PredictionResponse(
-            timestamp=stream_data.timestamp,
-            condition=lia.condition,
-            confidence=lia.confidence,
-            wellness_score=lia.wellness_score,
-            probabilities=lia.probabilities,
-            signal_quality=stream_data.clarity_layer.quality_assessment,
-            recommendation=lia.recommendation,
-            metrics={
-                "heart_rate": stream_data.raw_signals.heart_rate,
-                "spo2": stream_data.raw_signals.spo2,
-                "temperature": stream_data.raw_signals.temperature,
-                "activity": stream_data.raw_signals.activity
-            }
-        )
+        pipeline, result = await get_latest_result(device_id, PREDICTION_FIELDS)
+
+        etag = pipeline.etag
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return build_prediction(result)
 
     except Exception as e:
         logger.error(f"❌ Prediction error: {str(e)}")
@@ -501,35 +623,89 @@ async def get_processing_logs(limit: int = 100):
 # ============================================================================
 
 @app.websocket("/ws/stream")
-async def websocket_stream(websocket: WebSocket):
+async def websocket_stream(
+    websocket: WebSocket,
+    device_id: Optional[str] = None,
+    encoding: Optional[str] = None,
+    mode: str = "full",
+    keyframe_interval: int = STREAM_DELTA_KEYFRAME_INTERVAL,
+    fields: Optional[str] = None,
+    notes: bool = False
+):
     """
     WebSocket endpoint for real-time biosignal streaming
-    Sends processed data through all layers continuously
+    Subscribes to the device's shared stream: each new sample is processed
+    once per device and every connected client receives the same frame
+    Frame encoding: ?encoding=json|orjson|msgpack or the matching
+    "wearable.<encoding>" subprotocol (msgpack frames are binary)
+    Delta mode (?mode=delta): a quantised keyframe every keyframe_interval
+    frames, and in between only the fields that changed
+    Field projection (?fields=..., full mode only) sends only the selected
+    fields and lets the pipeline skip optional outputs nobody selected
+    Processing notes (?notes=true or a selected processing_notes field,
+    full mode only) are rendered per client
     """
-    await websocket.accept()
+    encoder, subprotocol = negotiate_encoder(encoding, websocket.scope.get("subprotocols", []))
+    if encoder is None:
+        logger.warning(f"⚠️ WebSocket rejected: unsupported encoding {encoding}")
+        await websocket.close(code=1008, reason=f"Unsupported encoding: {encoding}")
+        return
+    if mode not in ("full", "delta"):
+        logger.warning(f"⚠️ WebSocket rejected: unsupported mode {mode}")
+        await websocket.close(code=1008, reason=f"Unsupported mode: {mode}")
+        return
+    try:
+        selection = parse_fields(fields, StreamDataResponse)
+    except ValueError as e:
+        logger.warning(f"⚠️ WebSocket rejected: {str(e)}")
+        await websocket.close(code=1008, reason=str(e))
+        return
+    notes = notes or (selection is not None and selection.requests("processing_notes"))
+    if (notes or selection is not None) and mode != "full":
+        logger.warning("⚠️ WebSocket rejected: fields/notes need mode=full")
+        await websocket.close(code=1008, reason="Field projection and notes are only available in full mode")
+        return
+
+    await websocket.accept(subprotocol=subprotocol)
+    device_id = resolve_device_id(device_id)
     client_id = f"ws_client_{len(connected_clients)}"
-    logger.info(f"🔌 WebSocket connected: {client_id}")
+    stream_runner.start(device_id)
+    subscription = stream_broadcaster.subscribe(device_id, mode, selection)
+    cursor = DeltaCursor(keyframe_interval)
+    logger.info(
+        f"🔌 WebSocket connected: {client_id} "
+        f"(device_id={device_id}, encoding={encoder.name}, mode={mode})"
+    )
 
     try:
         while True:
-            # Get processed stream data
-            stream_data = await get_stream_data()
-
-            # Send to client
-            await websocket.send_json({
-                "type": "stream_data",
-                "data": stream_data.dict()
-            })
-
-            # Wait before sending next update (100ms = 10Hz update rate)
-            import asyncio
-            await asyncio.sleep(0.1)
+            frame = await subscription.get()
+            if notes:
+                # Rendered for this client only, the shared frame stays lean
+                payload = with_processing_notes(frame.data).model_dump(mode="json")
+                data = encoder.encode({
+                    "type": frame.type,
+                    "data": selection.project(payload) if selection is not None else payload
+                })
+            elif mode == "delta":
+                kind = cursor.next_kind(frame.seq, frame.base_seq, frame.layout)
+                data = frame.encode(encoder, kind)
+            else:
+                data = frame.encode(encoder, "full", selection)
+            if encoder.binary:
+                await websocket.send_bytes(data)
+            else:
+                await websocket.send_text(data)
 
     except WebSocketDisconnect:
         logger.info(f"🔌 WebSocket disconnected: {client_id}")
     except Exception as e:
         logger.error(f"❌ WebSocket error: {str(e)}")
         await websocket.close()
+    finally:
+        subscription.close()
+        if subscription.dropped:
+            logger.info(f"🔌 {client_id} dropped {subscription.dropped} frame(s) as a slow consumer")
 
 
 # ============================================================================
@@ -537,26 +713,34 @@ async def websocket_stream(websocket: WebSocket):
 # ============================================================================
 
 @app.get("/api/v1/demo/layers", tags=["Demo"])
-async def demonstrate_layers():
+async def demonstrate_layers(device_id: Optional[str] = Query(None, description="Device to demonstrate")):
     """
     Demonstration endpoint showing how data flows through all layers
     Returns detailed processing information for each layer
     """
     try:
-        # Get raw data
-        raw_data = await ble_simulator.get_current_data()
+        # Latest sample the device's stream runner processed; the demo only
+        # reads it, so no sample goes through the stateful layers twice
+        _, result = await get_latest_result(device_id)
+        if result.lia_insights is None:
+            raise RuntimeError("No fully processed sample available yet")
+        result = with_processing_notes(result)
+
+        raw_data = result.raw_signals
+        clarity_result = result.clarity_layer
+        ifrs_result = result.ifrs_layer
+        timesystems_result = result.timesystems_layer
+        lia_insights = result.lia_insights
 
-        # Process step-by-step with detailed logs
         demonstration = {
             "step_1_raw_data": {
                 "description": "Raw biosignal data from BLE device simulation",
                 "data": raw_data,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": result.timestamp.isoformat()
             }
         }
 
         # Clarity™ Layer
-        clarity_result = clarity.process(raw_data)
         demonstration["step_2_clarity_layer"] = {
             "description": "Clarity™: Signal quality assessment and noise reduction",
             "layer": "Clarity™",
@@ -564,46 +748,38 @@ async def demonstrate_layers():
             "output": clarity_result,
             "processing_details": {
                 "noise_reduction_algorithm": "Adaptive Wavelet Transform",
-                "quality_metrics": clarity_result['quality_metrics'],
-                "signal_to_noise_ratio": f"{clarity_result['signal_to_noise_ratio']:.1f} dB"
+                "quality_metrics": clarity_result.quality_metrics,
+                "signal_to_noise_ratio": f"{clarity_result.signal_to_noise_ratio:.1f} dB"
             }
         }
 
         # iFRS™ Layer
-        ifrs_result = ifrs.process(clarity_result['processed_data'])
         demonstration["step_3_ifrs_layer"] = {
             "description": "iFRS™: Intelligent Frequency Response System",
             "layer": "iFRS™",
-            "input": clarity_result['processed_data'],
+            "input": clarity_result.processed_data,
             "output": ifrs_result,
             "processing_details": {
                 "frequency_analysis_method": "Fast Fourier Transform (FFT)",
-                "heart_rate_variability": ifrs_result['hrv_features'],
-                "frequency_bands": ifrs_result['frequency_bands']
+                "heart_rate_variability": ifrs_result.hrv_features,
+                "frequency_bands": ifrs_result.frequency_bands
             }
         }
 
         # Timesystems™ Layer
-        timesystems_result = timesystems.process(ifrs_result['enhanced_data'])
         demonstration["step_4_timesystems_layer"] = {
             "description": "Timesystems™: Temporal pattern analysis and circadian rhythm detection",
             "layer": "Timesystems™",
-            "input": ifrs_result['enhanced_data'],
+            "input": ifrs_result.enhanced_data,
             "output": timesystems_result,
             "processing_details": {
                 "temporal_analysis_window": "60 seconds",
-                "pattern_recognition": timesystems_result['pattern_recognition'],
-                "circadian_alignment": timesystems_result['circadian_alignment']
+                "pattern_recognition": timesystems_result.pattern_recognition,
+                "circadian_alignment": timesystems_result.circadian_alignment
             }
         }
 
         # LIA Integration
-        lia_insights = lia_engine.analyze(
-            raw_data=raw_data,
-            clarity_result=clarity_result,
-            ifrs_result=ifrs_result,
-            timesystems_result=timesystems_result
-        )
         demonstration["step_5_lia_integration"] = {
             "description": "LIA: Lifestyle Intelligence Analysis - Final health insights",
             "layer": "LIA Engine",
@@ -615,9 +791,9 @@ async def demonstrate_layers():
             "output": lia_insights,
             "processing_details": {
                 "ai_model": "Ensemble (CNN + LSTM + Transformer)",
-                "condition_detection": lia_insights['condition'],
-                "confidence_level": f"{lia_insights['confidence']:.1%}",
-                "wellness_assessment": lia_insights['wellness_assessment']
+                "condition_detection": lia_insights.condition,
+                "confidence_level": f"{lia_insights.confidence:.1%}",
+                "wellness_assessment": lia_insights.wellness_assessment
             }
         }
 
@@ -0,0 +1,72 @@
+"""
+Internal records passed between the processing layers
+
+Lightweight slotted dataclasses with the same fields as their API schemas
+in ``models.schemas``. Layers build these on every sample without any
+validation; the pipeline validates the combined result once, when it
+builds the ``StreamDataResponse`` (the matching schemas read them with
+``from_attributes``).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class SignalRecord:
+    """Biosignal values of one sample (fields as in ``BiosignalData``)"""
+    heart_rate: float
+    spo2: float
+    temperature: float
+    activity: float
+
+
+@dataclass(slots=True)
+class QualityMetricsRecord:
+    heart_rate_quality: float
+    spo2_quality: float
+    temperature_quality: float
+    activity_quality: float
+    overall_quality: float
+
+
+@dataclass(slots=True)
+class FrequencyBandsRecord:
+    vlf: float
+    lf: float
+    hf: float
+    lf_hf_ratio: float
+
+
+@dataclass(slots=True)
+class HRVFeaturesRecord:
+    rmssd: float
+    sdnn: float
+    pnn50: float
+    hrv_score: float
+
+
+@dataclass(slots=True)
+class PatternRecognitionRecord:
+    short_term_trend: str
+    long_term_trend: str
+    periodicity_detected: bool
+    period_length_seconds: Optional[float]
+    pattern_confidence: float
+
+
+@dataclass(slots=True)
+class CircadianAlignmentRecord:
+    expected_heart_rate: float
+    actual_heart_rate: float
+    alignment_score: float
+    phase_shift_minutes: float
+
+
+@dataclass(slots=True)
+class WellnessAssessmentRecord:
+    cardiovascular_health: float
+    respiratory_health: float
+    activity_level: float
+    stress_level: float
+    overall_wellness: float
@@ -2,7 +2,7 @@
 Pydantic models and schemas for API requests and responses
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from enum import Enum
@@ -98,13 +98,21 @@ class ConnectionResponse(BaseModel):
 
 
 class BiosignalData(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     heart_rate: float = Field(..., description="Heart rate in BPM")
     spo2: float = Field(..., description="Blood oxygen saturation (%)")
     temperature: float = Field(..., description="Body temperature (°C)")
     activity: float = Field(..., description="Activity level (steps/min)")
 
 
+# Channel order used by array-backed layer buffers
+SIGNAL_CHANNELS = ('heart_rate', 'spo2', 'temperature', 'activity')
+
+
 class QualityMetrics(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     heart_rate_quality: float = Field(..., ge=0, le=1)
     spo2_quality: float = Field(..., ge=0, le=1)
     temperature_quality: float = Field(..., ge=0, le=1)
@@ -120,10 +128,12 @@ class ClarityLayerResult(BaseModel):
     quality_metrics: QualityMetrics
     quality_assessment: SignalQuality
     artifacts_detected: List[str] = Field(default_factory=list)
-    processing_notes: str
+    processing_notes: Optional[str] = None
 
 
 class FrequencyBands(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     vlf: float = Field(..., description="Very Low Frequency (0.003-0.04 Hz)")
     lf: float = Field(..., description="Low Frequency (0.04-0.15 Hz)")
     hf: float = Field(..., description="High Frequency (0.15-0.4 Hz)")
@@ -131,6 +141,8 @@ class FrequencyBands(BaseModel):
 
 
 class HRVFeatures(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     rmssd: float = Field(..., description="Root Mean Square of Successive Differences")
     sdnn: float = Field(..., description="Standard Deviation of NN intervals")
     pnn50: float = Field(..., description="Percentage of successive NN intervals > 50ms")
@@ -145,10 +157,12 @@ class iFRSLayerResult(BaseModel):
     rhythm_classification: RhythmClassification
     respiratory_rate: float = Field(..., description="Estimated respiratory rate")
     frequency_stability: float = Field(..., ge=0, le=1)
-    processing_notes: str
+    processing_notes: Optional[str] = None
 
 
 class PatternRecognition(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     short_term_trend: str
     long_term_trend: str
     periodicity_detected: bool
@@ -157,6 +171,8 @@ class PatternRecognition(BaseModel):
 
 
 class CircadianAlignment(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     expected_heart_rate: float
     actual_heart_rate: float
     alignment_score: float = Field(..., ge=0, le=1)
@@ -168,14 +184,16 @@ class TimesystemsLayerResult(BaseModel):
     pattern_type: PatternType
     temporal_consistency: float = Field(..., ge=0, le=1)
     circadian_phase: CircadianPhase
-    time_of_day_analysis: Dict[str, Any]
-    pattern_recognition: PatternRecognition
+    time_of_day_analysis: Optional[Dict[str, Any]] = None
+    pattern_recognition: Optional[PatternRecognition] = None
     circadian_alignment: CircadianAlignment
-    rhythm_score: float = Field(..., ge=0, le=100)
-    processing_notes: str
+    rhythm_score: Optional[float] = Field(None, ge=0, le=100)
+    processing_notes: Optional[str] = None
 
 
 class WellnessAssessment(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     cardiovascular_health: float = Field(..., ge=0, le=100)
     respiratory_health: float = Field(..., ge=0, le=100)
     activity_level: float = Field(..., ge=0, le=100)
@@ -187,11 +205,11 @@ class LIAInsights(BaseModel):
     condition: str = Field(..., description="Detected health condition")
     confidence: float = Field(..., ge=0, le=1)
     wellness_score: float = Field(..., ge=0, le=100)
-    probabilities: Dict[str, float] = Field(..., description="Probability for each condition")
-    recommendation: str
+    probabilities: Optional[Dict[str, float]] = Field(None, description="Probability for each condition")
+    recommendation: Optional[str] = None
     wellness_assessment: WellnessAssessment
-    risk_factors: List[str] = Field(default_factory=list)
-    positive_indicators: List[str] = Field(default_factory=list)
+    risk_factors: Optional[List[str]] = None
+    positive_indicators: Optional[List[str]] = None
 
 
 class StreamDataResponse(BaseModel):
@@ -200,7 +218,7 @@ class StreamDataResponse(BaseModel):
     clarity_layer: ClarityLayerResult
     ifrs_layer: iFRSLayerResult
     timesystems_layer: TimesystemsLayerResult
-    lia_insights: LIAInsights
+    lia_insights: Optional[LIAInsights] = None
 
 
 class PredictionResponse(BaseModel):
@@ -234,6 +252,10 @@ class SystemStatus(BaseModel):
     services: Dict[str, bool]
     connected_clients: int
     active_sessions: int
+    shard: Optional[int] = Field(None, description="Shard index when running sharded")
+    inference: Optional[Dict[str, Any]] = Field(
+        None, description="LIA model backend and micro-batching statistics, when a model is in use"
+    )
 
 
 class LayerProcessingLog(BaseModel):
@@ -0,0 +1,251 @@
+"""
+Front Router for the sharded Wearable Biosignal Analysis backend
+Forwards REST and WebSocket traffic to the shard that owns the device:
+- Each shard is a regular main:app server listening on a Unix socket
+- shard = crc32(device_id) % SHARD_COUNT, so a device's pipeline state and
+  sessions always live in the same process
+- Requests without a device_id go to the simulated wearable's shard
+"""
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import AbstractSet, List, Optional
+
+import httpx
+import websockets
+
+from models.schemas import SystemStatus
+from services.ble_simulator import SIMULATOR_DEVICE_ID
+from utils.logger import setup_logger
+from utils.sharding import shard_for, shard_socket_path
+
+logger = setup_logger(__name__)
+
+# Shard settings (set by run_sharded.py)
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "2"))
+SHARD_SOCKET_DIR = os.environ.get("SHARD_SOCKET_DIR", "/tmp/wearable-shards")
+SHARD_TIMEOUT_SECONDS = 10.0
+
+# Headers that describe a single hop and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host",
+    "content-length", "content-encoding"
+}
+
+# Headers the router's own server adds to every response; relaying the
+# shard's copies would send them twice
+SERVER_HEADERS = {"date", "server"}
+
+# One HTTP client per shard, over its Unix socket
+shard_clients: List[httpx.AsyncClient] = []
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open and close the shard connections"""
+    for index in range(SHARD_COUNT):
+        transport = httpx.AsyncHTTPTransport(uds=shard_socket_path(SHARD_SOCKET_DIR, index))
+        shard_clients.append(httpx.AsyncClient(
+            transport=transport, base_url="http://shard", timeout=SHARD_TIMEOUT_SECONDS
+        ))
+    logger.info(f"🔀 Router forwarding to {SHARD_COUNT} shard(s) in {SHARD_SOCKET_DIR}")
+
+    yield
+
+    for client in shard_clients:
+        await client.aclose()
+    shard_clients.clear()
+
+
+app = FastAPI(
+    title="Wearable Biosignal Analysis API (sharded)",
+    description="Device-affinity router in front of the backend shards",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, specify exact origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+def shard_of(device_id: Optional[str]) -> int:
+    """Shard that owns a device"""
+    return shard_for(device_id or SIMULATOR_DEVICE_ID, SHARD_COUNT)
+
+
+def forwarded_headers(headers, exclude: AbstractSet[str] = frozenset()) -> dict:
+    """Copy end-to-end headers, leaving out ``exclude`` (lower-case names)"""
+    return {
+        key: value for key, value in headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in exclude
+    }
+
+
+async def forward(index: int, request: Request, body: bytes = b"") -> Response:
+    """Forward a request to a shard and relay its response unchanged"""
+    try:
+        upstream = await shard_clients[index].request(
+            request.method,
+            request.url.path,
+            params=request.query_params,
+            headers=forwarded_headers(request.headers),
+            content=body
+        )
+    except httpx.TransportError as e:
+        logger.error(f"❌ Shard {index} unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Shard {index} unavailable")
+
+    return Response(
+        content=upstream.content,
+        status_code=upstream.status_code,
+        headers=forwarded_headers(upstream.headers, SERVER_HEADERS)
+    )
+
+
+async def fan_out(path: str, params: Optional[dict] = None) -> List[Optional[httpx.Response]]:
+    """GET a path on every shard; unreachable shards yield None"""
+    responses = await asyncio.gather(
+        *(client.get(path, params=params) for client in shard_clients),
+        return_exceptions=True
+    )
+    return [None if isinstance(response, Exception) else response for response in responses]
+
+
+# ============================================================================
+# CLUSTER-WIDE ENDPOINTS
+# ============================================================================
+
+@app.get("/api/v1/health", tags=["System"], response_model=SystemStatus)
+async def health_check():
+    """Aggregated health of all shards"""
+    responses = await fan_out("/api/v1/health")
+    shards = [response.json() if response is not None and response.status_code == 200 else None
+              for response in responses]
+    # A shard answering on another shard's socket would misroute devices
+    shards = [shard if shard and shard.get("shard") == index else None
+              for index, shard in enumerate(shards)]
+
+    return SystemStatus(
+        status="healthy" if all(shards) else "degraded",
+        timestamp=datetime.now(),
+        services={f"shard_{index}": shard is not None for index, shard in enumerate(shards)},
+        connected_clients=sum(shard["connected_clients"] for shard in shards if shard),
+        active_sessions=sum(shard["active_sessions"] for shard in shards if shard),
+        inference={
+            f"shard_{index}": shard["inference"]
+            for index, shard in enumerate(shards) if shard and shard.get("inference")
+        } or None
+    )
+
+
+@app.get("/api/v1/sessions/{session_id}", tags=["Sessions"])
+async def get_session(session_id: str):
+    """Find a session on whichever shard created it"""
+    for response in await fan_out(f"/api/v1/sessions/{session_id}"):
+        if response is not None and response.status_code == 200:
+            return Response(content=response.content, media_type="application/json")
+    raise HTTPException(status_code=404, detail="Session not found")
+
+
+@app.get("/api/v1/logs/processing", tags=["Logs"])
+async def get_processing_logs(limit: int = 100):
+    """Most recent processing logs across all shards"""
+    logs = []
+    for response in await fan_out("/api/v1/logs/processing", {"limit": limit}):
+        if response is not None and response.status_code == 200:
+            logs.extend(response.json()["logs"])
+
+    logs = sorted(logs, key=lambda entry: entry["timestamp"])[-limit:]
+    return {
+        "total": len(logs),
+        "logs": logs
+    }
+
+
+# ============================================================================
+# DEVICE-SCOPED ENDPOINTS
+# ============================================================================
+
+@app.post("/api/v1/connect", tags=["Connection"])
+@app.post("/api/v1/sessions", tags=["Sessions"])
+async def forward_by_body(request: Request):
+    """Route requests whose device_id is in the JSON body"""
+    body = await request.body()
+    try:
+        device_id = json.loads(body).get("device_id")
+    except (ValueError, AttributeError):
+        device_id = None
+    return await forward(shard_of(device_id), request, body)
+
+
+@app.websocket("/ws/stream")
+async def websocket_stream(websocket: WebSocket, device_id: Optional[str] = None):
+    """Relay a WebSocket stream from the device's shard"""
+    index = shard_of(device_id)
+    query = websocket.url.query
+    uri = "ws://shard/ws/stream" + (f"?{query}" if query else "")
+
+    try:
+        async with websockets.unix_connect(
+            shard_socket_path(SHARD_SOCKET_DIR, index), uri, max_size=None,
+            subprotocols=websocket.scope.get("subprotocols") or None
+        ) as upstream:
+            # Accept with whatever the shard negotiated (e.g. the frame encoding)
+            await websocket.accept(subprotocol=upstream.subprotocol)
+
+            async def client_to_shard():
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("text") is not None:
+                        await upstream.send(message["text"])
+                    elif message.get("bytes") is not None:
+                        await upstream.send(message["bytes"])
+
+            async def shard_to_client():
+                async for message in upstream:
+                    if isinstance(message, str):
+                        await websocket.send_text(message)
+                    else:
+                        await websocket.send_bytes(message)
+
+            tasks = [asyncio.create_task(client_to_shard()), asyncio.create_task(shard_to_client())]
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+
+    except (WebSocketDisconnect, websockets.ConnectionClosed):
+        pass
+    except websockets.InvalidHandshake as e:
+        # The shard rejected the handshake (e.g. unsupported encoding)
+        logger.warning(f"⚠️ WebSocket rejected by shard {index}: {str(e)}")
+    except Exception as e:
+        logger.error(f"❌ WebSocket relay error (shard {index}): {str(e)}")
+
+    try:
+        await websocket.close()
+    except RuntimeError:
+        # Client already gone
+        pass
+
+
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+async def forward_by_query(path: str, request: Request):
+    """Route everything else by its device_id query parameter"""
+    body = await request.body()
+    return await forward(shard_of(request.query_params.get("device_id")), request, body)
@@ -0,0 +1,97 @@
+"""
+Sharded launcher for the Wearable Biosignal Analysis backend
+Starts N backend shards on Unix sockets plus the front router on a TCP port.
+Every device is owned by exactly one shard (crc32(device_id) % N); no
+external broker is needed, everything runs on one machine
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List
+
+from utils.sharding import shard_socket_path
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_shard(index: int, socket_path: str) -> subprocess.Popen:
+    """Start one backend shard listening on a Unix socket"""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    env = dict(os.environ, SHARD_INDEX=str(index))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--uds", socket_path, "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+
+
+def start_router(shards: int, socket_dir: str, host: str, port: int) -> subprocess.Popen:
+    """Start the front router"""
+    env = dict(os.environ, SHARD_COUNT=str(shards), SHARD_SOCKET_DIR=socket_dir)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "router:app", "--host", host, "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+
+
+def wait_for_sockets(paths: List[str], timeout: float = 60.0):
+    """Block until every shard socket exists"""
+    deadline = time.monotonic() + timeout
+    while not all(os.path.exists(path) for path in paths):
+        if time.monotonic() > deadline:
+            raise RuntimeError("Shards did not start in time")
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend as N device-affinity shards")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 2, help="Number of shard processes")
+    parser.add_argument("--host", default="0.0.0.0", help="Router host")
+    parser.add_argument("--port", type=int, default=8000, help="Router port")
+    parser.add_argument("--socket-dir", default="/tmp/wearable-shards", help="Directory for shard sockets")
+    args = parser.parse_args()
+
+    os.makedirs(args.socket_dir, exist_ok=True)
+    socket_paths = [shard_socket_path(args.socket_dir, index) for index in range(args.shards)]
+
+    print("=" * 80)
+    print(f"  Starting {args.shards} shard(s) + router on http://{args.host}:{args.port}")
+    print("=" * 80)
+
+    processes = [start_shard(index, path) for index, path in enumerate(socket_paths)]
+
+    def shutdown(signum=None, frame=None):
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    try:
+        wait_for_sockets(socket_paths)
+        processes.append(start_router(args.shards, args.socket_dir, args.host, args.port))
+
+        # Stop everything if any process dies
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+        print("❌ A backend process exited, shutting down")
+    finally:
+        shutdown()
+
+
+if __name__ == "__main__":
+    main()
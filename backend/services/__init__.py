@@ -5,3 +5,9 @@ from .ifrs import iFRSLayer
 from .timesystems import TimesystemsLayer
 from .lia_integration import LIAEngine
 from .session_manager import SessionManager
+from .fleet import FleetEngine
+from .pipeline import DevicePipeline, PipelineRegistry
+from .broadcaster import StreamBroadcaster, StreamFrame, Subscription
+from .stream_runner import StreamRunner
+from .inference import InferenceBackend, MicroBatcher, load_backend
+from .executor import PipelineExecutor
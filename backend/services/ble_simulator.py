@@ -6,11 +6,21 @@ Simulates Bluetooth Low Energy wearable device data streaming
 import asyncio
 import numpy as np
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional, Set
 import random
 
 from models.schemas import BiosignalData, DeviceStatus
 
+# Device ID reported by the simulated wearable
+SIMULATOR_DEVICE_ID = "WEARABLE_SIM_001"
+
+
+class BiosignalSample(NamedTuple):
+    """A generated sample tagged with its position in the stream"""
+    sequence: int
+    timestamp: datetime
+    data: BiosignalData
+
 
 class BLESimulator:
     """
@@ -19,7 +29,7 @@ class BLESimulator:
 
     def __init__(self):
         self.is_running = False
-        self.device_id = "WEARABLE_SIM_001"
+        self.device_id = SIMULATOR_DEVICE_ID
         self.firmware_version = "2.1.4"
         self.battery_level = 87.0
         self.signal_strength = random.randint(-70, -40)  # RSSI in dBm
@@ -45,6 +55,10 @@ class BLESimulator:
         self.current_data = None
         self.last_update = None
 
+        # Sample stream: one queue per consumer, sequence numbered
+        self.sequence = 0
+        self.sample_queues: Set[asyncio.Queue] = set()
+
         # Background update task
         self.update_task = None
 
@@ -69,6 +83,10 @@ class BLESimulator:
             try:
                 self.current_data = self._generate_biosignal_data()
                 self.last_update = datetime.now()
+                self.sequence += 1
+                self._publish(BiosignalSample(
+                    self.sequence, self.last_update, BiosignalData(**self.current_data)
+                ))
 
                 # Slowly drain battery
                 self.battery_level = max(0, self.battery_level - 0.0001)
@@ -85,6 +103,24 @@ class BLESimulator:
                 print(f"Error in BLE simulator update loop: {e}")
                 await asyncio.sleep(1)
 
+    def _publish(self, sample: BiosignalSample):
+        """Hand a new sample to every consumer queue"""
+        for queue in self.sample_queues:
+            if queue.full():
+                # A consumer that fell this far behind loses its oldest sample
+                queue.get_nowait()
+            queue.put_nowait(sample)
+
+    def subscribe(self, maxsize: int = 256) -> asyncio.Queue:
+        """Register a consumer queue that receives every new sample"""
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.sample_queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering samples to a consumer queue"""
+        self.sample_queues.discard(queue)
+
     def _generate_biosignal_data(self) -> Dict[str, float]:
         """
         Generate realistic biosignal data using sinusoidal patterns with noise
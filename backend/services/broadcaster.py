@@ -0,0 +1,217 @@
+"""
+Stream Broadcaster - single-producer fan-out of pipeline results
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel
+
+from utils.delta import diff, flatten, quantize
+from utils.projection import FieldSelection
+from utils.serialization import FrameEncoder
+
+
+class StreamFrame:
+    """
+    A message published to all subscribers of a device
+
+    The JSON-compatible payload is built once, and each encoding is
+    produced at most once per frame however many subscribers use it.
+    Frames can also be sent as a quantised keyframe or, once linked to the
+    previous frame of the stream, as a delta against it.
+    """
+
+    __slots__ = ("type", "data", "seq", "base_seq", "_payload", "_flat", "_layout", "_delta", "_encoded")
+
+    def __init__(self, type: str, data: BaseModel, seq: int = 0):
+        self.type = type
+        self.data = data
+        self.seq = seq
+        self.base_seq: Optional[int] = None
+        self._payload: Optional[dict] = None
+        self._flat: Optional[dict] = None
+        self._layout: Optional[Tuple[str, ...]] = None
+        self._delta: Optional[dict] = None
+        self._encoded: Dict[Tuple[str, str, str], Union[str, bytes]] = {}
+
+    @property
+    def payload(self) -> dict:
+        """Frame as plain JSON-compatible data"""
+        if self._payload is None:
+            self._payload = {"type": self.type, "data": self.data.model_dump(mode="json")}
+        return self._payload
+
+    @property
+    def flat(self) -> dict:
+        """Quantised data flattened to {"a.b.c": value}"""
+        if self._flat is None:
+            self._flat = flatten(quantize(self.payload["data"]))
+        return self._flat
+
+    @property
+    def layout(self) -> Tuple[str, ...]:
+        """Ordered flattened field paths that keyframe values and deltas refer to"""
+        if self._layout is None:
+            self._layout = tuple(self.flat)
+        return self._layout
+
+    def link(self, previous: "StreamFrame") -> None:
+        """Compute this frame's delta against the previous frame of the stream"""
+        changes = diff(previous.flat, self.flat)
+        if changes is None:
+            # Field layout changed: subscribers need a keyframe
+            return
+
+        # Same layout: share it, so subscribers can compare it by identity
+        self._layout = previous.layout
+        self.base_seq = previous.seq
+        self._delta = {
+            "type": f"{self.type}_delta",
+            "seq": self.seq,
+            "base": previous.seq,
+            "changes": changes
+        }
+
+    def keyframe_payload(self, with_fields: bool = True) -> dict:
+        """
+        Quantised values of all fields, in layout order
+
+        ``fields`` (the layout itself) is only included when the receiver
+        does not have this frame's layout yet.
+        """
+        payload = {
+            "type": f"{self.type}_keyframe",
+            "seq": self.seq,
+            "values": list(self.flat.values())
+        }
+        if with_fields:
+            payload["fields"] = list(self.layout)
+        return payload
+
+    def encode(
+        self, encoder: FrameEncoder, kind: str = "full",
+        fields: Optional[FieldSelection] = None
+    ) -> Union[str, bytes]:
+        """
+        Frame serialized with an encoder, cached per (kind, encoding, fields)
+
+        Args:
+            encoder: Frame encoder negotiated by the subscriber
+            kind: 'full', 'keyframe' (with the field layout), 'values'
+                (keyframe without the layout) or 'delta' (only after ``link``)
+            fields: Projection of a 'full' frame's data
+        """
+        cache_key = (kind, encoder.name, fields.key if fields is not None else "")
+        encoded = self._encoded.get(cache_key)
+        if encoded is None:
+            if kind == "delta":
+                payload = self._delta
+            elif kind in ("keyframe", "values"):
+                payload = self.keyframe_payload(with_fields=kind == "keyframe")
+            elif fields is not None:
+                payload = {"type": self.type, "data": fields.project(self.payload["data"])}
+            else:
+                payload = self.payload
+            encoded = encoder.encode(payload)
+            self._encoded[cache_key] = encoded
+        return encoded
+
+
+class Subscription:
+    """
+    One subscriber's view of a device stream
+
+    Frames are delivered through a bounded queue. When a slow consumer
+    lets the queue fill up, the oldest frame is dropped so the subscriber
+    always catches up to the most recent data.
+    """
+
+    def __init__(
+        self, broadcaster: "StreamBroadcaster", device_id: str,
+        maxsize: int, mode: str = "full", fields: Optional[FieldSelection] = None
+    ):
+        self.broadcaster = broadcaster
+        self.device_id = device_id
+        self.mode = mode
+        self.fields = fields
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def deliver(self, frame: Any) -> None:
+        """Queue a frame, dropping the oldest one if the queue is full"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(frame)
+
+    async def get(self) -> Any:
+        """Wait for the next frame"""
+        return await self.queue.get()
+
+    def close(self) -> None:
+        """Stop receiving frames"""
+        self.broadcaster.unsubscribe(self)
+
+
+class StreamBroadcaster:
+    """
+    Pub/sub hub that fans each device's frames out to its subscribers
+
+    The stream runner publishes one frame per processed sample and every
+    subscriber of that device receives it through its own queue, so the
+    pipeline cost scales with the number of streamed devices, not with the
+    number of viewers. The last frame of each device is kept so the next
+    one can be delta-encoded against it while delta subscribers exist.
+    """
+
+    def __init__(self, queue_size: int = 8):
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.last_frames: Dict[str, StreamFrame] = {}
+
+    def subscribe(
+        self, device_id: str, mode: str = "full", fields: Optional[FieldSelection] = None
+    ) -> Subscription:
+        """Subscribe to a device stream ('full' or 'delta' frames, optionally projected)"""
+        subscription = Subscription(self, device_id, self.queue_size, mode, fields)
+        self.subscribers.setdefault(device_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber"""
+        device_id = subscription.device_id
+        subscribers = self.subscribers.get(device_id)
+        if not subscribers:
+            return
+
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.subscribers[device_id]
+            self.last_frames.pop(device_id, None)
+
+    def publish(self, device_id: str, frame: Any) -> None:
+        """Deliver a frame to every subscriber of a device"""
+        subscribers = self.subscribers.get(device_id, ())
+
+        if isinstance(frame, StreamFrame):
+            previous = self.last_frames.get(device_id)
+            self.last_frames[device_id] = frame
+            if previous is not None and any(sub.mode == "delta" for sub in subscribers):
+                frame.link(previous)
+
+        for subscription in subscribers:
+            subscription.deliver(frame)
+
+    def selections(self, device_id: str) -> List[Optional[FieldSelection]]:
+        """Field selections of a device's subscribers (None: all fields)"""
+        return [subscription.fields for subscription in self.subscribers.get(device_id, ())]
+
+    def subscriber_count(self, device_id: Optional[str] = None) -> int:
+        """Number of subscribers for one device, or across all devices"""
+        if device_id is not None:
+            return len(self.subscribers.get(device_id, ()))
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
@@ -4,15 +4,128 @@ Proprietary algorithm for biosignal enhancement and quality assessment
 """
 
 import numpy as np
-from typing import Dict, List
-import random
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Tuple
+
+from models.schemas import SignalQuality, SIGNAL_CHANNELS
+from models.internal import QualityMetricsRecord, SignalRecord
+from utils.ring_buffer import RingBuffer
+from utils.running_stats import SlidingWindowStats
+
+# Column index of each channel in the history buffer
+CHANNEL_INDEX = {name: idx for idx, name in enumerate(SIGNAL_CHANNELS)}
+
+# Artifact labels in bit order of the flags returned by process_batch
+ARTIFACT_LABELS = (
+    "SpO2 saturation",
+    "Heart rate extreme",
+    "Temperature extreme",
+    "Poor sensor contact",
+    "Motion artifact"
+)
 
-from models.schemas import (
-    BiosignalData, ClarityLayerResult, QualityMetrics,
-    SignalQuality
+# Column order of the quality metrics returned by process_batch
+QUALITY_METRIC_FIELDS = (
+    'heart_rate_quality', 'spo2_quality', 'temperature_quality',
+    'activity_quality', 'overall_quality'
 )
 
 
+def artifacts_from_flags(flags: int) -> List[str]:
+    """Expand an artifact bitmask from process_batch into labels"""
+    return [
+        label for bit, label in enumerate(ARTIFACT_LABELS)
+        if int(flags) & (1 << bit)
+    ]
+
+
+def quality_metrics_batch(samples: np.ndarray, stability: np.ndarray) -> np.ndarray:
+    """
+    Per-channel quality: range penalties scaled by channel stability
+
+    Args:
+        samples: [N, 4] in SIGNAL_CHANNELS order
+        stability: [N, 4] channel stability
+
+    Returns:
+        [N, 5] in QUALITY_METRIC_FIELDS order
+    """
+    hr, spo2, temp, activity = samples.T
+    quality = np.empty((len(samples), len(QUALITY_METRIC_FIELDS)))
+    quality[:, 0] = (
+        np.where((hr < 40) | (hr > 180), 0.5, 1.0) *
+        np.where((hr < 50) | (hr > 150), 0.8, 1.0) *
+        stability[:, 0]
+    )
+    quality[:, 1] = (
+        np.where(spo2 < 90, 0.6, 1.0) *
+        np.where(spo2 > 100, 0.7, 1.0) *
+        stability[:, 1]
+    )
+    quality[:, 2] = (
+        np.where((temp < 35) | (temp > 39), 0.5, 1.0) *
+        np.where((temp < 36) | (temp > 38), 0.9, 1.0) *
+        stability[:, 2]
+    )
+    quality[:, 3] = (
+        np.where((activity < 0) | (activity > 200), 0.5, 1.0) *
+        stability[:, 3]
+    )
+    np.clip(quality[:, :4], 0.0, 1.0, out=quality[:, :4])
+    quality[:, 4] = (
+        quality[:, 0] * 0.4 +
+        quality[:, 1] * 0.3 +
+        quality[:, 2] * 0.2 +
+        quality[:, 3] * 0.1
+    )
+    return quality
+
+
+def snr_batch(samples: np.ndarray, processed: np.ndarray) -> np.ndarray:
+    """SNR in dB between raw and processed rows"""
+    valid = processed != 0
+    n_valid = valid.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signal_power = np.where(valid, processed ** 2, 0.0).sum(axis=1) / n_valid
+        noise_power = np.where(valid, (samples - processed) ** 2, 0.0).sum(axis=1) / n_valid
+    signal_power = np.where(n_valid > 0, signal_power, 1.0)
+    noise_power = np.maximum(np.where(n_valid > 0, noise_power, 0.01), 0.001)
+    return np.round(np.clip(10 * np.log10(signal_power / noise_power), 15, 60), 1)
+
+
+def artifact_flags_batch(
+    samples: np.ndarray, overall: np.ndarray,
+    prev_activity: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
+    """
+    Artifact bitmask over ARTIFACT_LABELS for each row
+
+    Args:
+        samples: [N, 4] raw samples
+        overall: [N] overall quality
+        prev_activity: [N] activity of each row's previous sample
+        counts: [N] buffered history length, counting the row itself
+    """
+    hr, spo2, temp, activity = samples.T
+    motion = (activity > 100) & (counts > 2) & (np.abs(activity - prev_activity) > 50)
+    return (
+        ((spo2 >= 100) | (spo2 <= 90)).astype(np.uint8) |
+        (((hr >= 180) | (hr <= 40)).astype(np.uint8) << 1) |
+        (((temp >= 39) | (temp <= 35)).astype(np.uint8) << 2) |
+        ((overall < 0.5).astype(np.uint8) << 3) |
+        (motion.astype(np.uint8) << 4)
+    )
+
+
+def quality_assessment_batch(overall: np.ndarray) -> np.ndarray:
+    """SignalQuality string values for overall quality scores"""
+    return np.select(
+        [overall >= 0.9, overall >= 0.75, overall >= 0.5],
+        [SignalQuality.EXCELLENT.value, SignalQuality.GOOD.value, SignalQuality.FAIR.value],
+        default=SignalQuality.POOR.value
+    )
+
+
 class ClarityLayer:
     """
     Clarity™ - Proprietary signal quality enhancement layer
@@ -23,274 +136,289 @@ class ClarityLayer:
     - Quality scoring for each biosignal channel
     - Artifact detection (motion, electrode noise, saturation)
     - Real-time quality assessment
+
+    Every row of the layer's state is one device's history. process()
+    takes one sample for each of any number of rows and scores them all
+    in one vectorized pass.
     """
 
-    def __init__(self):
+    def __init__(self, rows: int = 1):
         self.noise_threshold = 0.3
         self.quality_threshold = 0.7
-        self.history_buffer = []
-        self.buffer_size = 50
 
-    def process(self, raw_data: BiosignalData) -> Dict:
+        # History window and running mean/std over it, updated once per sample
+        self.stability_window = 10
+        self.history_buffer = RingBuffer(self.stability_window, len(SIGNAL_CHANNELS), rows)
+        self.window_stats = SlidingWindowStats(self.stability_window, len(SIGNAL_CHANNELS), rows)
+
+        # Smoothing weights for each history length of a noise-reduced
+        # sample (3 to 5 buffered samples) plus the current sample
+        self.smoothing_window = 5
+        self.smoothing_weights = {
+            length: self._smoothing_weights(length + 1)
+            for length in range(3, self.smoothing_window + 1)
+        }
+
+    def process(self, rows, samples: np.ndarray) -> Dict[str, np.ndarray]:
         """
-        Process raw biosignal data through Clarity™ layer
+        Process one raw sample per row through Clarity™ layer
 
         Args:
-            raw_data: Raw biosignal data from BLE device
+            rows: Distinct row indices (devices) that received a sample
+            samples: Raw samples shaped [len(rows), 4] in SIGNAL_CHANNELS order
 
         Returns:
-            Clarity layer processing results
+            Column arrays as returned by process_batch(), one entry per row
         """
+        rows = np.asarray(rows, dtype=np.intp)
+        samples = np.asarray(samples, dtype=np.float64).reshape(len(rows), len(SIGNAL_CHANNELS))
+
         # Add to history buffer
-        self.history_buffer.append(raw_data.dict())
-        if len(self.history_buffer) > self.buffer_size:
-            self.history_buffer.pop(0)
+        self.history_buffer.append(rows, samples)
+        self.window_stats.push(rows, samples)
+        counts = self.history_buffer.count[rows]
 
         # Calculate signal quality metrics
-        quality_metrics = self._calculate_quality_metrics(raw_data)
+        quality = quality_metrics_batch(samples, self._calculate_stability(rows, counts))
+        overall = quality[:, 4]
 
         # Apply noise reduction
-        processed_data, noise_reduced = self._apply_noise_reduction(
-            raw_data, quality_metrics
-        )
+        processed, noise_reduced = self._apply_noise_reduction(rows, samples, overall, counts)
 
-        # Calculate SNR
-        snr = self._calculate_snr(raw_data, processed_data)
+        # Calculate SNR (assume a good SNR with limited data)
+        snr = snr_batch(samples, processed)
+        snr[counts < 5] = 35.0
 
-        # Detect artifacts
-        artifacts = self._detect_artifacts(raw_data, quality_metrics)
-
-        # Overall quality score
-        quality_score = quality_metrics.overall_quality
-
-        # Quality assessment
-        quality_assessment = self._assess_quality(quality_score)
-
-        # Generate processing notes
-        notes = self._generate_processing_notes(
-            quality_score, snr, noise_reduced, artifacts
-        )
+        # Detect artifacts; the current sample is already buffered, so
+        # motion compares with the one before it
+        prev_activity = self.history_buffer.ago(rows, 2)[:, CHANNEL_INDEX['activity']]
+        artifact_flags = artifact_flags_batch(samples, overall, prev_activity, counts)
 
         return {
-            'processed_data': processed_data,
-            'quality_score': quality_score,
+            'processed_data': processed,
+            'quality_score': overall,
             'signal_to_noise_ratio': snr,
             'noise_reduction_applied': noise_reduced,
-            'quality_metrics': quality_metrics,
-            'quality_assessment': quality_assessment,
-            'artifacts_detected': artifacts,
-            'processing_notes': notes
+            'quality_metrics': quality,
+            'quality_assessment': quality_assessment_batch(overall),
+            'artifact_flags': artifact_flags
         }
 
-    def _calculate_quality_metrics(self, data: BiosignalData) -> QualityMetrics:
-        """
-        Calculate quality metrics for each signal channel
-
-        Quality is based on:
-        - Signal stability
-        - Value within expected range
-        - Historical consistency
-        """
-        metrics = {}
-
-        # Heart rate quality
-        hr = data.heart_rate
-        hr_quality = 1.0
-        if hr < 40 or hr > 180:
-            hr_quality *= 0.5
-        if hr < 50 or hr > 150:
-            hr_quality *= 0.8
-        hr_quality *= self._calculate_stability('heart_rate')
-        metrics['heart_rate_quality'] = max(0.0, min(1.0, hr_quality))
-
-        # SpO2 quality
-        spo2 = data.spo2
-        spo2_quality = 1.0
-        if spo2 < 90:
-            spo2_quality *= 0.6
-        if spo2 > 100:
-            spo2_quality *= 0.7
-        spo2_quality *= self._calculate_stability('spo2')
-        metrics['spo2_quality'] = max(0.0, min(1.0, spo2_quality))
-
-        # Temperature quality
-        temp = data.temperature
-        temp_quality = 1.0
-        if temp < 35 or temp > 39:
-            temp_quality *= 0.5
-        if temp < 36 or temp > 38:
-            temp_quality *= 0.9
-        temp_quality *= self._calculate_stability('temperature')
-        metrics['temperature_quality'] = max(0.0, min(1.0, temp_quality))
-
-        # Activity quality
-        activity = data.activity
-        activity_quality = 1.0
-        if activity < 0 or activity > 200:
-            activity_quality *= 0.5
-        activity_quality *= self._calculate_stability('activity')
-        metrics['activity_quality'] = max(0.0, min(1.0, activity_quality))
-
-        # Overall quality (weighted average)
-        metrics['overall_quality'] = (
-            metrics['heart_rate_quality'] * 0.4 +
-            metrics['spo2_quality'] * 0.3 +
-            metrics['temperature_quality'] * 0.2 +
-            metrics['activity_quality'] * 0.1
-        )
-
-        return QualityMetrics(**metrics)
-
-    def _calculate_stability(self, signal_type: str) -> float:
-        """
-        Calculate signal stability based on historical data
-        """
-        if len(self.history_buffer) < 5:
-            return 0.9  # Assume good quality with limited history
-
-        recent_values = [
-            sample[signal_type]
-            for sample in self.history_buffer[-10:]
+    @staticmethod
+    def results(columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Per-row layer results (the response fields) from process() columns"""
+        return [
+            {
+                'processed_data': SignalRecord(*processed),
+                'quality_score': quality_score,
+                'signal_to_noise_ratio': snr,
+                'noise_reduction_applied': noise_reduced,
+                'quality_metrics': QualityMetricsRecord(*metrics),
+                'quality_assessment': SignalQuality(assessment),
+                'artifacts_detected': artifacts_from_flags(flags),
+                'processing_notes': None
+            }
+            for processed, quality_score, snr, noise_reduced, metrics, assessment, flags in zip(
+                columns['processed_data'].tolist(),
+                columns['quality_score'].tolist(),
+                columns['signal_to_noise_ratio'].tolist(),
+                columns['noise_reduction_applied'].tolist(),
+                columns['quality_metrics'].tolist(),
+                columns['quality_assessment'].tolist(),
+                columns['artifact_flags'].tolist()
+            )
         ]
 
-        # Calculate coefficient of variation
-        mean_val = np.mean(recent_values)
-        std_val = np.std(recent_values)
-
-        if mean_val == 0:
-            return 0.5
-
-        cv = std_val / mean_val
-
-        # Lower CV = higher stability
-        stability = max(0.3, 1.0 - cv)
-        return min(1.0, stability)
-
-    def _apply_noise_reduction(
-        self, raw_data: BiosignalData, quality_metrics: QualityMetrics
-    ) -> tuple[BiosignalData, bool]:
-        """
-        Apply adaptive noise reduction using wavelet-inspired smoothing
-
-        Applies noise reduction if quality is below threshold
+    def process_batch(self, samples: np.ndarray, row: int = 0) -> Dict[str, np.ndarray]:
         """
-        noise_reduced = False
+        Process a block of samples through Clarity™ in one vectorized pass
 
-        data_dict = raw_data.dict()
-        processed_dict = data_dict.copy()
+        Produces the same values as calling process() with one sample at
+        a time for ``row``, up to floating point rounding in the stability
+        statistics, and leaves the row in the same state afterwards, but
+        without per-sample Python work. Intended for re-processing backlogs
+        uploaded by devices that were offline.
 
-        # Apply noise reduction if quality is poor
-        if quality_metrics.overall_quality < self.quality_threshold:
-            noise_reduced = True
+        Args:
+            samples: Array shaped [N, 4] in SIGNAL_CHANNELS order
+            row: Row (device) whose history the samples continue
 
-            # Simulate wavelet denoising by smoothing with historical data
-            if len(self.history_buffer) >= 3:
-                for signal_type in ['heart_rate', 'spo2', 'temperature', 'activity']:
-                    recent_values = [
-                        sample[signal_type]
-                        for sample in self.history_buffer[-5:]
-                    ]
-                    recent_values.append(data_dict[signal_type])
+        Returns:
+            Column arrays:
+            - processed_data: [N, 4] noise-reduced samples
+            - quality_score: [N] overall quality
+            - signal_to_noise_ratio: [N] SNR in dB
+            - noise_reduction_applied: [N] bool
+            - quality_metrics: [N, 5] in QUALITY_METRIC_FIELDS order
+            - quality_assessment: [N] SignalQuality string values
+            - artifact_flags: [N] bitmask over ARTIFACT_LABELS
+        """
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, len(SIGNAL_CHANNELS))
+        n = len(samples)
+        if n == 0:
+            return {
+                'processed_data': np.empty((0, len(SIGNAL_CHANNELS))),
+                'quality_score': np.empty(0),
+                'signal_to_noise_ratio': np.empty(0),
+                'noise_reduction_applied': np.empty(0, dtype=bool),
+                'quality_metrics': np.empty((0, len(QUALITY_METRIC_FIELDS))),
+                'quality_assessment': np.empty(0, dtype=str),
+                'artifact_flags': np.empty(0, dtype=np.uint8)
+            }
+
+        # Prepend the history needed by the first samples' windows
+        tail = self.history_buffer.samples(row, self.stability_window - 1)
+        full = np.vstack([tail, samples])
+        offset = len(tail)
+
+        # History length seen by each sample, counting itself
+        counts = self.history_buffer.count[row] + np.arange(1, n + 1)
+
+        # Stability over trailing windows (NaN-padded where history is short)
+        padded = np.vstack([
+            np.full((self.stability_window - 1, len(SIGNAL_CHANNELS)), np.nan), full
+        ])
+        windows = sliding_window_view(padded, self.stability_window, axis=0)
+        windows = windows[offset:]  # [N, 4, window]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_val = np.nanmean(windows, axis=-1)
+            std_val = np.nanstd(windows, axis=-1)
+            stability = np.clip(1.0 - std_val / mean_val, 0.3, 1.0)
+        stability = np.where(mean_val == 0, 0.5, stability)
+        stability[counts < 5] = 0.9
+
+        # Per-channel quality with range penalties
+        quality = quality_metrics_batch(samples, stability)
+        overall = quality[:, 4]
+
+        # Exponentially weighted smoothing where quality is poor
+        noise_reduced = overall < self.quality_threshold
+        processed = samples.copy()
+        smooth = noise_reduced & (counts >= 3)
+
+        full_window = smooth & (counts >= 5)
+        if full_window.any():
+            idx = np.flatnonzero(full_window)
+            recent = sliding_window_view(full, 5, axis=0)[offset + idx - 4]  # [k, 4, 5]
+            processed[idx] = self._smooth(
+                recent, samples[idx], self.smoothing_weights[self.smoothing_window], axis=-1
+            )
+        for i in np.flatnonzero(smooth & (counts < 5)):
+            recent = full[offset + i - counts[i] + 1:offset + i + 1]
+            processed[i] = self._smooth(
+                recent, samples[i], self.smoothing_weights[len(recent)], axis=0
+            )
+
+        # SNR between raw and processed samples
+        snr = snr_batch(samples, processed)
+        snr[counts < 5] = 35.0
+
+        # Artifact bitmask
+        prev_activity = full[offset - 1:offset + n - 1, CHANNEL_INDEX['activity']] \
+            if offset else np.concatenate([[np.nan], samples[:-1, CHANNEL_INDEX['activity']]])
+        artifact_flags = artifact_flags_batch(samples, overall, prev_activity, counts)
+
+        quality_assessment = quality_assessment_batch(overall)
+
+        # Leave the row as if every sample had gone through process()
+        self.history_buffer.extend(row, samples)
+        self.window_stats.extend(row, samples)
 
-                    # Apply weighted moving average (more recent = more weight)
-                    weights = np.exp(np.linspace(-1, 0, len(recent_values)))
-                    weights /= weights.sum()
+        return {
+            'processed_data': processed,
+            'quality_score': overall,
+            'signal_to_noise_ratio': snr,
+            'noise_reduction_applied': noise_reduced,
+            'quality_metrics': quality,
+            'quality_assessment': quality_assessment,
+            'artifact_flags': artifact_flags
+        }
 
-                    smoothed_value = np.average(recent_values, weights=weights)
-                    processed_dict[signal_type] = round(float(smoothed_value), 2)
+    def clear(self, rows) -> None:
+        """Drop the history of ``rows``"""
+        self.history_buffer.clear(rows)
+        self.window_stats.clear(rows)
 
-        return BiosignalData(**processed_dict), noise_reduced
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.history_buffer.resize(rows)
+        self.window_stats.resize(rows)
 
-    def _calculate_snr(
-        self, raw_data: BiosignalData, processed_data: BiosignalData
-    ) -> float:
+    def _calculate_stability(self, rows: np.ndarray, counts: np.ndarray) -> np.ndarray:
         """
-        Calculate signal-to-noise ratio in dB
+        Calculate signal stability of every channel based on historical data
 
-        SNR = 10 * log10(signal_power / noise_power)
+        Returns:
+            Stability shaped [len(rows), 4], in SIGNAL_CHANNELS order
         """
-        if len(self.history_buffer) < 5:
-            return 35.0  # Assume good SNR with limited data
-
-        # Calculate noise as difference between raw and processed
-        raw_dict = raw_data.dict()
-        proc_dict = processed_data.dict()
-
-        noise_powers = []
-        signal_powers = []
-
-        for signal_type in ['heart_rate', 'spo2', 'temperature', 'activity']:
-            noise = abs(raw_dict[signal_type] - proc_dict[signal_type])
-            signal = abs(proc_dict[signal_type])
-
-            if signal > 0:
-                noise_power = noise ** 2
-                signal_power = signal ** 2
-
-                noise_powers.append(noise_power)
-                signal_powers.append(signal_power)
-
-        avg_signal_power = np.mean(signal_powers) if signal_powers else 1.0
-        avg_noise_power = np.mean(noise_powers) if noise_powers else 0.01
-
-        # Avoid division by zero
-        avg_noise_power = max(avg_noise_power, 0.001)
+        # Calculate coefficient of variation
+        mean_val = self.window_stats.mean(rows)
+        std_val = self.window_stats.std(rows)
 
-        snr_linear = avg_signal_power / avg_noise_power
-        snr_db = 10 * np.log10(snr_linear)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = std_val / mean_val
 
-        # Typical biosignal SNR range: 20-50 dB
-        return round(float(np.clip(snr_db, 15, 60)), 1)
+        # Lower CV = higher stability
+        stability = np.where(mean_val == 0, 0.5, np.clip(1.0 - cv, 0.3, 1.0))
+
+        # Assume good quality with limited history
+        stability[counts < 5] = 0.9
+        return stability
+
+    @staticmethod
+    def _smoothing_weights(length: int) -> np.ndarray:
+        """Exponential weights for a moving average (more recent = more weight)"""
+        weights = np.exp(np.linspace(-1, 0, length))
+        return weights / weights.sum()
+
+    @staticmethod
+    def _smooth(
+        recent: np.ndarray, sample: np.ndarray, weights: np.ndarray, axis: int
+    ) -> np.ndarray:
+        """
+        Weighted moving average of buffered samples plus the current one
 
-    def _detect_artifacts(
-        self, data: BiosignalData, quality_metrics: QualityMetrics
-    ) -> List[str]:
+        ``recent`` holds the history window along ``axis``; the sum is
+        written out explicitly so single samples and batches round alike.
         """
-        Detect common artifacts in biosignal data
+        shape = [1] * recent.ndim
+        shape[axis] = -1
+        history_weights = weights[:-1].reshape(shape)
+        smoothed = (recent * history_weights).sum(axis=axis) + weights[-1] * sample
+        return np.round(smoothed, 2)
 
-        Artifacts:
-        - Motion artifact: Sudden spikes in activity with heart rate changes
-        - Electrode noise: Poor contact quality
-        - Saturation: Values at extreme limits
-        - Dropout: Missing or zero values
+    def _apply_noise_reduction(
+        self, rows: np.ndarray, samples: np.ndarray,
+        overall: np.ndarray, counts: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        artifacts = []
-
-        # Check for saturation
-        if data.spo2 >= 100 or data.spo2 <= 90:
-            artifacts.append("SpO2 saturation")
-
-        if data.heart_rate >= 180 or data.heart_rate <= 40:
-            artifacts.append("Heart rate extreme")
-
-        if data.temperature >= 39 or data.temperature <= 35:
-            artifacts.append("Temperature extreme")
-
-        # Check for poor contact (low quality)
-        if quality_metrics.overall_quality < 0.5:
-            artifacts.append("Poor sensor contact")
-
-        # Check for motion artifact
-        if data.activity > 100 and len(self.history_buffer) > 2:
-            prev_activity = self.history_buffer[-1]['activity']
-            if abs(data.activity - prev_activity) > 50:
-                artifacts.append("Motion artifact")
-
-        return artifacts
-
-    def _assess_quality(self, quality_score: float) -> SignalQuality:
-        """Convert numeric quality score to categorical assessment"""
-        if quality_score >= 0.9:
-            return SignalQuality.EXCELLENT
-        elif quality_score >= 0.75:
-            return SignalQuality.GOOD
-        elif quality_score >= 0.5:
-            return SignalQuality.FAIR
-        else:
-            return SignalQuality.POOR
+        Apply adaptive noise reduction using wavelet-inspired smoothing
 
-    def _generate_processing_notes(
-        self, quality_score: float, snr: float,
+        Rows whose quality is below threshold are smoothed with their
+        buffered history once they have at least 3 samples.
+
+        Returns:
+            (processed samples [len(rows), 4], noise reduction applied [len(rows)])
+        """
+        noise_reduced = overall < self.quality_threshold
+        processed = samples.copy()
+
+        # Simulate wavelet denoising by smoothing with historical data,
+        # one weighted moving average per history length
+        smooth = np.flatnonzero(noise_reduced & (counts >= 3))
+        lengths = np.minimum(counts[smooth], self.smoothing_window)
+        for length in np.unique(lengths):
+            group = smooth[lengths == length]
+            recent = self.history_buffer.window(rows[group], int(length))
+            processed[group] = self._smooth(
+                recent, samples[group], self.smoothing_weights[length], axis=1
+            )
+
+        return processed, noise_reduced
+
+    @staticmethod
+    def generate_processing_notes(
+        quality_score: float, snr: float,
         noise_reduced: bool, artifacts: List[str]
     ) -> str:
         """Generate human-readable processing notes"""
@@ -0,0 +1,249 @@
+"""
+Pipeline Executor - runs pipeline CPU work off the asyncio event loop
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+from models.schemas import BiosignalData, StreamDataResponse
+from services.ble_simulator import BiosignalSample
+from services.fleet import FleetEngine
+from services.inference import MicroBatcher, result_features
+from services.pipeline import DevicePipeline, process_tick
+from utils.logger import get_processing_logger
+from utils.sharding import shard_for
+
+processing_logger = get_processing_logger()
+
+EXECUTOR_MODES = ('inline', 'thread', 'process')
+
+
+# ----------------------------------------------------------------------------
+# Worker process side
+# ----------------------------------------------------------------------------
+
+# Pipelines owned by this worker process, keyed by device_id, and the
+# engine holding their layer state (created on first use)
+_worker_pipelines: Dict[str, DevicePipeline] = {}
+_worker_engine: Optional[FleetEngine] = None
+
+
+def _process_tick_in_worker(
+    device_ids: List[str], samples: List[BiosignalData], skips: List[AbstractSet[str]]
+) -> Tuple[List[StreamDataResponse], List[tuple]]:
+    """Run a tick's samples through the worker's pipelines of the given devices"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = FleetEngine()
+
+    pipelines = []
+    for device_id in device_ids:
+        pipeline = _worker_pipelines.get(device_id)
+        if pipeline is None:
+            pipeline = DevicePipeline(device_id, _worker_engine)
+            _worker_pipelines[device_id] = pipeline
+        pipelines.append(pipeline)
+
+    # Processing logs live in memory, ship this tick's entries back
+    processing_logger.clear()
+    results = process_tick(pipelines, samples, skips)
+    return results, list(processing_logger.logs)
+
+
+def _warm_up_worker() -> int:
+    """No-op task that forces a worker process to start and import the layers"""
+    return len(_worker_pipelines)
+
+
+def _drop_in_worker(device_id: str) -> bool:
+    """Forget a device pipeline in this worker process and free its engine row"""
+    pipeline = _worker_pipelines.pop(device_id, None)
+    if pipeline is None:
+        return False
+    pipeline.engine.release(device_id)
+    return True
+
+
+# ----------------------------------------------------------------------------
+# Event loop side
+# ----------------------------------------------------------------------------
+
+class PipelineExecutor:
+    """
+    Runs ``DevicePipeline`` work according to a configurable mode
+
+    Modes:
+    - 'inline': on the event loop (no offloading)
+    - 'thread': in a thread pool; NumPy releases the GIL for the heavy
+      array work. The stream runner submits one tick at a time, and
+      ``FleetEngine.step`` holds the engine lock, so layer state is never
+      updated from two threads at once
+    - 'process': in single-process pools, one per worker, with device
+      affinity (crc32(device_id) % workers) so every device's stateful
+      layers live in exactly one worker process. Each worker runs its
+      share of a tick through its own FleetEngine, and the workers run
+      in parallel. The event loop side pipeline's engine row stays
+      unused; it only holds the cached result
+
+    In all modes the result is cached on the event loop side pipeline, so
+    readers never see a half-processed sample. Request handlers only read
+    that cached result and never run the layers themselves. With an ``inference``
+    batcher, the LIA condition of every result comes from one model
+    forward pass shared by all devices sampled around the same time.
+    """
+
+    def __init__(
+        self, mode: str = 'thread', workers: Optional[int] = None,
+        inference: Optional[MicroBatcher] = None
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {mode}")
+
+        self.mode = mode
+        self.workers = workers or multiprocessing.cpu_count()
+        self.inference = inference
+        self.thread_pool: Optional[ThreadPoolExecutor] = None
+        self.process_pools: List[ProcessPoolExecutor] = []
+
+        if mode == 'thread':
+            self.thread_pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="pipeline"
+            )
+        elif mode == 'process':
+            context = multiprocessing.get_context("spawn")
+            self.process_pools = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context)
+                for _ in range(self.workers)
+            ]
+
+    async def start(self) -> None:
+        """Start worker processes up front so the first samples are not delayed"""
+        if self.mode != 'process':
+            return
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, _warm_up_worker) for pool in self.process_pools
+        ))
+
+    def worker_for(self, device_id: str) -> int:
+        """Index of the worker process that owns a device"""
+        return shard_for(device_id, self.workers)
+
+    async def run(
+        self, pipeline: DevicePipeline, sample: BiosignalSample,
+        skip: AbstractSet[str] = frozenset()
+    ) -> StreamDataResponse:
+        """
+        Process a sample for a device and cache the result on its pipeline
+
+        Args:
+            pipeline: Event loop side pipeline of the device
+            sample: Sequenced sample from the device stream
+            skip: Optional outputs nobody reads (see fleet.OPTIONAL_OUTPUTS)
+
+        Returns:
+            Combined output of all layers
+        """
+        results = await self.run_tick([pipeline], sample, [skip])
+        return results[0]
+
+    async def run_tick(
+        self, pipelines: Sequence[DevicePipeline], sample: BiosignalSample,
+        skips: Sequence[AbstractSet[str]]
+    ) -> List[StreamDataResponse]:
+        """
+        Process one sample for several devices and cache each result on its pipeline
+
+        Args:
+            pipelines: Event loop side pipelines of distinct devices
+            sample: Sequenced sample all of them received
+            skips: Per pipeline, optional outputs nobody reads
+
+        Returns:
+            Combined output of all layers, per pipeline
+        """
+        loop = asyncio.get_running_loop()
+        samples = [sample.data] * len(pipelines)
+
+        if self.mode == 'inline':
+            results = process_tick(pipelines, samples, skips)
+        elif self.mode == 'thread':
+            results = await loop.run_in_executor(
+                self.thread_pool, process_tick, pipelines, samples, skips
+            )
+        else:
+            results = await self._run_in_workers(pipelines, samples, skips)
+
+        if self.inference is not None:
+            await asyncio.gather(*(
+                self._apply_model(pipeline, result)
+                for pipeline, result in zip(pipelines, results)
+                if result.lia_insights is not None
+            ))
+
+        for pipeline, result, skip in zip(pipelines, results, skips):
+            pipeline.record_result(sample.sequence, result, skip)
+        return results
+
+    async def _run_in_workers(
+        self, pipelines: Sequence[DevicePipeline], samples: List[BiosignalData],
+        skips: Sequence[AbstractSet[str]]
+    ) -> List[StreamDataResponse]:
+        """Split a tick by device affinity and run the shares in parallel"""
+        loop = asyncio.get_running_loop()
+        shares: Dict[int, List[int]] = {}
+        for i, pipeline in enumerate(pipelines):
+            shares.setdefault(self.worker_for(pipeline.device_id), []).append(i)
+
+        outputs = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.process_pools[worker], _process_tick_in_worker,
+                [pipelines[i].device_id for i in indices],
+                [samples[i] for i in indices],
+                [skips[i] for i in indices]
+            )
+            for worker, indices in shares.items()
+        ))
+
+        results: List[Optional[StreamDataResponse]] = [None] * len(pipelines)
+        for indices, (worker_results, logs) in zip(shares.values(), outputs):
+            processing_logger.logs.extend(logs)
+            for i, result in zip(indices, worker_results):
+                results[i] = result
+
+        for pipeline in pipelines:
+            pipeline.samples_processed += 1
+        return results
+
+    async def _apply_model(self, pipeline: DevicePipeline, result: StreamDataResponse) -> None:
+        """Replace a result's rule-based condition with the batched model prediction"""
+        probabilities = await self.inference.predict(result_features(result))
+        result.lia_insights = pipeline.lia_engine.apply_prediction(
+            result.lia_insights, probabilities
+        )
+
+    async def release(self, device_id: str) -> None:
+        """Drop worker-side state of an evicted device"""
+        if self.mode != 'process':
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = self.process_pools[self.worker_for(device_id)]
+        await loop.run_in_executor(pool, _drop_in_worker, device_id)
+
+    async def close(self) -> None:
+        """Finish pending model predictions, then stop all workers"""
+        if self.inference is not None:
+            await self.inference.close()
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop all worker threads and processes"""
+        if self.thread_pool:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        # Wait for worker processes so none outlive the server
+        for pool in self.process_pools:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,222 @@
+"""
+Fleet Engine - struct-of-arrays layer state of every device
+Runs the samples of all devices sampled on a tick through
+Clarity™ → iFRS™ → Timesystems™ → LIA in one vectorized pass
+"""
+
+import threading
+from datetime import datetime
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.schemas import BiosignalData, SIGNAL_CHANNELS, StreamDataResponse
+from services.clarity import ClarityLayer
+from services.ifrs import iFRSLayer
+from services.timesystems import TimesystemsLayer
+from services.lia_integration import LIAEngine
+from utils.logger import get_processing_logger
+from utils.projection import FieldSelection
+
+processing_logger = get_processing_logger()
+
+# Response fields the pipeline only computes while someone reads them
+OPTIONAL_OUTPUTS: Tuple[str, ...] = (
+    *(f"timesystems_layer.{name}" for name in TimesystemsLayer.OPTIONAL_OUTPUTS),
+    "lia_insights",
+    *(f"lia_insights.{name}" for name in LIAEngine.OPTIONAL_OUTPUTS),
+)
+
+
+def skipped_outputs(selections: Iterable[Optional[FieldSelection]]) -> FrozenSet[str]:
+    """
+    OPTIONAL_OUTPUTS that none of the given field selections need
+
+    A selection of None (the full response) needs everything; with no
+    readers at all every optional output is skipped.
+    """
+    needed = set()
+    for selection in selections:
+        if selection is None:
+            return frozenset()
+        needed.update(path for path in OPTIONAL_OUTPUTS if selection.includes(path))
+    return frozenset(OPTIONAL_OUTPUTS).difference(needed)
+
+
+def _layer_skips(skip: AbstractSet[str], layer: str) -> FrozenSet[str]:
+    """Names of a layer's skipped outputs, e.g. 'pattern_recognition'"""
+    prefix = f"{layer}."
+    return frozenset(path[len(prefix):] for path in skip if path.startswith(prefix))
+
+
+class FleetEngine:
+    """
+    Layer state of many devices as rows of [devices, window] arrays
+
+    Every layer keeps one row of state per device: signal and interval
+    windows, the stability, HRV and trend accumulators and the cached
+    spectral estimates. step() takes one sample for each of any number of
+    devices; Clarity quality scoring and noise reduction, the HRV
+    accumulators, band and rhythm rules, trend slopes, consistency,
+    circadian alignment and the LIA decision tables each run as one array
+    operation across all of them. Per-device work is left to the periodic
+    spectral recomputes (only for the rows due for one) and to building
+    each device's response.
+
+    A device gets a row on its first sample and keeps it until release().
+    Freed rows are reused, and the arrays double in size when every row is
+    taken. The engine lock serializes step() and release(), so the arrays
+    are never updated from two threads at once.
+    """
+
+    def __init__(
+        self, capacity: int = 64, fft_hop_size: int = 10,
+        band_power_method: str = 'lomb', periodicity_interval: int = 10
+    ):
+        self.capacity = capacity
+        self.clarity = ClarityLayer(rows=capacity)
+        self.ifrs = iFRSLayer(fft_hop_size, band_power_method, rows=capacity)
+        self.timesystems = TimesystemsLayer(periodicity_interval, rows=capacity)
+        self.lia_engine = LIAEngine()
+
+        # Row of every device; free rows are handed out lowest first
+        self.slots: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self.slots
+
+    def slot(self, device_id: str) -> int:
+        """Row of a device, assigned on first use (call with the lock held)"""
+        slot = self.slots.get(device_id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self.slots[device_id] = slot
+        return slot
+
+    def release(self, device_id: str) -> bool:
+        """Forget a device's layer state and free its row"""
+        with self.lock:
+            slot = self.slots.pop(device_id, None)
+            if slot is None:
+                return False
+
+            for layer in (self.clarity, self.ifrs, self.timesystems):
+                layer.clear([slot])
+            self._free.append(slot)
+            return True
+
+    def _grow(self) -> None:
+        """Double the number of rows"""
+        capacity = self.capacity * 2
+        for layer in (self.clarity, self.ifrs, self.timesystems):
+            layer.resize(capacity)
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def step(
+        self,
+        device_ids: Sequence[str],
+        samples: Sequence[BiosignalData],
+        skips: Sequence[AbstractSet[str]],
+        timestamp: Optional[datetime] = None
+    ) -> List[StreamDataResponse]:
+        """
+        Run one sample per device through all layers
+
+        Args:
+            device_ids: Distinct devices that received a sample
+            samples: Raw sample of each device
+            skips: Per device, the OPTIONAL_OUTPUTS to leave out of its result
+            timestamp: Time the samples were taken (defaults to now)
+
+        Returns:
+            Combined output of all layers, per device
+        """
+        timestamp = timestamp or datetime.now()
+        raw = np.array(
+            [(s.heart_rate, s.spo2, s.temperature, s.activity) for s in samples],
+            dtype=np.float64
+        ).reshape(len(samples), len(SIGNAL_CHANNELS))
+        timesystems_skips = [_layer_skips(skip, 'timesystems_layer') for skip in skips]
+        analyzed = [i for i, skip in enumerate(skips) if 'lia_insights' not in skip]
+
+        with self.lock:
+            rows = np.array([self.slot(device_id) for device_id in device_ids], dtype=np.intp)
+
+            # Clarity™ (signal quality & noise reduction), iFRS™ (frequency
+            # analysis) and Timesystems™ (temporal analysis) for every row
+            clarity = self.clarity.process(rows, raw)
+            ifrs = self.ifrs.process(rows, clarity['processed_data'])
+            timesystems = self.timesystems.process(
+                rows, ifrs['enhanced_data'], timestamp,
+                [TimesystemsLayer.needs_patterns(skip) for skip in timesystems_skips]
+            )
+
+        # LIA insights for the devices whose readers want them
+        lia_insights: List[Optional[Dict]] = [None] * len(rows)
+        if analyzed:
+            features = self.lia_engine.features(raw, clarity, ifrs, timesystems)[analyzed]
+            insights = self.lia_engine.analyze(
+                features, [_layer_skips(skips[i], 'lia_insights') for i in analyzed]
+            )
+            for i, insight in zip(analyzed, insights):
+                lia_insights[i] = insight
+
+        # Per-device layer records, validated once in the response
+        responses = []
+        for device_id, sample, clarity_result, ifrs_result, timesystems_result, insight in zip(
+            device_ids, samples,
+            self.clarity.results(clarity),
+            self.ifrs.results(ifrs),
+            self.timesystems.results(timesystems, timesystems_skips),
+            lia_insights
+        ):
+            self._log(device_id, clarity_result, ifrs_result, timesystems_result, insight)
+            responses.append(StreamDataResponse(
+                timestamp=timestamp,
+                raw_signals=sample,
+                clarity_layer=clarity_result,
+                ifrs_layer=ifrs_result,
+                timesystems_layer=timesystems_result,
+                lia_insights=insight
+            ))
+
+        return responses
+
+    @staticmethod
+    def _log(
+        device_id: str, clarity_result: Dict, ifrs_result: Dict,
+        timesystems_result: Dict, lia_insights: Optional[Dict]
+    ) -> None:
+        """Processing log entries of one device's sample"""
+        processing_logger.info(
+            "CLARITY_LAYER | device_id=%s | quality=%.2f | snr=%.1fdB | noise_reduced=%s",
+            device_id, clarity_result['quality_score'],
+            clarity_result['signal_to_noise_ratio'], clarity_result['noise_reduction_applied']
+        )
+        processing_logger.info(
+            "IFRS_LAYER | device_id=%s | dominant_freq=%.2fHz | "
+            "heart_rate_variability=%.1f | rhythm=%s",
+            device_id, ifrs_result['dominant_frequency'],
+            ifrs_result['hrv_features'].hrv_score, ifrs_result['rhythm_classification']
+        )
+        processing_logger.info(
+            "TIMESYSTEMS_LAYER | device_id=%s | pattern=%s | circadian_phase=%s | "
+            "temporal_consistency=%.2f",
+            device_id, timesystems_result['pattern_type'],
+            timesystems_result['circadian_phase'], timesystems_result['temporal_consistency']
+        )
+        if lia_insights is not None:
+            processing_logger.info(
+                "LIA_ENGINE | device_id=%s | condition=%s | confidence=%.3f | wellness_score=%.1f",
+                device_id, lia_insights['condition'],
+                lia_insights['confidence'], lia_insights['wellness_score']
+            )
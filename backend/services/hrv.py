@@ -0,0 +1,118 @@
+"""
+Streaming Heart Rate Variability accumulator
+"""
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer, resize_rows
+from utils.running_stats import SlidingWindowStats
+
+
+class StreamingHRV:
+    """
+    Time-domain HRV over the last ``window`` R-R intervals, updated in O(1)
+
+    Keeps a running mean/variance of the intervals (SDNN), a windowed sum
+    of squared successive differences (RMSSD) and the count of successive
+    differences above 50 ms (pNN50). Each new interval adds its difference
+    to the previous one, and the difference between the two oldest
+    intervals is removed once the window is full. Non-zero differences are
+    counted exactly so a flat window reports an RMSSD of exactly zero.
+
+    Every row is one device's interval stream; a push updates all the
+    given rows in one set of array operations.
+    """
+
+    def __init__(self, window: int = 50, rows: int = 1, resync_interval: int = 1000):
+        self.window = window
+        self.resync_interval = resync_interval
+        self.intervals = RingBuffer(window, 1, rows)
+        self.stats = SlidingWindowStats(window, 1, rows, resync_interval=resync_interval)
+
+        self._sum_sq_diffs = np.zeros(rows)
+        self._nn50_count = np.zeros(rows, dtype=np.int64)
+        self._nonzero_count = np.zeros(rows, dtype=np.int64)
+        self._pushes = np.zeros(rows, dtype=np.int64)
+
+    def push(self, rows, rr_intervals) -> None:
+        """Add an R-R interval in ms to each of ``rows``"""
+        rows = np.asarray(rows, dtype=np.intp)
+        rr_intervals = np.asarray(rr_intervals, dtype=np.float64).reshape(len(rows))
+        count = self.intervals.count[rows]
+
+        # Difference to the previous interval enters the window
+        entering = count > 0
+        diff = rr_intervals - self.intervals.latest(rows)[:, 0]
+        sum_sq_diffs = self._sum_sq_diffs[rows] + np.where(entering, diff * diff, 0.0)
+        nn50_count = self._nn50_count[rows] + (entering & (np.abs(diff) > 50))
+        nonzero_count = self._nonzero_count[rows] + (entering & (diff != 0))
+
+        # Difference between the two oldest intervals leaves a full window
+        leaving = count == self.window
+        diff = self.intervals.ago(rows, self.window - 1)[:, 0] - self.intervals.ago(rows, self.window)[:, 0]
+        sum_sq_diffs -= np.where(leaving, diff * diff, 0.0)
+        nn50_count -= leaving & (np.abs(diff) > 50)
+        nonzero_count -= leaving & (diff != 0)
+
+        self._sum_sq_diffs[rows] = np.where(nonzero_count == 0, 0.0, sum_sq_diffs)
+        self._nn50_count[rows] = nn50_count
+        self._nonzero_count[rows] = nonzero_count
+
+        self.intervals.append(rows, rr_intervals)
+        self.stats.push(rows, rr_intervals)
+
+        self._pushes[rows] += 1
+        due = rows[self._pushes[rows] % self.resync_interval == 0]
+        if due.size:
+            self.resync(due)
+
+    def resync(self, rows) -> None:
+        """Recompute the successive-difference sums of ``rows`` exactly from their windows"""
+        rows = np.asarray(rows, dtype=np.intp)
+        count = self.intervals.count[rows]
+        diffs = np.diff(self.intervals.window(rows, self.window)[:, :, 0], axis=1)
+
+        # Difference j is between samples j and j + 1, both must be real
+        real = np.arange(self.window - 1) >= self.window - count[:, None]
+        diffs = np.where(real, diffs, 0.0)
+        self._sum_sq_diffs[rows] = np.sum(diffs ** 2, axis=1)
+        self._nn50_count[rows] = np.sum(np.abs(diffs) > 50, axis=1)
+        self._nonzero_count[rows] = np.count_nonzero(diffs, axis=1)
+
+    def clear(self, rows) -> None:
+        """Drop the intervals of ``rows``"""
+        self.intervals.clear(rows)
+        self.stats.clear(rows)
+        self._sum_sq_diffs[rows] = 0.0
+        self._nn50_count[rows] = 0
+        self._nonzero_count[rows] = 0
+        self._pushes[rows] = 0
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.intervals.resize(rows)
+        self.stats.resize(rows)
+        self._sum_sq_diffs = resize_rows(self._sum_sq_diffs, rows)
+        self._nn50_count = resize_rows(self._nn50_count, rows)
+        self._nonzero_count = resize_rows(self._nonzero_count, rows)
+        self._pushes = resize_rows(self._pushes, rows)
+
+    def count(self, rows) -> np.ndarray:
+        """Number of intervals in each row's window"""
+        return self.intervals.count[rows]
+
+    def sdnn(self, rows) -> np.ndarray:
+        """Standard deviation of NN intervals (ms)"""
+        return self.stats.std(rows)[:, 0]
+
+    def rmssd(self, rows) -> np.ndarray:
+        """Root mean square of successive differences (ms)"""
+        count = self.intervals.count[rows]
+        rmssd = np.sqrt(np.maximum(self._sum_sq_diffs[rows], 0.0) / np.maximum(count - 1, 1))
+        return np.where(count >= 2, rmssd, 0.0)
+
+    def pnn50(self, rows) -> np.ndarray:
+        """Percentage of successive differences above 50 ms"""
+        count = self.intervals.count[rows]
+        pnn50 = self._nn50_count[rows] / np.maximum(count - 1, 1) * 100
+        return np.where(count >= 2, pnn50, 0.0)
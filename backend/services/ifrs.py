@@ -4,13 +4,25 @@ Proprietary frequency domain analysis for biosignals
 """
 
 import numpy as np
-from typing import Dict
-import random
+from typing import Dict, List, Tuple
 
-from models.schemas import (
-    BiosignalData, iFRSLayerResult, FrequencyBands,
-    HRVFeatures, RhythmClassification
-)
+from models.schemas import RhythmClassification, SIGNAL_CHANNELS
+from models.internal import FrequencyBandsRecord, HRVFeaturesRecord, SignalRecord
+from services.spectral import SpectralEngine, BandPowerEstimator
+from services.hrv import StreamingHRV
+from utils.ring_buffer import RingBuffer
+from utils.rounding import round_half
+
+# Column of the heart rate channel in the layer's input
+HEART_RATE = SIGNAL_CHANNELS.index('heart_rate')
+
+# Rhythm classes by the integer code process() returns (the LIA tables'
+# rhythm feature uses the same codes)
+RHYTHMS = tuple(RhythmClassification)
+
+# Results before enough R-R intervals are buffered
+DEFAULT_FREQUENCY_BANDS = (45.0, 35.0, 20.0, 1.75)  # vlf %, lf %, hf %, lf/hf
+DEFAULT_HRV_FEATURES = (42.0, 65.0, 25.0, 75.0)  # rmssd, sdnn, pnn50, hrv_score
 
 
 class iFRSLayer:
@@ -24,56 +36,77 @@ class iFRSLayer:
     - Rhythm classification
     - Respiratory rate estimation
     - Frequency stability assessment
+
+    Every row of the layer's state is one device's heart rate and R-R
+    interval history. process() takes one sample for each of any number
+    of rows; HRV, band and rhythm rules run as array operations across
+    them, and spectra are only recomputed for the rows due for one.
     """
 
-    def __init__(self):
+    def __init__(self, fft_hop_size: int = 10, band_power_method: str = 'lomb', rows: int = 1):
         self.sample_rate = 100  # Hz
         self.buffer_size = 256  # FFT window size
-        self.hr_buffer = []
-        self.rr_intervals = []  # R-R intervals for HRV
+        self.hr_buffer = RingBuffer(self.buffer_size, 1, rows)
+        self.rr_intervals = RingBuffer(100, 1, rows)  # R-R intervals for band powers
+
+        # Windowed HRV accumulator over the most recent 50 intervals
+        self.hrv = StreamingHRV(window=50, rows=rows)
+
+        # Spectrum over the last 128 samples, refreshed every fft_hop_size samples
+        self.spectral_engine = SpectralEngine(
+            self.sample_rate, window_size=128, min_samples=32, hop_size=fft_hop_size, rows=rows
+        )
 
-    def process(self, data: BiosignalData) -> Dict:
+        # VLF/LF/HF powers from the R-R series, refreshed on the same cadence
+        self.band_power_estimator = BandPowerEstimator(
+            method=band_power_method, update_interval=fft_hop_size, min_intervals=10, rows=rows
+        )
+
+    def process(self, rows, data: np.ndarray) -> Dict[str, np.ndarray]:
         """
-        Process biosignal data through iFRS™ layer
+        Process one sample per row through iFRS™ layer
 
         Args:
-            data: Clarity-enhanced biosignal data
+            rows: Distinct row indices (devices) that received a sample
+            data: Clarity-enhanced samples shaped [len(rows), 4] in SIGNAL_CHANNELS order
 
         Returns:
-            iFRS layer processing results
+            Column arrays, one entry per row:
+            - enhanced_data: [N, 4]
+            - dominant_frequency: [N] Hz
+            - frequency_bands: [N, 4] vlf, lf, hf (% of total power), lf_hf_ratio
+            - hrv_features: [N, 4] rmssd, sdnn, pnn50, hrv_score
+            - rhythm_classification: [N] index into RHYTHMS
+            - respiratory_rate: [N] breaths per minute
+            - frequency_stability: [N]
         """
+        rows = np.asarray(rows, dtype=np.intp)
+        data = np.asarray(data, dtype=np.float64).reshape(len(rows), len(SIGNAL_CHANNELS))
+        heart_rate = data[:, HEART_RATE]
+
         # Add to heart rate buffer
-        self.hr_buffer.append(data.heart_rate)
-        if len(self.hr_buffer) > self.buffer_size:
-            self.hr_buffer.pop(0)
+        self.hr_buffer.append(rows, heart_rate)
 
         # Simulate R-R intervals from heart rate
-        self._update_rr_intervals(data.heart_rate)
+        self._update_rr_intervals(rows, heart_rate)
 
         # Perform frequency analysis
-        dominant_freq, frequency_stability = self._analyze_frequency()
+        dominant_freq, frequency_stability = self._analyze_frequency(rows)
 
         # Calculate frequency band powers
-        frequency_bands = self._calculate_frequency_bands()
+        frequency_bands = self._calculate_frequency_bands(rows)
 
         # Extract HRV features
-        hrv_features = self._extract_hrv_features()
+        hrv_features = self._extract_hrv_features(rows)
 
         # Classify rhythm
-        rhythm_classification = self._classify_rhythm(
-            data.heart_rate, hrv_features, frequency_bands
-        )
+        rhythm_classification = self._classify_rhythm(heart_rate, hrv_features, frequency_bands)
 
         # Estimate respiratory rate
         respiratory_rate = self._estimate_respiratory_rate(frequency_bands)
 
         # Apply frequency-based enhancement (simulate)
-        enhanced_data = self._enhance_signals(data)
-
-        # Generate processing notes
-        notes = self._generate_processing_notes(
-            dominant_freq, rhythm_classification, hrv_features
-        )
+        enhanced_data = self._enhance_signals(rows, data)
 
         return {
             'enhanced_data': enhanced_data,
@@ -82,177 +115,173 @@ class iFRSLayer:
             'hrv_features': hrv_features,
             'rhythm_classification': rhythm_classification,
             'respiratory_rate': respiratory_rate,
-            'frequency_stability': frequency_stability,
-            'processing_notes': notes
+            'frequency_stability': frequency_stability
         }
 
-    def _update_rr_intervals(self, heart_rate: float):
+    @staticmethod
+    def results(columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Per-row layer results (the response fields) from process() columns"""
+        return [
+            {
+                'enhanced_data': SignalRecord(*enhanced),
+                'dominant_frequency': dominant_freq,
+                'frequency_bands': FrequencyBandsRecord(*bands),
+                'hrv_features': HRVFeaturesRecord(*hrv),
+                'rhythm_classification': RHYTHMS[rhythm],
+                'respiratory_rate': respiratory_rate,
+                'frequency_stability': frequency_stability,
+                'processing_notes': None
+            }
+            for enhanced, dominant_freq, bands, hrv, rhythm, respiratory_rate, frequency_stability in zip(
+                columns['enhanced_data'].tolist(),
+                columns['dominant_frequency'].tolist(),
+                columns['frequency_bands'].tolist(),
+                columns['hrv_features'].tolist(),
+                columns['rhythm_classification'].tolist(),
+                columns['respiratory_rate'].tolist(),
+                columns['frequency_stability'].tolist()
+            )
+        ]
+
+    def clear(self, rows) -> None:
+        """Drop the history of ``rows``"""
+        self.hr_buffer.clear(rows)
+        self.rr_intervals.clear(rows)
+        self.hrv.clear(rows)
+        self.spectral_engine.clear(rows)
+        self.band_power_estimator.clear(rows)
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.hr_buffer.resize(rows)
+        self.rr_intervals.resize(rows)
+        self.hrv.resize(rows)
+        self.spectral_engine.resize(rows)
+        self.band_power_estimator.resize(rows)
+
+    def _update_rr_intervals(self, rows: np.ndarray, heart_rate: np.ndarray):
         """
-        Update R-R intervals buffer from heart rate
+        Update R-R interval buffers from heart rate
         R-R interval = 60,000ms / heart_rate
         """
-        if heart_rate > 0:
-            rr_interval = 60000.0 / heart_rate  # in milliseconds
-            self.rr_intervals.append(rr_interval)
-
-            # Keep only recent intervals
-            if len(self.rr_intervals) > 100:
-                self.rr_intervals.pop(0)
+        beating = heart_rate > 0
+        rows = rows[beating]
+        rr_intervals = 60000.0 / heart_rate[beating]  # in milliseconds
+        self.rr_intervals.append(rows, rr_intervals)
+        self.hrv.push(rows, rr_intervals)
 
-    def _analyze_frequency(self) -> tuple[float, float]:
+    def _analyze_frequency(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         Analyze frequency content using FFT
 
+        The spectral engine reuses its cached window/frequency bins and
+        only recomputes a row's spectrum every hop, returning the cached
+        result in between.
+
         Returns:
-            (dominant_frequency, frequency_stability)
+            (dominant_frequency, frequency_stability) per row
         """
-        if len(self.hr_buffer) < 32:
-            return 1.25, 0.85  # Default values
-
-        # Apply FFT
-        signal = np.array(self.hr_buffer[-128:])  # Use recent samples
-        signal = signal - np.mean(signal)  # Remove DC component
-
-        # Apply Hanning window to reduce spectral leakage
-        window = np.hanning(len(signal))
-        signal_windowed = signal * window
-
-        # Compute FFT
-        fft_result = np.fft.fft(signal_windowed)
-        fft_magnitude = np.abs(fft_result[:len(fft_result)//2])
+        result, valid = self.spectral_engine.update(rows, self.hr_buffer)
 
-        # Frequency bins
-        freqs = np.fft.fftfreq(len(signal), 1.0/self.sample_rate)
-        freqs = freqs[:len(freqs)//2]
+        # Default values until a row has enough samples
+        dominant_freq = np.where(valid, result[:, 0], 1.25)
+        frequency_stability = np.where(valid, result[:, 1], 0.85)
+        return dominant_freq, frequency_stability
 
-        # Find dominant frequency (exclude DC component)
-        if len(fft_magnitude) > 1:
-            dominant_idx = np.argmax(fft_magnitude[1:]) + 1
-            dominant_freq = abs(float(freqs[dominant_idx]))
-        else:
-            dominant_freq = 1.25
-
-        # Calculate frequency stability (how concentrated is power)
-        total_power = np.sum(fft_magnitude ** 2)
-        dominant_power = fft_magnitude[dominant_idx] ** 2 if len(fft_magnitude) > 1 else total_power
-
-        if total_power > 0:
-            frequency_stability = dominant_power / total_power
-        else:
-            frequency_stability = 0.5
-
-        frequency_stability = min(1.0, max(0.3, frequency_stability))
-
-        return round(dominant_freq, 2), round(float(frequency_stability), 2)
-
-    def _calculate_frequency_bands(self) -> FrequencyBands:
+    def _calculate_frequency_bands(self, rows: np.ndarray) -> np.ndarray:
         """
         Calculate power in standard HRV frequency bands
 
         VLF: Very Low Frequency (0.003-0.04 Hz)
         LF: Low Frequency (0.04-0.15 Hz) - sympathetic + parasympathetic
         HF: High Frequency (0.15-0.4 Hz) - parasympathetic (respiratory)
+
+        Band powers come from a Lomb-Scargle periodogram of the R-R series
+        (or Welch's method on the resampled series)
+
+        Returns:
+            [len(rows), 4] vlf, lf, hf (% of total power), lf_hf_ratio
         """
-        if len(self.rr_intervals) < 10:
-            # Return default values
-            return FrequencyBands(
-                vlf=45.0,
-                lf=35.0,
-                hf=20.0,
-                lf_hf_ratio=1.75
-            )
+        powers, valid = self.band_power_estimator.update(rows, self.rr_intervals)
+        total_power = powers.sum(axis=1)
+        vlf_power, lf_power, hf_power = powers.T
 
-        # Simulate frequency band powers
-        # In real implementation, this would use Welch's method or Lomb-Scargle
-        vlf_power = random.uniform(30, 60)
-        lf_power = random.uniform(25, 50)
-        hf_power = random.uniform(15, 35)
-
-        # Normalize to percentages
-        total_power = vlf_power + lf_power + hf_power
-        vlf_pct = (vlf_power / total_power) * 100
-        lf_pct = (lf_power / total_power) * 100
-        hf_pct = (hf_power / total_power) * 100
-
-        # Calculate LF/HF ratio (autonomic balance indicator)
-        lf_hf_ratio = lf_power / hf_power if hf_power > 0 else 1.5
-
-        return FrequencyBands(
-            vlf=round(vlf_pct, 1),
-            lf=round(lf_pct, 1),
-            hf=round(hf_pct, 1),
-            lf_hf_ratio=round(lf_hf_ratio, 2)
-        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Normalize to percentages
+            percentages = powers / total_power[:, None] * 100
+
+            # Calculate LF/HF ratio (autonomic balance indicator)
+            lf_hf_ratio = np.where(hf_power > 0, lf_power / hf_power, 1.5)
+
+        bands = np.column_stack([round_half(percentages, 1), round_half(lf_hf_ratio, 2)])
 
-    def _extract_hrv_features(self) -> HRVFeatures:
+        # Default values without band powers
+        return np.where((valid & (total_power > 0))[:, None], bands, DEFAULT_FREQUENCY_BANDS)
+
+    def _extract_hrv_features(self, rows: np.ndarray) -> np.ndarray:
         """
         Extract Heart Rate Variability features
 
         RMSSD: Root Mean Square of Successive Differences
         SDNN: Standard Deviation of NN intervals
         pNN50: Percentage of successive NN intervals that differ by > 50ms
-        """
-        if len(self.rr_intervals) < 5:
-            return HRVFeatures(
-                rmssd=42.0,
-                sdnn=65.0,
-                pnn50=25.0,
-                hrv_score=75.0
-            )
 
-        rr_array = np.array(self.rr_intervals[-50:])  # Use recent data
+        All three are read from the streaming accumulator over the last
+        50 intervals instead of being recomputed from the buffer.
 
+        Returns:
+            [len(rows), 4] rmssd, sdnn, pnn50, hrv_score
+        """
         # SDNN: Standard deviation of NN intervals
-        sdnn = float(np.std(rr_array))
+        sdnn = self.hrv.sdnn(rows)
 
         # RMSSD: Root mean square of successive differences
-        successive_diffs = np.diff(rr_array)
-        rmssd = float(np.sqrt(np.mean(successive_diffs ** 2)))
+        rmssd = self.hrv.rmssd(rows)
 
         # pNN50: Percentage of intervals > 50ms different from previous
-        nn50_count = np.sum(np.abs(successive_diffs) > 50)
-        pnn50 = (nn50_count / len(successive_diffs)) * 100 if len(successive_diffs) > 0 else 0
+        pnn50 = self.hrv.pnn50(rows)
 
         # Calculate HRV score (0-100)
         # Higher RMSSD and SDNN generally indicate better HRV
-        hrv_score = min(100, (rmssd / 2 + sdnn / 2))
+        hrv_score = np.minimum(100, rmssd / 2 + sdnn / 2)
 
-        return HRVFeatures(
-            rmssd=round(rmssd, 1),
-            sdnn=round(sdnn, 1),
-            pnn50=round(float(pnn50), 1),
-            hrv_score=round(hrv_score, 1)
-        )
+        features = round_half(np.column_stack([rmssd, sdnn, pnn50, hrv_score]), 1)
+
+        # Default values with fewer than 5 intervals
+        return np.where((self.hrv.count(rows) >= 5)[:, None], features, DEFAULT_HRV_FEATURES)
 
     def _classify_rhythm(
-        self, heart_rate: float, hrv: HRVFeatures, freq_bands: FrequencyBands
-    ) -> RhythmClassification:
+        self, heart_rate: np.ndarray, hrv: np.ndarray, freq_bands: np.ndarray
+    ) -> np.ndarray:
         """
         Classify heart rhythm based on rate, variability, and frequency analysis
-        """
-        # Normal sinus rhythm: HR 60-100, good HRV
-        if 60 <= heart_rate <= 100 and hrv.hrv_score >= 60:
-            return RhythmClassification.NORMAL_SINUS
-
-        # Athletic: Low HR, high HRV
-        if heart_rate < 60 and hrv.hrv_score >= 70:
-            return RhythmClassification.ATHLETIC
-
-        # Elevated: High HR
-        if heart_rate > 100:
-            return RhythmClassification.ELEVATED
-
-        # Low: Low HR without high HRV
-        if heart_rate < 60:
-            return RhythmClassification.LOW
-
-        # Irregular: Low HRV or abnormal frequency patterns
-        if hrv.hrv_score < 40 or freq_bands.lf_hf_ratio > 3.0:
-            return RhythmClassification.IRREGULAR
 
-        return RhythmClassification.NORMAL_SINUS
+        Returns:
+            Index into RHYTHMS per row (the first rule that holds)
+        """
+        hrv_score = hrv[:, 3]
+        lf_hf_ratio = freq_bands[:, 3]
+
+        rules = [
+            # Normal sinus rhythm: HR 60-100, good HRV
+            ((60 <= heart_rate) & (heart_rate <= 100) & (hrv_score >= 60),
+             RhythmClassification.NORMAL_SINUS),
+            # Athletic: Low HR, high HRV
+            ((heart_rate < 60) & (hrv_score >= 70), RhythmClassification.ATHLETIC),
+            # Elevated: High HR
+            (heart_rate > 100, RhythmClassification.ELEVATED),
+            # Low: Low HR without high HRV
+            (heart_rate < 60, RhythmClassification.LOW),
+            # Irregular: Low HRV or abnormal frequency patterns
+            ((hrv_score < 40) | (lf_hf_ratio > 3.0), RhythmClassification.IRREGULAR)
+        ]
+        return np.select(
+            [mask for mask, _ in rules],
+            [RHYTHMS.index(rhythm) for _, rhythm in rules],
+            default=RHYTHMS.index(RhythmClassification.NORMAL_SINUS)
+        )
 
-    def _estimate_respiratory_rate(self, freq_bands: FrequencyBands) -> float:
+    def _estimate_respiratory_rate(self, freq_bands: np.ndarray) -> np.ndarray:
         """
         Estimate respiratory rate from HF band (respiratory sinus arrhythmia)
 
@@ -264,14 +293,13 @@ class iFRSLayer:
         base_rr = 16.0  # breaths per minute
 
         # Add variation based on HF component
-        variation = (freq_bands.hf - 25) * 0.1
+        variation = (freq_bands[:, 2] - 25) * 0.1
 
-        respiratory_rate = base_rr + variation
-        respiratory_rate = np.clip(respiratory_rate, 10, 25)
+        respiratory_rate = np.clip(base_rr + variation, 10, 25)
 
-        return round(float(respiratory_rate), 1)
+        return round_half(respiratory_rate, 1)
 
-    def _enhance_signals(self, data: BiosignalData) -> BiosignalData:
+    def _enhance_signals(self, rows: np.ndarray, data: np.ndarray) -> np.ndarray:
         """
         Apply frequency-based signal enhancement
 
@@ -280,18 +308,17 @@ class iFRSLayer:
         - Remove specific frequency artifacts
         - Enhance signal features in specific bands
         """
-        # For simulation, apply slight smoothing
-        enhanced_dict = data.dict()
-
-        if len(self.hr_buffer) >= 3:
-            # Smooth heart rate using frequency domain knowledge
-            recent_hr = self.hr_buffer[-3:]
-            enhanced_dict['heart_rate'] = round(float(np.mean(recent_hr)), 2)
-
-        return BiosignalData(**enhanced_dict)
-
-    def _generate_processing_notes(
-        self, dominant_freq: float, rhythm: RhythmClassification, hrv: HRVFeatures
+        # For simulation, smooth heart rate over the last 3 samples once
+        # a row has them
+        enhanced = data.copy()
+        smooth = self.hr_buffer.count[rows] >= 3
+        recent_hr = self.hr_buffer.window(rows[smooth], 3)[:, :, 0]
+        enhanced[smooth, HEART_RATE] = round_half(np.mean(recent_hr, axis=1), 2)
+        return enhanced
+
+    @staticmethod
+    def generate_processing_notes(
+        dominant_freq: float, rhythm: RhythmClassification, hrv: HRVFeaturesRecord
     ) -> str:
         """Generate human-readable processing notes"""
         notes = []
@@ -300,6 +327,6 @@ class iFRSLayer:
         notes.append(f"Rhythm: {rhythm.value.replace('_', ' ').title()}")
         notes.append(f"HRV Score: {hrv.hrv_score:.1f}/100")
         notes.append(f"RMSSD: {hrv.rmssd:.1f}ms, SDNN: {hrv.sdnn:.1f}ms")
-        notes.append("FFT analysis completed with Hanning window")
+        notes.append("Real FFT analysis completed with Hanning window")
 
         return " | ".join(notes)
@@ -0,0 +1,281 @@
+"""
+LIA Inference - micro-batched model predictions across devices
+Feature vectors from every device are collected into micro-batches and
+run through one CPU forward pass, then scattered back to each device's
+LIA insights
+"""
+
+import asyncio
+import pickle
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.schemas import StreamDataResponse
+from services.lia_integration import PATTERN_CODES, RHYTHM_CODES
+from services.lia_rules import CONDITIONS, evaluate, feature_matrix
+from utils.logger import setup_logger
+
+try:
+    import joblib
+except ImportError:  # Optional, scikit-learn models are usually saved with joblib
+    joblib = None
+
+try:
+    import onnxruntime
+except ImportError:  # Optional ONNX Runtime backend
+    onnxruntime = None
+
+logger = setup_logger(__name__)
+
+
+def result_features(result: StreamDataResponse) -> np.ndarray:
+    """LIA feature vector (lia_rules.FEATURES order) of a pipeline result"""
+    raw = result.raw_signals
+    clarity = result.clarity_layer
+    timesystems = result.timesystems_layer
+    return feature_matrix(
+        heart_rate=raw.heart_rate,
+        spo2=raw.spo2,
+        temperature=raw.temperature,
+        activity=raw.activity,
+        hrv_score=result.ifrs_layer.hrv_features.hrv_score,
+        rhythm=RHYTHM_CODES[result.ifrs_layer.rhythm_classification],
+        pattern=PATTERN_CODES[timesystems.pattern_type],
+        quality_score=clarity.quality_score,
+        signal_to_noise_ratio=clarity.signal_to_noise_ratio,
+        temporal_consistency=timesystems.temporal_consistency,
+        alignment_score=timesystems.circadian_alignment.alignment_score,
+        artifact_count=len(clarity.artifacts_detected)
+    )[0]
+
+
+# ----------------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------------
+
+class InferenceBackend:
+    """
+    Base backend: the LIA decision tables
+
+    Backends map a [N, len(FEATURES)] batch to condition probabilities
+    shaped [N, len(CONDITIONS)] in CONDITIONS order. The base class needs
+    no model and is the fallback when a model backend is unavailable.
+    """
+
+    name = "rules"
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        return evaluate(features)['probabilities']
+
+    def describe(self) -> dict:
+        return {"backend": self.name}
+
+
+class SklearnBackend(InferenceBackend):
+    """
+    scikit-learn classifier saved with joblib (or pickle)
+
+    Any estimator with ``predict_proba`` and ``classes_`` works; classes
+    must be condition names, and conditions the model does not know get
+    a probability of zero.
+    """
+
+    name = "sklearn"
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            self.model = joblib.load(handle) if joblib is not None else pickle.load(handle)
+        self.path = path
+
+        unknown = [label for label in self.model.classes_ if label not in CONDITIONS]
+        if unknown:
+            raise ValueError(f"Unknown condition classes: {', '.join(map(str, unknown))}")
+        self.columns = np.array([CONDITIONS.index(label) for label in self.model.classes_])
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        probabilities = np.zeros((len(features), len(CONDITIONS)))
+        probabilities[:, self.columns] = self.model.predict_proba(features)
+        return probabilities
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "path": self.path, "model": type(self.model).__name__}
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX model on the ONNX Runtime CPU provider
+
+    The model takes one float32 input shaped [N, len(FEATURES)] and must
+    have an output shaped [N, len(CONDITIONS)] with probabilities in
+    CONDITIONS order.
+    """
+
+    name = "onnx"
+
+    def __init__(self, path: str):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.path = path
+        self.input_name = self.session.get_inputs()[0].name
+
+        outputs = [
+            output.name for output in self.session.get_outputs()
+            if len(output.shape) == 2 and output.shape[1] == len(CONDITIONS)
+        ]
+        if not outputs:
+            raise ValueError(f"No [N, {len(CONDITIONS)}] probability output in {path}")
+        self.output_name = outputs[0]
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        (probabilities,) = self.session.run(
+            [self.output_name], {self.input_name: features.astype(np.float32)}
+        )
+        return np.asarray(probabilities, dtype=np.float64)
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "path": self.path}
+
+
+# Backends whose libraries are installed, by name
+BACKENDS = {"rules": InferenceBackend, "sklearn": SklearnBackend}
+if onnxruntime is not None:
+    BACKENDS["onnx"] = OnnxBackend
+
+
+def load_backend(name: str, path: Optional[str] = None) -> InferenceBackend:
+    """
+    Create an inference backend, falling back to the decision tables
+
+    Args:
+        name: 'rules', 'sklearn' or 'onnx'
+        path: Model file for the model backends
+
+    Returns:
+        The requested backend, or the rule-table backend when it is not
+        installed or the model cannot be loaded
+    """
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        logger.warning(f"⚠️ Inference backend '{name}' not available, using LIA decision tables")
+        return InferenceBackend()
+    if backend_class is InferenceBackend:
+        return InferenceBackend()
+
+    try:
+        return backend_class(path)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load {name} model from {path}: {str(e)}; using LIA decision tables")
+        return InferenceBackend()
+
+
+# ----------------------------------------------------------------------------
+# Micro-batching
+# ----------------------------------------------------------------------------
+
+class MicroBatcher:
+    """
+    Collects single-row predictions from all devices into batches
+
+    A batch is run as soon as it holds ``max_batch_size`` rows or
+    ``max_delay`` seconds after its first row arrived, whichever comes
+    first. The forward pass runs in a worker thread so the event loop
+    keeps serving I/O; every caller gets its own row of the result.
+    """
+
+    def __init__(
+        self, backend: InferenceBackend, max_batch_size: int = 256, max_delay: float = 0.020
+    ):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._rows: List[np.ndarray] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+
+        # Stats
+        self.batches = 0
+        self.rows = 0
+        self.inference_seconds = 0.0
+
+    async def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Probabilities for one feature vector, computed in the next batch
+
+        Args:
+            features: [len(FEATURES)] feature vector
+
+        Returns:
+            [len(CONDITIONS)] probabilities
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._rows.append(features)
+        self._futures.append(future)
+
+        if len(self._rows) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Start a forward pass for every queued row"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._rows:
+            return
+
+        rows, futures = self._rows, self._futures
+        self._rows, self._futures = [], []
+
+        task = asyncio.get_running_loop().create_task(self._run(np.stack(rows), futures))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: np.ndarray, futures: List[asyncio.Future]) -> None:
+        """Run one batch and scatter its rows back to the callers"""
+        try:
+            probabilities, seconds = await asyncio.to_thread(self._forward, batch)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        self.inference_seconds += seconds
+        for future, row in zip(futures, probabilities):
+            if not future.done():
+                future.set_result(row)
+
+    def _forward(self, batch: np.ndarray) -> Tuple[np.ndarray, float]:
+        started = time.perf_counter()
+        probabilities = self.backend.predict_proba(batch)
+        return probabilities, time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """Backend and batching statistics"""
+        return {
+            **self.backend.describe(),
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": self.max_delay * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 1) if self.batches else 0.0,
+            "mean_batch_ms": round(self.inference_seconds / self.batches * 1000, 3) if self.batches else 0.0
+        }
+
+    async def close(self) -> None:
+        """Run the queued rows and wait for batches in flight"""
+        self._flush()
+        await asyncio.gather(*self._running, return_exceptions=True)
@@ -0,0 +1,468 @@
+"""
+LIA Decision Tables - declarative rules evaluated as NumPy masks
+Condition classification, wellness bands, risk factors and positive
+indicators for any number of samples or devices in one evaluation,
+and a plain Python path over the same tables for a single sample
+"""
+
+import operator
+import numpy as np
+from enum import Enum
+from typing import Any, Dict, List, Sequence, Tuple
+
+from models.schemas import PatternType, RhythmClassification
+
+# Conditions LIA can classify
+CONDITIONS = (
+    'Normal Resting',
+    'Light Activity',
+    'Moderate Exercise',
+    'Intense Exercise',
+    'Deep Rest',
+    'Sleep State',
+    'Elevated Stress',
+    'Relaxation',
+    'Recovery Mode',
+    'Optimal Wellness'
+)
+
+# Inputs of the tables, in column order. Enum features (rhythm, pattern)
+# are integer codes in the enum's declaration order
+FEATURES = (
+    'heart_rate', 'spo2', 'temperature', 'activity', 'hrv_score',
+    'rhythm', 'pattern', 'quality_score', 'signal_to_noise_ratio',
+    'temporal_consistency', 'alignment_score', 'artifact_count'
+)
+
+# A predicate is (feature, operator, threshold); a rule holds when all of
+# its predicates hold, and a rule without predicates always holds
+Predicate = Tuple[str, str, Any]
+Rule = Tuple[Any, Sequence[Predicate]]
+
+# Operators as (sign, inclusive): a predicate holds when
+# sign * (value - threshold) is positive, or zero for inclusive operators.
+# "==" is compiled into a ">=" and a "<=" predicate
+OPERATORS = {
+    '<': (-1.0, False),
+    '<=': (-1.0, True),
+    '>': (1.0, False),
+    '>=': (1.0, True),
+    '==': None
+}
+SCALAR_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+class DecisionTable:
+    """
+    An ordered table of rules compiled into NumPy masks
+
+    Tables are used either as first-match tables (the outcome of the first
+    rule that holds; these end with a catch-all rule) or as flag tables
+    (a bitmask of every rule that holds). Every distinct predicate is evaluated once per batch in a single
+    vectorized comparison, and a [predicates, rules] membership matrix
+    turns the predicate masks into per-rule hit counts with one matrix
+    product. Tables can be combined so that all of them are evaluated
+    in one pass.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = tuple((outcome, tuple(when)) for outcome, when in rules)
+        self.outcomes = tuple(outcome for outcome, _ in self.rules)
+
+        predicates: List[Predicate] = []
+        compiled_rules = [
+            [p for predicate in when for p in self._compile(predicate)]
+            for _, when in self.rules
+        ]
+        for when in compiled_rules:
+            for predicate in when:
+                if predicate not in predicates:
+                    predicates.append(predicate)
+        self.predicates = tuple(predicates)
+
+        self.membership = np.zeros((len(predicates), len(self.rules)))
+        for rule, when in enumerate(compiled_rules):
+            for predicate in when:
+                self.membership[predicates.index(predicate), rule] = 1.0
+        self.sizes = self.membership.sum(axis=0)
+
+        # Predicates as sign * value > sign * threshold (or ==, if inclusive),
+        # laid out as [predicates, 1] columns against [predicates, N] values
+        signs = np.array([OPERATORS[p[1]][0] for p in predicates])
+        self._features = np.array([FEATURES.index(p[0]) for p in predicates], dtype=np.int64)
+        self._signs = signs[:, None]
+        self._thresholds = (signs * np.array([p[2] for p in predicates]))[:, None]
+        self._inclusive = np.array([OPERATORS[p[1]][1] for p in predicates], dtype=bool)[:, None]
+        self._membership_t = self.membership.T.astype(np.float32)
+
+        # The same predicates as plain tuples and the rules as bitmasks over
+        # them, for single samples (see predicate_mask())
+        self._scalar_predicates = tuple(
+            (FEATURES.index(p[0]), SCALAR_OPERATORS[p[1]], p[2], 1 << bit)
+            for bit, p in enumerate(predicates)
+        )
+        self.rule_masks = tuple(
+            sum(1 << bit for bit in {predicates.index(predicate) for predicate in when})
+            for when in compiled_rules
+        )
+
+    @classmethod
+    def combine(cls, *tables: 'DecisionTable') -> Tuple['DecisionTable', List[slice]]:
+        """One table holding the rules of ``tables``, and the rule slice of each"""
+        slices, start = [], 0
+        for table in tables:
+            slices.append(slice(start, start + len(table.rules)))
+            start += len(table.rules)
+        return cls([rule for table in tables for rule in table.rules]), slices
+
+    @staticmethod
+    def _compile(predicate: Predicate) -> List[Predicate]:
+        """Validate a predicate into (feature, operator, float threshold) predicates"""
+        feature, op, threshold = predicate
+        if feature not in FEATURES:
+            raise ValueError(f"Unknown feature: {feature}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        if isinstance(threshold, Enum):
+            threshold = list(type(threshold)).index(threshold)
+        if op == '==':
+            return [(feature, '>=', float(threshold)), (feature, '<=', float(threshold))]
+        return [(feature, op, float(threshold))]
+
+    def hits(self, features: np.ndarray) -> np.ndarray:
+        """Number of satisfied predicates per rule, [N, rules]"""
+        values = features.T[self._features]
+        values *= self._signs
+        satisfied = values > self._thresholds
+        satisfied |= self._inclusive & (values == self._thresholds)
+        return (self._membership_t @ satisfied.astype(np.float32)).T
+
+    def predicate_mask(self, features: Sequence[float]) -> int:
+        """
+        Bitmask of the predicates that hold for a single sample
+
+        A rule holds when ``mask & rule_mask == rule_mask``, and
+        ``(mask & rule_mask).bit_count()`` is its hits() count; for one
+        sample this is cheaper than the array evaluation.
+        """
+        mask = 0
+        for feature, compare, threshold, bit in self._scalar_predicates:
+            if compare(features[feature], threshold):
+                mask |= bit
+        return mask
+
+    def matches(self, features: np.ndarray) -> np.ndarray:
+        """Whether each rule holds, [N, rules]"""
+        return self.hits(features) == self.sizes
+
+
+# Condition rules in priority order; the first rule that holds wins
+CONDITION_TABLE = DecisionTable([
+    ('Sleep State', [('heart_rate', '<', 60), ('activity', '<', 5),
+                     ('pattern', '==', PatternType.STABLE)]),
+    ('Deep Rest', [('heart_rate', '<', 65), ('activity', '<', 10), ('hrv_score', '>', 70)]),
+    ('Intense Exercise', [('heart_rate', '>', 140), ('activity', '>', 100)]),
+    ('Moderate Exercise', [('heart_rate', '>', 110), ('activity', '>', 60)]),
+    ('Light Activity', [('heart_rate', '>', 90), ('heart_rate', '<', 110), ('activity', '>', 30)]),
+    ('Elevated Stress', [('heart_rate', '>', 85), ('hrv_score', '<', 50), ('activity', '<', 20)]),
+    ('Relaxation', [('heart_rate', '>=', 60), ('heart_rate', '<=', 75),
+                    ('hrv_score', '>', 70), ('activity', '<', 20)]),
+    ('Recovery Mode', [('rhythm', '==', RhythmClassification.ATHLETIC), ('hrv_score', '>', 80)]),
+    ('Optimal Wellness', [('heart_rate', '>=', 65), ('heart_rate', '<=', 75),
+                          ('hrv_score', '>', 75), ('spo2', '>=', 60), ('spo2', '<=', 100)]),
+    ('Normal Resting', [])
+])
+
+# Wellness dimension bands (score of the first band that holds)
+CARDIOVASCULAR_TABLE = DecisionTable([
+    (90.0, [('heart_rate', '>=', 60), ('heart_rate', '<=', 80), ('hrv_score', '>', 70)]),
+    (77.5, [('heart_rate', '>=', 55), ('heart_rate', '<=', 90), ('hrv_score', '>', 60)]),
+    (65.0, [('heart_rate', '>=', 50), ('heart_rate', '<=', 100)]),
+    (52.5, [])
+])
+RESPIRATORY_TABLE = DecisionTable([
+    (96.0, [('spo2', '>=', 98)]),
+    (87.5, [('spo2', '>=', 95)]),
+    (72.5, [('spo2', '>=', 92)]),
+    (55.0, [])
+])
+ACTIVITY_TABLE = DecisionTable([
+    (87.5, [('activity', '>=', 20), ('activity', '<=', 80)]),
+    (60.0, [('activity', '<', 20)]),
+    (77.5, [])
+])
+
+# Stress indicators (0-1, higher = more stressed)
+HRV_STRESS_TABLE = DecisionTable([
+    (0.6, [('hrv_score', '<', 50)]),
+    (0.4, [('hrv_score', '<', 60)]),
+    (0.2, [])
+])
+CIRCADIAN_STRESS_TABLE = DecisionTable([
+    (0.5, [('alignment_score', '<', 0.7)]),
+    (0.2, [])
+])
+
+# Independent flags (every rule that holds is reported)
+RISK_TABLE = DecisionTable([
+    ("Elevated heart rate", [('heart_rate', '>', 100)]),
+    ("Low heart rate (bradycardia)", [('heart_rate', '<', 50)]),
+    ("Low heart rate variability", [('hrv_score', '<', 50)]),
+    ("Low blood oxygen saturation", [('spo2', '<', 95)]),
+    ("Elevated body temperature", [('temperature', '>', 38)]),
+    ("Low body temperature", [('temperature', '<', 36)]),
+    ("Poor signal quality - check sensor placement", [('quality_score', '<', 0.6)]),
+    ("Circadian rhythm misalignment", [('alignment_score', '<', 0.6)]),
+    ("Multiple signal artifacts detected", [('artifact_count', '>', 2)])
+])
+POSITIVE_TABLE = DecisionTable([
+    ("Excellent heart rate variability", [('hrv_score', '>', 75)]),
+    ("Good heart rate variability", [('hrv_score', '>', 65), ('hrv_score', '<=', 75)]),
+    ("Optimal blood oxygen saturation", [('spo2', '>=', 98)]),
+    ("Excellent signal quality", [('quality_score', '>', 0.85)]),
+    ("Strong circadian rhythm alignment", [('alignment_score', '>', 0.85)]),
+    ("Normal body temperature", [('temperature', '>=', 36.5), ('temperature', '<=', 37.2)]),
+    ("Optimal resting heart rate", [('heart_rate', '>=', 60), ('heart_rate', '<=', 75)])
+])
+
+RISK_FACTORS = RISK_TABLE.outcomes
+POSITIVE_INDICATORS = POSITIVE_TABLE.outcomes
+
+# Dirichlet concentration of the detected condition vs. the others; the
+# probabilities are the distribution's mean rather than a random draw
+DETECTED_ALPHA = 10.0
+
+
+# Every table above, evaluated together
+_FIRST_MATCH_TABLES = (
+    CONDITION_TABLE, CARDIOVASCULAR_TABLE, RESPIRATORY_TABLE, ACTIVITY_TABLE,
+    HRV_STRESS_TABLE, CIRCADIAN_STRESS_TABLE
+)
+_FLAG_TABLES = (RISK_TABLE, POSITIVE_TABLE)
+_ALL_RULES, _SLICES = DecisionTable.combine(*_FIRST_MATCH_TABLES, *_FLAG_TABLES)
+_CONDITION_RULES = _SLICES[0]
+
+
+def _first_match_lookup() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Columns of the combined matches for every first-match table, padded
+    with the table's catch-all rule to [tables, longest table], and the
+    matching outcomes (condition outcomes as indexes into CONDITIONS)
+    """
+    width = max(len(table.rules) for table in _FIRST_MATCH_TABLES)
+    columns, outcomes = [], []
+    for table, rules in zip(_FIRST_MATCH_TABLES, _SLICES):
+        values = [
+            CONDITIONS.index(outcome) if table is CONDITION_TABLE else outcome
+            for outcome in table.outcomes
+        ]
+        padding = width - len(values)
+        columns.append(list(range(rules.start, rules.stop)) + [rules.stop - 1] * padding)
+        outcomes.append(values + [values[-1]] * padding)
+    return np.array(columns), np.array(outcomes, dtype=np.float64)
+
+
+_FIRST_MATCH_COLUMNS, _FIRST_MATCH_OUTCOMES = _first_match_lookup()
+_FIRST_MATCH_ROWS = np.arange(len(_FIRST_MATCH_TABLES))
+
+# Bit weights of the flag tables' rules, one column per flag table
+_FLAG_WEIGHTS = np.zeros((len(_ALL_RULES.rules), len(_FLAG_TABLES)), dtype=np.int64)
+for _column, _rules in enumerate(_SLICES[len(_FIRST_MATCH_TABLES):]):
+    _FLAG_WEIGHTS[_rules, _column] = 1 << np.arange(_rules.stop - _rules.start)
+
+_CONDITION_CODES = _FIRST_MATCH_OUTCOMES[0, :len(CONDITION_TABLE.rules)].astype(np.int64)
+
+# Wellness dimensions as an affine map of the first-match outcomes
+# (cardiovascular, respiratory, activity, HRV stress, circadian stress):
+# stress level = (1 - mean stress indicator) * 100, and overall wellness
+# (before the signal quality factor) weights the four dimensions
+_WELLNESS_WEIGHTS = np.array([
+    # cardio, respiratory, activity, stress level, overall
+    [1.0, 0.0, 0.0, 0.0, 0.35],
+    [0.0, 1.0, 0.0, 0.0, 0.25],
+    [0.0, 0.0, 1.0, 0.0, 0.20],
+    [0.0, 0.0, 0.0, -50.0, -50.0 * 0.20],
+    [0.0, 0.0, 0.0, -50.0, -50.0 * 0.20]
+])
+_WELLNESS_OFFSET = np.array([0.0, 0.0, 0.0, 100.0, 100.0 * 0.20])
+
+# Lookups of evaluate_one(): (outcome, rule mask) of every first-match
+# table, (bit, rule mask) of every flag table, and the condition rules
+_SCALAR_FIRST_MATCH = [
+    list(zip(_FIRST_MATCH_OUTCOMES[table, :rules.stop - rules.start].tolist(), _ALL_RULES.rule_masks[rules]))
+    for table, rules in enumerate(_SLICES[:len(_FIRST_MATCH_TABLES)])
+]
+_SCALAR_FLAGS = [
+    [(1 << bit, rule_mask) for bit, rule_mask in enumerate(_ALL_RULES.rule_masks[rules])]
+    for rules in _SLICES[len(_FIRST_MATCH_TABLES):]
+]
+_SCALAR_CONDITION_RULES = list(zip(
+    _CONDITION_CODES.tolist(),
+    _ALL_RULES.rule_masks[_CONDITION_RULES],
+    np.maximum(CONDITION_TABLE.sizes, 1).tolist()
+))
+_SCALAR_WELLNESS = list(zip(_WELLNESS_WEIGHTS.T.tolist(), _WELLNESS_OFFSET.tolist()))
+_QUALITY_SCORE = FEATURES.index('quality_score')
+_SNR = FEATURES.index('signal_to_noise_ratio')
+_CONSISTENCY = FEATURES.index('temporal_consistency')
+
+
+def feature_matrix(**columns) -> np.ndarray:
+    """Stack feature values (all scalars or all [N] arrays) into [N, FEATURES]"""
+    missing = set(FEATURES) - set(columns)
+    if missing:
+        raise ValueError(f"Missing features: {', '.join(sorted(missing))}")
+    values = np.array([columns[name] for name in FEATURES], dtype=np.float64)
+    return values.reshape(len(FEATURES), -1).T
+
+
+def feature_row(**columns) -> Tuple[float, ...]:
+    """Feature values of a single sample in FEATURES order, for evaluate_one()"""
+    missing = set(FEATURES) - set(columns)
+    if missing:
+        raise ValueError(f"Missing features: {', '.join(sorted(missing))}")
+    return tuple(float(columns[name]) for name in FEATURES)
+
+
+def labels_from_flags(flags: int, labels: Sequence[str]) -> List[str]:
+    """Expand a risk/positive bitmask into its labels"""
+    return [label for bit, label in enumerate(labels) if int(flags) & (1 << bit)]
+
+
+def evaluate(features: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every LIA table for a batch
+
+    Args:
+        features: [N, len(FEATURES)], e.g. from feature_matrix()
+
+    Returns:
+        Column arrays:
+        - condition: [N] index into CONDITIONS
+        - condition_scores: [N, 10] share of each condition rule's
+          predicates that hold (1.0 for the detected condition)
+        - probabilities: [N, 10] over CONDITIONS
+        - confidence: [N]
+        - wellness_assessment: [N, 5] cardiovascular, respiratory,
+          activity, stress, overall
+        - risk_flags: [N] bitmask over RISK_FACTORS
+        - positive_flags: [N] bitmask over POSITIVE_INDICATORS
+    """
+    hits = _ALL_RULES.hits(features)
+    matches = hits == _ALL_RULES.sizes
+
+    # Outcome of the first rule that holds in every first-match table
+    first = np.argmax(matches[:, _FIRST_MATCH_COLUMNS], axis=2)
+    outcomes = _FIRST_MATCH_OUTCOMES[_FIRST_MATCH_ROWS, first]
+    condition = outcomes[:, 0].astype(np.int64)
+
+    # Bitmasks of every flag table
+    risk_flags, positive_flags = (matches @ _FLAG_WEIGHTS).T
+
+    quality_score = features[:, FEATURES.index('quality_score')]
+    snr = features[:, FEATURES.index('signal_to_noise_ratio')]
+    consistency = features[:, FEATURES.index('temporal_consistency')]
+
+    rows = np.arange(len(features))
+    scores = np.zeros((len(features), len(CONDITIONS)))
+    scores[:, _CONDITION_CODES] = hits[:, _CONDITION_RULES] / np.maximum(CONDITION_TABLE.sizes, 1)
+    scores[rows, condition] = 1.0
+
+    # Partial matches make the other conditions more or less likely
+    alphas = 1.0 + scores
+    alphas[rows, condition] = DETECTED_ALPHA
+    probabilities = alphas / alphas.sum(axis=1, keepdims=True)
+
+    # Confidence from signal quality, SNR (typical range 20-50 dB) and
+    # temporal consistency, never below 0.70
+    snr_normalized = np.minimum(np.maximum((snr - 20) / 30, 0.0), 1.0)
+    confidence = np.minimum(np.maximum(
+        quality_score * 0.4 + snr_normalized * 0.3 + consistency * 0.3, 0.70
+    ), 0.99).round(3)
+
+    # Wellness dimensions; overall wellness factors in signal quality
+    wellness = outcomes[:, 1:] @ _WELLNESS_WEIGHTS + _WELLNESS_OFFSET
+    wellness[:, 4] *= 0.8 + quality_score * 0.2
+    wellness.round(1, out=wellness)
+
+    return {
+        'condition': condition,
+        'condition_scores': scores,
+        'probabilities': probabilities,
+        'confidence': confidence,
+        'wellness_assessment': wellness,
+        'risk_flags': risk_flags,
+        'positive_flags': positive_flags
+    }
+
+
+def evaluate_one(features: Sequence[float]) -> Dict[str, Any]:
+    """
+    Evaluate every LIA table for a single sample
+
+    The same rules and arithmetic as evaluate() on a one-row batch, in
+    plain Python; for one sample the array setup costs more than the rules.
+
+    Args:
+        features: len(FEATURES) values, e.g. from feature_row()
+
+    Returns:
+        The keys of evaluate(), as Python scalars and lists for one sample
+    """
+    mask = _ALL_RULES.predicate_mask(features)
+
+    # Outcome of the first rule that holds in every first-match table
+    outcomes = []
+    for rules in _SCALAR_FIRST_MATCH:
+        for outcome, rule_mask in rules:
+            if mask & rule_mask == rule_mask:
+                outcomes.append(outcome)
+                break
+    condition = int(outcomes[0])
+
+    # Bitmasks of every flag table
+    risk_flags, positive_flags = (
+        sum(bit for bit, rule_mask in rules if mask & rule_mask == rule_mask)
+        for rules in _SCALAR_FLAGS
+    )
+
+    quality_score = features[_QUALITY_SCORE]
+    snr = features[_SNR]
+    consistency = features[_CONSISTENCY]
+
+    scores = [0.0] * len(CONDITIONS)
+    for code, rule_mask, size in _SCALAR_CONDITION_RULES:
+        scores[code] = (mask & rule_mask).bit_count() / size
+    scores[condition] = 1.0
+
+    # Partial matches make the other conditions more or less likely
+    alphas = [1.0 + score for score in scores]
+    alphas[condition] = DETECTED_ALPHA
+    total = sum(alphas)
+    probabilities = [alpha / total for alpha in alphas]
+
+    # Confidence from signal quality, SNR and temporal consistency, as in
+    # evaluate(); round() on the scaled value rounds like ndarray.round()
+    snr_normalized = min(max((snr - 20) / 30, 0.0), 1.0)
+    confidence = min(max(
+        quality_score * 0.4 + snr_normalized * 0.3 + consistency * 0.3, 0.70
+    ), 0.99)
+    confidence = round(confidence * 1000) / 1000
+
+    # Wellness dimensions; overall wellness factors in signal quality
+    wellness = [
+        sum(outcome * weight for outcome, weight in zip(outcomes[1:], weights)) + offset
+        for weights, offset in _SCALAR_WELLNESS
+    ]
+    wellness[4] *= 0.8 + quality_score * 0.2
+    wellness = [round(value * 10) / 10 for value in wellness]
+
+    return {
+        'condition': condition,
+        'condition_scores': scores,
+        'probabilities': probabilities,
+        'confidence': confidence,
+        'wellness_assessment': wellness,
+        'risk_flags': risk_flags,
+        'positive_flags': positive_flags
+    }
@@ -0,0 +1,299 @@
+"""
+Device Pipeline Registry
+Per-device Clarity™ → iFRS™ → Timesystems™ → LIA processing chains
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from models.schemas import BiosignalData, StreamDataResponse
+from services.ble_simulator import BiosignalSample
+from services.clarity import ClarityLayer
+from services.fleet import FleetEngine
+from services.ifrs import iFRSLayer
+from services.timesystems import TimesystemsLayer
+from services.lia_integration import LIAEngine
+from utils.logger import get_processing_logger
+from utils.projection import FieldSelection
+
+processing_logger = get_processing_logger()
+
+
+def process_tick(
+    pipelines: Sequence["DevicePipeline"],
+    samples: Sequence[BiosignalData],
+    skips: Sequence[AbstractSet[str]]
+) -> List[StreamDataResponse]:
+    """
+    Run one sample per pipeline through all layers
+
+    Pipelines that share an engine (all pipelines of a PipelineRegistry)
+    go through one vectorized FleetEngine.step() together.
+
+    Args:
+        pipelines: Pipelines of distinct devices
+        samples: Raw sample of each pipeline
+        skips: Per pipeline, the OPTIONAL_OUTPUTS to leave out of its result
+
+    Returns:
+        Combined output of all layers, per pipeline
+    """
+    groups: Dict[int, List[int]] = {}
+    for i, pipeline in enumerate(pipelines):
+        groups.setdefault(id(pipeline.engine), []).append(i)
+
+    results: List[Optional[StreamDataResponse]] = [None] * len(pipelines)
+    for indices in groups.values():
+        engine = pipelines[indices[0]].engine
+        engine_results = engine.step(
+            [pipelines[i].device_id for i in indices],
+            [samples[i] for i in indices],
+            [skips[i] for i in indices]
+        )
+        for i, result in zip(indices, engine_results):
+            results[i] = result
+
+    for pipeline in pipelines:
+        pipeline.samples_processed += 1
+    return results
+
+
+class DevicePipeline:
+    """
+    Processing chain of a single wearable device
+
+    A view into a FleetEngine: the device's layer state is its own row of
+    the engine's arrays, so samples from one device never reach another,
+    and a pipeline processed on its own runs the same vectorized code as
+    a whole tick of devices. A pipeline created without an engine gets a
+    single-row engine of its own. The result of the latest processed
+    sample is cached for readers.
+    """
+
+    def __init__(self, device_id: str, engine: Optional[FleetEngine] = None):
+        self.device_id = device_id
+        self.engine = engine if engine is not None else FleetEngine(capacity=1)
+
+        self.created_at = datetime.now()
+        self.last_active = time.monotonic()
+        self.samples_processed = 0
+
+        # Latest result, the sample sequence number it came from and the
+        # optional outputs that were not computed for it
+        self.latest_result: Optional[StreamDataResponse] = None
+        self.latest_sequence = 0
+        self.latest_skipped: FrozenSet[str] = frozenset()
+        self.result_recorded = asyncio.Event()
+
+        # Field selections of recent REST readers: key -> (selection, expiry)
+        self.field_demands: Dict[str, Tuple[Optional[FieldSelection], float]] = {}
+
+    @property
+    def lia_engine(self) -> LIAEngine:
+        """LIA engine of the device's fleet engine"""
+        return self.engine.lia_engine
+
+    def touch(self):
+        """Mark the pipeline as recently used"""
+        self.last_active = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Seconds since the pipeline was last used"""
+        return time.monotonic() - self.last_active
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the cached result, changes with every new sample"""
+        return self.variant_etag()
+
+    def variant_etag(self, variant: str = "") -> str:
+        """Entity tag of one representation of the cached result (e.g. with notes)"""
+        suffix = f"-{variant}" if variant else ""
+        return f'"{self.device_id}-{self.latest_sequence}{suffix}"'
+
+    def demand(self, selection: Optional[FieldSelection], ttl: float) -> None:
+        """Keep computing the fields a REST reader asked for, for ``ttl`` seconds"""
+        key = selection.key if selection is not None else ""
+        self.field_demands[key] = (selection, time.monotonic() + ttl)
+
+    def active_demands(self) -> List[Optional[FieldSelection]]:
+        """Field selections of REST readers whose demand has not expired"""
+        now = time.monotonic()
+        for key, (_, expires_at) in list(self.field_demands.items()):
+            if expires_at <= now:
+                del self.field_demands[key]
+        return [selection for selection, _ in self.field_demands.values()]
+
+    def covers(self, selection: Optional[FieldSelection]) -> bool:
+        """Whether the cached result has every field of a selection"""
+        if selection is None:
+            return not self.latest_skipped
+        return not any(selection.includes(path) for path in self.latest_skipped)
+
+    def process_sample(
+        self, sample: BiosignalSample, skip: AbstractSet[str] = frozenset()
+    ) -> StreamDataResponse:
+        """Process a sequenced sample and cache its result"""
+        result = self.process(sample.data, skip)
+        self.record_result(sample.sequence, result, skip)
+        return result
+
+    def record_result(
+        self, sequence: int, result: StreamDataResponse,
+        skip: AbstractSet[str] = frozenset()
+    ) -> None:
+        """Cache the result of a processed sample (event loop thread only)"""
+        self.latest_result = result
+        self.latest_sequence = sequence
+        self.latest_skipped = frozenset(skip)
+
+        # Wake up readers waiting for a new result
+        recorded, self.result_recorded = self.result_recorded, asyncio.Event()
+        recorded.set()
+
+    async def wait_for_result(
+        self, timeout: float, selection: Optional[FieldSelection] = None
+    ) -> Optional[StreamDataResponse]:
+        """
+        Latest result that has the selected fields
+
+        Waits up to ``timeout`` seconds for the first result, or for the
+        next one when the cached result skipped a field the reader needs
+        (register the demand first). Falls back to the cached result.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while self.latest_result is None or not self.covers(selection):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self.result_recorded.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        return self.latest_result
+
+    def process(
+        self, raw_data: BiosignalData, skip: AbstractSet[str] = frozenset()
+    ) -> StreamDataResponse:
+        """
+        Run one sample through all layers
+
+        Args:
+            raw_data: Raw biosignal data from the device
+            skip: OPTIONAL_OUTPUTS to leave out of the result
+
+        Returns:
+            Combined output of all layers
+        """
+        return process_tick([self], [raw_data], [skip])[0]
+
+
+def with_processing_notes(result: StreamDataResponse) -> StreamDataResponse:
+    """
+    Copy of a pipeline result with the layers' processing notes rendered
+
+    Streaming results are produced without notes; everything the notes
+    describe is part of the result, so they can be rendered on demand.
+    """
+    clarity = result.clarity_layer
+    ifrs = result.ifrs_layer
+    timesystems = result.timesystems_layer
+
+    return result.model_copy(update={
+        'clarity_layer': clarity.model_copy(update={
+            'processing_notes': ClarityLayer.generate_processing_notes(
+                clarity.quality_score, clarity.signal_to_noise_ratio,
+                clarity.noise_reduction_applied, clarity.artifacts_detected
+            )
+        }),
+        'ifrs_layer': ifrs.model_copy(update={
+            'processing_notes': iFRSLayer.generate_processing_notes(
+                ifrs.dominant_frequency, ifrs.rhythm_classification, ifrs.hrv_features
+            )
+        }),
+        'timesystems_layer': timesystems.model_copy(update={
+            'processing_notes': TimesystemsLayer.generate_processing_notes(
+                timesystems.pattern_type, timesystems.circadian_phase, timesystems.rhythm_score
+            )
+        })
+    })
+
+
+class PipelineRegistry:
+    """
+    Registry of per-device pipelines keyed by device_id
+
+    Pipelines are created lazily on first use and evicted once they have
+    been idle for longer than ``idle_timeout`` seconds. ``max_devices``
+    caps memory: when full, the least recently used pipeline is dropped.
+    All pipelines are views into the registry's FleetEngine, and an
+    evicted device's engine row is freed for reuse.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0, max_devices: int = 10000):
+        self.idle_timeout = idle_timeout
+        self.max_devices = max_devices
+        self.engine = FleetEngine()
+        self.pipelines: "OrderedDict[str, DevicePipeline]" = OrderedDict()
+
+    def get(self, device_id: str) -> DevicePipeline:
+        """Get the pipeline for a device, creating it on first use"""
+        pipeline = self.pipelines.get(device_id)
+
+        if pipeline is None:
+            pipeline = DevicePipeline(device_id, self.engine)
+            self.pipelines[device_id] = pipeline
+            processing_logger.info(f"PIPELINE_CREATED | device_id={device_id}")
+
+            # Drop least recently used pipelines beyond capacity
+            while len(self.pipelines) > self.max_devices:
+                evicted_id, _ = self.pipelines.popitem(last=False)
+                self.engine.release(evicted_id)
+                processing_logger.info(f"PIPELINE_EVICTED | device_id={evicted_id} | reason=capacity")
+        else:
+            self.pipelines.move_to_end(device_id)
+
+        pipeline.touch()
+        return pipeline
+
+    def peek(self, device_id: str) -> Optional[DevicePipeline]:
+        """Get an existing pipeline without creating or touching it"""
+        return self.pipelines.get(device_id)
+
+    def remove(self, device_id: str) -> bool:
+        """Remove a device pipeline"""
+        if self.pipelines.pop(device_id, None) is None:
+            return False
+        self.engine.release(device_id)
+        return True
+
+    def evict_idle(self) -> List[str]:
+        """
+        Evict pipelines idle for longer than the timeout
+
+        Returns:
+            Device IDs that were evicted
+        """
+        evicted = []
+
+        for device_id, pipeline in list(self.pipelines.items()):
+            if pipeline.idle_seconds() < self.idle_timeout:
+                continue
+            del self.pipelines[device_id]
+            self.engine.release(device_id)
+            evicted.append(device_id)
+            processing_logger.info(f"PIPELINE_EVICTED | device_id={device_id} | reason=idle")
+
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self.pipelines)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self.pipelines
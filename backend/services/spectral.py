@@ -0,0 +1,379 @@
+"""
+Spectral analysis engines shared by the iFRS™ and Timesystems™ layers
+"""
+
+import numpy as np
+from scipy.fft import next_fast_len
+from scipy.signal import lombscargle, welch
+from typing import Dict, Optional, Tuple
+
+from utils.ring_buffer import RingBuffer, resize_rows
+from utils.rounding import round_half
+
+# Standard HRV frequency bands in Hz (lower bound inclusive)
+HRV_BANDS = {
+    'vlf': (0.003, 0.04),
+    'lf': (0.04, 0.15),
+    'hf': (0.15, 0.4)
+}
+
+
+class _Cadence:
+    """
+    Which rows recompute a cached estimate on an update
+
+    A row computes its first estimate as soon as it has enough data and
+    then recomputes every ``interval`` updates, returning the cached
+    estimate in between. A row without enough data drops its estimate.
+    """
+
+    def __init__(self, interval: int, rows: int):
+        self.interval = max(1, interval)
+        self.since = np.zeros(rows, dtype=np.int64)
+        self.cached = np.zeros(rows, dtype=bool)
+
+    def due(self, rows: np.ndarray, ready: np.ndarray) -> np.ndarray:
+        """Rows to recompute now, out of the ``ready`` ones among ``rows``"""
+        self.reset(rows[~ready])
+        rows = rows[ready]
+
+        since = self.since[rows] + 1
+        due = ~self.cached[rows] | (since >= self.interval)
+        since[due] = 0
+        self.since[rows] = since
+        self.cached[rows] = True
+        return rows[due]
+
+    def reset(self, rows) -> None:
+        """Drop the cached estimates of ``rows``"""
+        self.since[rows] = 0
+        self.cached[rows] = False
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.since = resize_rows(self.since, rows)
+        self.cached = resize_rows(self.cached, rows)
+
+
+class SpectralEngine:
+    """
+    Dominant-frequency analysis of streaming signals, one per row
+
+    Hanning windows and frequency bins are computed once per window length
+    and reused, the spectrum comes from a real FFT (half the work of a
+    complex one), and it is only recomputed every ``hop_size`` updates.
+    Between recomputes the last result is returned unchanged. Rows due
+    for a recompute on the same update share one batched FFT per window
+    length.
+    """
+
+    def __init__(
+        self, sample_rate: float, window_size: int = 128,
+        min_samples: int = 32, hop_size: int = 1, rows: int = 1
+    ):
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.hop_size = max(1, hop_size)
+
+        self._plans: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._cadence = _Cadence(self.hop_size, rows)
+        self._result = np.zeros((rows, 2))
+
+    def _plan(self, length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Cached (window, frequency bins) for a signal length"""
+        plan = self._plans.get(length)
+        if plan is None:
+            window = np.hanning(length)
+            freqs = np.fft.rfftfreq(length, 1.0 / self.sample_rate)[:length // 2]
+            plan = (window, freqs)
+            self._plans[length] = plan
+        return plan
+
+    def update(
+        self, rows, signal: RingBuffer, channel: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Register a new sample of each row and return the current estimates
+
+        Args:
+            rows: Row indices that received a sample
+            signal: Buffered signals, one row each (only the last
+                ``window_size`` values are used)
+            channel: Channel of ``signal`` to analyze
+
+        Returns:
+            ([len(rows), 2] (dominant_frequency, frequency_stability),
+            [len(rows)] whether each row has an estimate; rows with fewer
+            than ``min_samples`` values have none)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        count = signal.count[rows]
+        due = self._cadence.due(rows, count >= self.min_samples)
+
+        lengths = np.minimum(signal.count[due], self.window_size)
+        for length in np.unique(lengths):
+            group = due[lengths == length]
+            self._result[group] = self._analyze(signal.window(group, int(length))[:, :, channel])
+
+        return self._result[rows], self._cadence.cached[rows]
+
+    def clear(self, rows) -> None:
+        """Drop the estimates of ``rows``"""
+        self._cadence.reset(rows)
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self._cadence.resize(rows)
+        self._result = resize_rows(self._result, rows)
+
+    def _analyze(self, signals: np.ndarray) -> np.ndarray:
+        """Dominant frequency and power concentration of windows shaped [k, length]"""
+        length = signals.shape[1]
+        window, freqs = self._plan(length)
+
+        # Remove DC component and apply Hanning window to reduce leakage
+        signal_windowed = (signals - np.mean(signals, axis=1, keepdims=True)) * window
+
+        fft_magnitude = np.abs(np.fft.rfft(signal_windowed, axis=1))[:, :length // 2]
+
+        # Find dominant frequency (exclude DC component)
+        dominant_idx = np.argmax(fft_magnitude[:, 1:], axis=1) + 1
+        dominant_freq = np.abs(freqs[dominant_idx])
+
+        # Frequency stability: how concentrated the power is
+        power = fft_magnitude ** 2
+        total_power = np.sum(power, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frequency_stability = power[np.arange(len(power)), dominant_idx] / total_power
+        frequency_stability = np.where(total_power > 0, frequency_stability, 0.5)
+
+        frequency_stability = np.clip(frequency_stability, 0.3, 1.0)
+
+        return np.column_stack([round_half(dominant_freq, 2), round_half(frequency_stability, 2)])
+
+
+class BandPowerEstimator:
+    """
+    VLF/LF/HF power of streaming R-R interval series, one per row
+
+    Methods:
+    - 'lomb': Lomb-Scargle periodogram evaluated directly on the unevenly
+      spaced beat times, on a fixed frequency grid
+    - 'welch': Welch PSD of the series resampled to ``resample_rate`` Hz
+
+    Band masks are precomputed for the frequency grid (and cached per
+    segment length for Welch). The periodogram is recomputed once every
+    ``update_interval`` updates and the cached band powers are returned in
+    between. Each row's periodogram is its own (beat times differ between
+    devices), so only the rows due for a recompute do spectral work.
+    """
+
+    def __init__(
+        self, method: str = 'lomb', update_interval: int = 10,
+        n_freqs: int = 256, resample_rate: float = 4.0,
+        min_intervals: int = 10, rows: int = 1
+    ):
+        if method not in ('lomb', 'welch'):
+            raise ValueError(f"Unknown band power method: {method}")
+
+        self.method = method
+        self.update_interval = max(1, update_interval)
+        self.resample_rate = resample_rate
+        self.min_intervals = min_intervals
+
+        # Lomb-Scargle frequency grid and band masks
+        low = min(band[0] for band in HRV_BANDS.values())
+        high = max(band[1] for band in HRV_BANDS.values())
+        self.freqs = np.linspace(low, high, n_freqs)
+        self.angular_freqs = 2 * np.pi * self.freqs
+        self.freq_step = self.freqs[1] - self.freqs[0]
+        self.band_masks = self._band_masks(self.freqs)
+
+        self._welch_masks: Dict[int, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {}
+        self._cadence = _Cadence(self.update_interval, rows)
+        self._powers = np.zeros((rows, len(HRV_BANDS)))
+
+    @staticmethod
+    def _band_masks(freqs: np.ndarray) -> Dict[str, np.ndarray]:
+        """Boolean mask per HRV band over a frequency grid"""
+        return {
+            name: (freqs >= lower) & (freqs < upper if name != 'hf' else freqs <= upper)
+            for name, (lower, upper) in HRV_BANDS.items()
+        }
+
+    def update(self, rows, rr_intervals: RingBuffer) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Register a new interval of each row and return the current band powers
+
+        Args:
+            rows: Row indices that received an interval
+            rr_intervals: Buffered R-R intervals in ms, one row each
+
+        Returns:
+            ([len(rows), 3] absolute power per band in ms², in HRV_BANDS
+            order, [len(rows)] whether each row has an estimate; rows with
+            fewer than ``min_intervals`` intervals have none)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        due = self._cadence.due(rows, rr_intervals.count[rows] >= self.min_intervals)
+        for row in due:
+            self._powers[row] = self._estimate(rr_intervals.samples(row)[:, 0])
+
+        return self._powers[rows], self._cadence.cached[rows]
+
+    def clear(self, rows) -> None:
+        """Drop the estimates of ``rows``"""
+        self._cadence.reset(rows)
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self._cadence.resize(rows)
+        self._powers = resize_rows(self._powers, rows)
+
+    def _estimate(self, rr_intervals: np.ndarray) -> np.ndarray:
+        """Compute band powers for the current interval series"""
+        # Beat times in seconds
+        beat_times = np.cumsum(rr_intervals) / 1000.0
+        detrended = rr_intervals - rr_intervals.mean()
+
+        if self.method == 'lomb':
+            return self._lomb_scargle(beat_times, detrended)
+        return self._welch(beat_times, detrended)
+
+    def _lomb_scargle(self, beat_times: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Band powers from a Lomb-Scargle periodogram of uneven samples"""
+        if not np.any(values):
+            return np.zeros(len(HRV_BANDS))
+
+        periodogram = lombscargle(beat_times, values, self.angular_freqs)
+
+        # Scale to a one-sided PSD in ms²/Hz before integrating over bands
+        psd = periodogram * 2.0 / len(values)
+        return np.array([psd[mask].sum() * self.freq_step for mask in self.band_masks.values()])
+
+    def _welch(self, beat_times: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Band powers from a Welch PSD of the evenly resampled series"""
+        uniform_times = np.arange(beat_times[0], beat_times[-1], 1.0 / self.resample_rate)
+        if len(uniform_times) < 4:
+            return np.zeros(len(HRV_BANDS))
+
+        resampled = np.interp(uniform_times, beat_times, values)
+        nperseg = min(256, len(resampled))
+        freqs, psd = welch(resampled, fs=self.resample_rate, nperseg=nperseg)
+
+        cached = self._welch_masks.get(nperseg)
+        if cached is None:
+            cached = (freqs, self._band_masks(freqs))
+            self._welch_masks[nperseg] = cached
+        _, masks = cached
+
+        freq_step = freqs[1] - freqs[0]
+        return np.array([psd[mask].sum() * freq_step for mask in masks.values()])
+
+
+class PeriodicityDetector:
+    """
+    Autocorrelation periodicity detector for timestamped signals, one per row
+
+    The autocorrelation is computed through the FFT (Wiener–Khinchin: the
+    inverse transform of the power spectrum), zero-padded to avoid circular
+    wrap-around, in O(n log n) instead of an O(n²) loop over lags. The
+    period is the first autocorrelation peak above ``threshold`` after the
+    first zero crossing, converted to seconds using the actual sample timestamps.
+    The result is recomputed every ``update_interval`` updates and cached
+    in between; only the rows due for a recompute do the FFT work.
+    """
+
+    def __init__(
+        self, min_samples: int = 50, update_interval: int = 10,
+        threshold: float = 0.5, rows: int = 1
+    ):
+        self.min_samples = min_samples
+        self.update_interval = max(1, update_interval)
+        self.threshold = threshold
+
+        self._cadence = _Cadence(self.update_interval, rows)
+        self._detected = np.zeros(rows, dtype=bool)
+        self._period = np.full(rows, np.nan)
+
+    def update(
+        self, rows, values: RingBuffer, timestamps: RingBuffer, channel: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Register a new sample of each row and return the current estimates
+
+        Args:
+            rows: Row indices that received a sample
+            values: Buffered signals, one row each
+            timestamps: Matching sample times in epoch seconds
+            channel: Channel of ``values`` to analyze
+
+        Returns:
+            ([len(rows)] periodicity_detected, [len(rows)] period in
+            seconds, NaN where none was detected)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        ready = values.count[rows] >= self.min_samples
+        for row in self._cadence.due(rows, ready):
+            detected, period = self._detect(values.samples(row)[:, channel], timestamps.samples(row)[:, 0])
+            self._detected[row] = detected
+            self._period[row] = np.nan if period is None else period
+
+        return (
+            np.where(ready, self._detected[rows], False),
+            np.where(ready, self._period[rows], np.nan)
+        )
+
+    def reset(self, rows) -> None:
+        """Drop the cached estimates of ``rows``, their next update recomputes them"""
+        self._cadence.reset(rows)
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self._cadence.resize(rows)
+        self._detected = resize_rows(self._detected, rows)
+        self._period = resize_rows(self._period, rows)
+
+    def _detect(
+        self, values: np.ndarray, timestamps: np.ndarray
+    ) -> Tuple[bool, Optional[float]]:
+        """Find the dominant autocorrelation period of the window"""
+        n = len(values)
+        signal = values - np.mean(values, dtype=np.float64)
+
+        # Autocorrelation via the power spectrum, padded to >= 2n
+        nfft = next_fast_len(2 * n)
+        spectrum = np.fft.rfft(signal, nfft)
+        acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, nfft)[:n // 2]
+
+        if acf[0] <= 0:
+            return False, None
+
+        # Unbiased, normalized autocorrelation for lags up to n/2
+        lags = np.arange(len(acf))
+        acf = acf / acf[0] * n / (n - lags)
+
+        # First autocorrelation peak above threshold after the first zero
+        # crossing (later peaks are multiples of the fundamental period)
+        crossings = np.flatnonzero(acf <= 0)
+        if len(crossings) == 0:
+            return False, None
+
+        search = acf[crossings[0]:]
+        peaks = np.flatnonzero(
+            (search[1:-1] >= search[:-2]) &
+            (search[1:-1] >= search[2:]) &
+            (search[1:-1] >= self.threshold)
+        )
+        if len(peaks) == 0:
+            return False, None
+
+        peak_lag = crossings[0] + peaks[0] + 1
+
+        # Mean sample spacing from the real timestamps
+        sample_spacing = (timestamps[-1] - timestamps[0]) / (n - 1)
+        if sample_spacing <= 0:
+            return False, None
+
+        return True, round(float(peak_lag * sample_spacing), 1)
@@ -0,0 +1,132 @@
+"""
+Stream Runner - drives device pipelines from the BLE sample stream
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from services.ble_simulator import BiosignalSample, BLESimulator
+from services.broadcaster import StreamBroadcaster, StreamFrame
+from services.executor import PipelineExecutor
+from services.fleet import skipped_outputs
+from services.pipeline import DevicePipeline, PipelineRegistry
+from utils.logger import setup_logger, get_processing_logger
+
+logger = setup_logger(__name__)
+processing_logger = get_processing_logger()
+
+
+class StreamRunner:
+    """
+    Event-driven processing of simulator samples, one tick per sample
+
+    A single task consumes the simulator's sample stream. Every sample is
+    a tick: it is run through the pipelines of all active devices
+    together, exactly once, as one FleetEngine pass (one per worker
+    process in process mode). Optional outputs are only computed for the
+    devices whose readers (WebSocket field selections and recent REST
+    requests) need them. The CPU work runs on the configured executor so
+    the event loop only does I/O. Each result is cached on its pipeline
+    for REST readers and published to the device's WebSocket subscribers.
+    A device drops out of the ticks when its pipeline is evicted from the
+    registry.
+    """
+
+    def __init__(
+        self,
+        simulator: BLESimulator,
+        registry: PipelineRegistry,
+        broadcaster: StreamBroadcaster,
+        executor: PipelineExecutor,
+        queue_size: int = 256
+    ):
+        self.simulator = simulator
+        self.registry = registry
+        self.broadcaster = broadcaster
+        self.executor = executor
+        self.queue_size = queue_size
+
+        # Active devices in start order (a dict as an ordered set)
+        self.devices: Dict[str, None] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, device_id: str) -> DevicePipeline:
+        """Get the device pipeline, adding the device to the ticks if needed"""
+        pipeline = self.registry.get(device_id)
+
+        if device_id not in self.devices:
+            self.devices[device_id] = None
+            logger.info(f"▶️ Stream runner started for {device_id}")
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+        return pipeline
+
+    async def stop(self, device_id: str) -> None:
+        """Stop processing samples for a device and release its worker state"""
+        if device_id in self.devices:
+            del self.devices[device_id]
+            logger.info(f"⏹️ Stream runner stopped for {device_id}")
+        await self.executor.release(device_id)
+
+    async def _run(self) -> None:
+        """Process every new sample for all active devices"""
+        samples = self.simulator.subscribe(self.queue_size)
+        try:
+            while True:
+                sample = await samples.get()
+                await self._tick(sample)
+        finally:
+            self.simulator.unsubscribe(samples)
+            if self.task is asyncio.current_task():
+                self.task = None
+
+    async def _tick(self, sample: BiosignalSample) -> None:
+        """Run one sample through the pipelines of every active device"""
+        pipelines: List[DevicePipeline] = []
+        skips = []
+
+        for device_id in list(self.devices):
+            pipeline = self.registry.peek(device_id)
+            if pipeline is None:
+                # Evicted for capacity while running
+                await self.stop(device_id)
+                continue
+
+            if pipeline.latest_sequence and sample.sequence > pipeline.latest_sequence + 1:
+                processing_logger.warning(
+                    f"SAMPLES_DROPPED | device_id={device_id} | "
+                    f"count={sample.sequence - pipeline.latest_sequence - 1}"
+                )
+
+            pipelines.append(pipeline)
+            skips.append(skipped_outputs(
+                pipeline.active_demands() + self.broadcaster.selections(device_id)
+            ))
+
+        if not pipelines:
+            return
+
+        try:
+            results = await self.executor.run_tick(pipelines, sample, skips)
+        except Exception as e:
+            logger.error(f"❌ Pipeline error for sample {sample.sequence}: {str(e)}")
+            return
+
+        # Frames are encoded lazily, once per encoding in use
+        for pipeline, result in zip(pipelines, results):
+            if self.broadcaster.subscriber_count(pipeline.device_id):
+                pipeline.touch()
+                self.broadcaster.publish(
+                    pipeline.device_id, StreamFrame("stream_data", result, sample.sequence)
+                )
+
+    async def close(self) -> None:
+        """Stop the tick task and the executor"""
+        task, self.task = self.task, None
+        self.devices.clear()
+
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.executor.close()
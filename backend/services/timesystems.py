@@ -4,14 +4,53 @@ Proprietary time-domain pattern recognition and circadian alignment
 """
 
 import numpy as np
-from datetime import datetime, time
-from typing import Dict, Optional
-import random
+from datetime import datetime
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple
 
 from models.schemas import (
-    BiosignalData, TimesystemsLayerResult, PatternType,
-    CircadianPhase, PatternRecognition, CircadianAlignment
+    PatternType, CircadianPhase, SIGNAL_CHANNELS
 )
+from models.internal import (
+    CircadianAlignmentRecord, PatternRecognitionRecord, SignalRecord
+)
+from services.spectral import PeriodicityDetector
+from utils.ring_buffer import RingBuffer
+from utils.rounding import round_half
+from utils.running_stats import SlidingTrend, SlidingWindowStats
+
+# Column of the heart rate channel in the layer's input
+HEART_RATE = SIGNAL_CHANNELS.index('heart_rate')
+
+# Pattern types by the integer code process() returns (the LIA tables'
+# pattern feature uses the same codes)
+PATTERNS = tuple(PatternType)
+
+# Trend descriptions by the integer code process() returns
+TRENDS = ("Stable", "Rising", "Declining", "Insufficient data")
+
+# Expected heart rate by circadian phase
+CIRCADIAN_REFERENCE = {
+    'morning': 70,    # 6 AM - 12 PM
+    'afternoon': 75,  # 12 PM - 6 PM
+    'evening': 72,    # 6 PM - 10 PM
+    'night': 62       # 10 PM - 6 AM
+}
+
+
+def identify_circadian_phase(timestamp: datetime) -> CircadianPhase:
+    """
+    Identify current circadian phase based on time of day
+    """
+    hour = timestamp.hour
+
+    if 6 <= hour < 12:
+        return CircadianPhase.MORNING
+    elif 12 <= hour < 18:
+        return CircadianPhase.AFTERNOON
+    elif 18 <= hour < 22:
+        return CircadianPhase.EVENING
+    else:
+        return CircadianPhase.NIGHT
 
 
 class TimesystemsLayer:
@@ -25,101 +64,214 @@ class TimesystemsLayer:
     - Rhythm coherence scoring
     - Long-term trend analysis
     - Pattern prediction
+
+    Every row of the layer's state is one device's heart rate history.
+    process() takes one sample for each of any number of rows; trends,
+    variability, consistency and circadian alignment are array operations
+    across them, and periodicity is only recomputed for rows due for it.
     """
 
-    def __init__(self):
-        self.temporal_buffer = []
+    # Result fields that can be left as None when nobody reads them
+    OPTIONAL_OUTPUTS = ('time_of_day_analysis', 'pattern_recognition', 'rhythm_score')
+
+    def __init__(self, periodicity_interval: int = 10, rows: int = 1):
         self.buffer_size = 600  # 60 seconds at 10Hz
         self.pattern_window = 100
+        self.short_term_window = 30
+        self.consistency_window = 50
+
+        # Sample times; the heart rate history is the trend accumulator's buffer
+        self.timestamps = RingBuffer(self.buffer_size, 1, rows)
+
+        # Heart rate slopes over the pattern, short-term and full windows
+        self.hr_trend = SlidingTrend(
+            (self.pattern_window, self.short_term_window, self.buffer_size), rows
+        )
+
+        # Heart rate mean/std over the consistency, pattern and full windows
+        self.consistency_stats = SlidingWindowStats(self.consistency_window, 1, rows)
+        self.pattern_stats = SlidingWindowStats(self.pattern_window, 1, rows)
+        self.long_term_stats = SlidingWindowStats(self.buffer_size, 1, rows)
+
+        # FFT autocorrelation, recomputed every periodicity_interval samples
+        self.periodicity_detector = PeriodicityDetector(
+            min_samples=50, update_interval=periodicity_interval, rows=rows
+        )
 
         # Circadian reference values (expected HR by time of day)
-        self.circadian_reference = {
-            'morning': 70,    # 6 AM - 12 PM
-            'afternoon': 75,  # 12 PM - 6 PM
-            'evening': 72,    # 6 PM - 10 PM
-            'night': 62       # 10 PM - 6 AM
-        }
+        self.circadian_reference = dict(CIRCADIAN_REFERENCE)
+
+    @staticmethod
+    def needs_patterns(skip: AbstractSet[str]) -> bool:
+        """Whether a reader needs pattern recognition (the rhythm score builds on it)"""
+        return 'pattern_recognition' not in skip or 'rhythm_score' not in skip
 
-    def process(self, data: BiosignalData) -> Dict:
+    def process(
+        self, rows, data: np.ndarray, timestamp: datetime, patterns: np.ndarray
+    ) -> Dict[str, Any]:
         """
-        Process biosignal data through Timesystems™ layer
+        Process one sample per row through Timesystems™ layer
 
         Args:
-            data: iFRS-enhanced biosignal data
+            rows: Distinct row indices (devices) that received a sample
+            data: iFRS-enhanced samples shaped [len(rows), 4] in SIGNAL_CHANNELS order
+            timestamp: Time the samples were taken
+            patterns: [len(rows)] bool, rows that need pattern recognition
+                (see needs_patterns()); the others skip periodicity detection
 
         Returns:
-            Timesystems layer processing results
+            Column arrays, one entry per row, plus the shared timestamp
+            and circadian_phase:
+            - timestamp: the ``timestamp`` argument
+            - synchronized_data: [N, 4]
+            - pattern_type: [N] index into PATTERNS
+            - temporal_consistency: [N]
+            - circadian_phase: CircadianPhase of ``timestamp``
+            - circadian_alignment: [N, 4] in CircadianAlignmentRecord field order
+            - pattern_recognition: [N] bool, the ``patterns`` argument
+            - short_term_trend, long_term_trend: [N] index into TRENDS
+            - periodicity_detected: [N] bool
+            - period_length_seconds: [N] NaN where no period was detected
+            - pattern_confidence: [N]
+            - rhythm_score: [N] NaN where patterns were not recognized
         """
-        # Add to temporal buffer with timestamp
-        timestamp = datetime.now()
-        self.temporal_buffer.append({
-            'timestamp': timestamp,
-            'data': data.dict()
-        })
-
-        if len(self.temporal_buffer) > self.buffer_size:
-            self.temporal_buffer.pop(0)
+        rows = np.asarray(rows, dtype=np.intp)
+        data = np.asarray(data, dtype=np.float64).reshape(len(rows), len(SIGNAL_CHANNELS))
+        patterns = np.asarray(patterns, dtype=bool)
+        heart_rate = data[:, HEART_RATE]
+
+        # Add to the temporal history with the sample time
+        self.timestamps.append(rows, np.full(len(rows), timestamp.timestamp()))
+        self.hr_trend.push(rows, heart_rate)
+        self.consistency_stats.push(rows, heart_rate)
+        self.pattern_stats.push(rows, heart_rate)
+        self.long_term_stats.push(rows, heart_rate)
+        count = self.timestamps.count[rows]
 
         # Identify circadian phase
         circadian_phase = self._identify_circadian_phase(timestamp)
 
-        # Analyze time-of-day patterns
-        time_of_day_analysis = self._analyze_time_of_day(data, timestamp)
-
-        # Recognize patterns
-        pattern_type = self._recognize_pattern()
-        pattern_recognition = self._detailed_pattern_recognition()
+        # Recognize patterns (the rhythm score builds on the detailed analysis)
+        pattern_type = self._recognize_pattern(rows, count)
+        recognition = self._detailed_pattern_recognition(rows, count, patterns)
 
         # Calculate temporal consistency
-        temporal_consistency = self._calculate_temporal_consistency()
+        temporal_consistency = self._calculate_temporal_consistency(rows, count)
 
         # Assess circadian alignment
-        circadian_alignment = self._assess_circadian_alignment(
-            data.heart_rate, circadian_phase
-        )
+        circadian_alignment = self._assess_circadian_alignment(heart_rate, circadian_phase)
 
         # Calculate rhythm score
-        rhythm_score = self._calculate_rhythm_score(
-            temporal_consistency, circadian_alignment, pattern_recognition
+        rhythm_score = np.where(
+            patterns,
+            self._calculate_rhythm_score(
+                temporal_consistency, circadian_alignment, recognition['pattern_confidence']
+            ),
+            np.nan
         )
 
         # Apply temporal synchronization
         synchronized_data = self._synchronize_signals(data)
 
-        # Generate processing notes
-        notes = self._generate_processing_notes(
-            pattern_type, circadian_phase, rhythm_score
-        )
-
         return {
+            'timestamp': timestamp,
             'synchronized_data': synchronized_data,
             'pattern_type': pattern_type,
             'temporal_consistency': temporal_consistency,
             'circadian_phase': circadian_phase,
-            'time_of_day_analysis': time_of_day_analysis,
-            'pattern_recognition': pattern_recognition,
             'circadian_alignment': circadian_alignment,
-            'rhythm_score': rhythm_score,
-            'processing_notes': notes
+            'pattern_recognition': patterns,
+            **recognition,
+            'rhythm_score': rhythm_score
         }
 
+    def results(
+        self, columns: Dict[str, Any], skips: Sequence[AbstractSet[str]]
+    ) -> List[Dict]:
+        """
+        Per-row layer results (the response fields) from process() columns
+
+        Args:
+            columns: Output of process()
+            skips: Per row, the OPTIONAL_OUTPUTS to leave as None
+        """
+        circadian_phase = columns['circadian_phase']
+        results = []
+
+        for (
+            data, pattern_type, consistency, alignment, recognized, short_term, long_term,
+            periodicity, period, confidence, rhythm_score, skip
+        ) in zip(
+            columns['synchronized_data'].tolist(),
+            columns['pattern_type'].tolist(),
+            columns['temporal_consistency'].tolist(),
+            columns['circadian_alignment'].tolist(),
+            columns['pattern_recognition'].tolist(),
+            columns['short_term_trend'].tolist(),
+            columns['long_term_trend'].tolist(),
+            columns['periodicity_detected'].tolist(),
+            columns['period_length_seconds'].tolist(),
+            columns['pattern_confidence'].tolist(),
+            columns['rhythm_score'].tolist(),
+            skips
+        ):
+            synchronized_data = SignalRecord(*data)
+
+            # Analyze time-of-day patterns
+            time_of_day_analysis = None
+            if 'time_of_day_analysis' not in skip:
+                time_of_day_analysis = self._analyze_time_of_day(synchronized_data, columns['timestamp'])
+
+            pattern_recognition = None
+            if recognized:
+                pattern_recognition = PatternRecognitionRecord(
+                    short_term_trend=TRENDS[short_term],
+                    long_term_trend=TRENDS[long_term],
+                    periodicity_detected=periodicity,
+                    period_length_seconds=None if period != period else period,
+                    pattern_confidence=confidence
+                )
+
+            results.append({
+                'synchronized_data': synchronized_data,
+                'pattern_type': PATTERNS[pattern_type],
+                'temporal_consistency': consistency,
+                'circadian_phase': circadian_phase,
+                'time_of_day_analysis': time_of_day_analysis,
+                'pattern_recognition': pattern_recognition,
+                'circadian_alignment': CircadianAlignmentRecord(*alignment),
+                'rhythm_score': None if 'rhythm_score' in skip or not recognized else rhythm_score,
+                'processing_notes': None
+            })
+
+        return results
+
+    def clear(self, rows) -> None:
+        """Drop the history of ``rows``"""
+        self.timestamps.clear(rows)
+        self.hr_trend.clear(rows)
+        self.consistency_stats.clear(rows)
+        self.pattern_stats.clear(rows)
+        self.long_term_stats.clear(rows)
+        self.periodicity_detector.reset(rows)
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.timestamps.resize(rows)
+        self.hr_trend.resize(rows)
+        self.consistency_stats.resize(rows)
+        self.pattern_stats.resize(rows)
+        self.long_term_stats.resize(rows)
+        self.periodicity_detector.resize(rows)
+
     def _identify_circadian_phase(self, timestamp: datetime) -> CircadianPhase:
         """
         Identify current circadian phase based on time of day
         """
-        hour = timestamp.hour
-
-        if 6 <= hour < 12:
-            return CircadianPhase.MORNING
-        elif 12 <= hour < 18:
-            return CircadianPhase.AFTERNOON
-        elif 18 <= hour < 22:
-            return CircadianPhase.EVENING
-        else:
-            return CircadianPhase.NIGHT
+        return identify_circadian_phase(timestamp)
 
     def _analyze_time_of_day(
-        self, data: BiosignalData, timestamp: datetime
+        self, data: SignalRecord, timestamp: datetime
     ) -> Dict:
         """
         Analyze physiological metrics in context of time of day
@@ -181,117 +333,96 @@ class TimesystemsLayer:
         else:
             return "Within normal variation"
 
-    def _recognize_pattern(self) -> PatternType:
+    def _recognize_pattern(self, rows: np.ndarray, count: np.ndarray) -> np.ndarray:
         """
         Recognize overall pattern type from temporal data
+
+        Returns:
+            Index into PATTERNS per row
         """
-        if len(self.temporal_buffer) < 20:
-            return PatternType.STABLE
-
-        # Extract heart rate trend
-        recent_data = self.temporal_buffer[-min(self.pattern_window, len(self.temporal_buffer)):]
-        hr_values = [sample['data']['heart_rate'] for sample in recent_data]
-
-        # Calculate trend using linear regression
-        if len(hr_values) < 2:
-            return PatternType.STABLE
-
-        x = np.arange(len(hr_values))
-        coefficients = np.polyfit(x, hr_values, 1)
-        slope = coefficients[0]
-
-        # Calculate variability
-        hr_std = np.std(hr_values)
-
-        # Classify pattern
-        if abs(slope) < 0.05 and hr_std < 5:
-            return PatternType.STABLE
-        elif slope > 0.15:
-            return PatternType.INCREASING
-        elif slope < -0.15:
-            return PatternType.DECREASING
-        elif hr_std > 10:
-            return PatternType.IRREGULAR
-        else:
-            return PatternType.OSCILLATING
+        # Linear regression slope from the running accumulator
+        slope = self.hr_trend.slope(rows, self.pattern_window)
+
+        # Variability over the same window
+        hr_std = self.pattern_stats.std(rows)[:, 0]
+
+        # Classify pattern (stable until 20 samples are buffered)
+        rules = [
+            (count < 20, PatternType.STABLE),
+            ((np.abs(slope) < 0.05) & (hr_std < 5), PatternType.STABLE),
+            (slope > 0.15, PatternType.INCREASING),
+            (slope < -0.15, PatternType.DECREASING),
+            (hr_std > 10, PatternType.IRREGULAR)
+        ]
+        return np.select(
+            [mask for mask, _ in rules],
+            [PATTERNS.index(pattern) for _, pattern in rules],
+            default=PATTERNS.index(PatternType.OSCILLATING)
+        )
 
-    def _detailed_pattern_recognition(self) -> PatternRecognition:
+    def _detailed_pattern_recognition(
+        self, rows: np.ndarray, count: np.ndarray, patterns: np.ndarray
+    ) -> Dict[str, np.ndarray]:
         """
         Detailed pattern recognition analysis
+
+        Rows with fewer than 20 samples report insufficient data. Only the
+        ``patterns`` rows detect periodicity; the others drop their cached
+        estimate, which would be stale by the time a reader asks again.
         """
-        if len(self.temporal_buffer) < 20:
-            return PatternRecognition(
-                short_term_trend="Stable",
-                long_term_trend="Insufficient data",
-                periodicity_detected=False,
-                period_length_seconds=None,
-                pattern_confidence=0.5
-            )
+        insufficient = count < 20
 
         # Short-term trend (last 30 samples)
-        short_window = min(30, len(self.temporal_buffer))
-        short_term_hr = [
-            s['data']['heart_rate']
-            for s in self.temporal_buffer[-short_window:]
-        ]
-        short_term_trend = self._calculate_trend_description(short_term_hr)
+        short_term_trend = np.where(
+            insufficient, TRENDS.index("Stable"),
+            self._calculate_trend_description(self.hr_trend.slope(rows, self.short_term_window))
+        )
 
         # Long-term trend (all buffered samples)
-        long_term_hr = [s['data']['heart_rate'] for s in self.temporal_buffer]
-        long_term_trend = self._calculate_trend_description(long_term_hr)
+        long_term_trend = np.where(
+            insufficient, TRENDS.index("Insufficient data"),
+            self._calculate_trend_description(self.hr_trend.slope(rows, self.buffer_size))
+        )
 
         # Detect periodicity using autocorrelation
-        periodicity, period = self._detect_periodicity(long_term_hr)
+        detected = patterns & ~insufficient
+        periodicity = np.zeros(len(rows), dtype=bool)
+        period = np.full(len(rows), np.nan)
+        periodicity[detected], period[detected] = self._detect_periodicity(rows[detected])
+        self.periodicity_detector.reset(rows[~patterns])
 
         # Calculate pattern confidence
-        confidence = self._calculate_pattern_confidence(long_term_hr)
-
-        return PatternRecognition(
-            short_term_trend=short_term_trend,
-            long_term_trend=long_term_trend,
-            periodicity_detected=periodicity,
-            period_length_seconds=period,
-            pattern_confidence=confidence
-        )
-
-    def _calculate_trend_description(self, values: list) -> str:
-        """Calculate descriptive trend from values"""
-        if len(values) < 2:
-            return "Stable"
+        confidence = np.where(insufficient, 0.5, self._calculate_pattern_confidence(rows))
 
-        x = np.arange(len(values))
-        coefficients = np.polyfit(x, values, 1)
-        slope = coefficients[0]
+        return {
+            'short_term_trend': short_term_trend,
+            'long_term_trend': long_term_trend,
+            'periodicity_detected': periodicity,
+            'period_length_seconds': period,
+            'pattern_confidence': confidence
+        }
 
-        if slope > 0.2:
-            return "Rising"
-        elif slope < -0.2:
-            return "Declining"
-        else:
-            return "Stable"
+    def _calculate_trend_description(self, slope: np.ndarray) -> np.ndarray:
+        """Index into TRENDS of the descriptive trend of per-sample slopes"""
+        return np.select(
+            [slope > 0.2, slope < -0.2],
+            [TRENDS.index("Rising"), TRENDS.index("Declining")],
+            default=TRENDS.index("Stable")
+        )
 
-    def _detect_periodicity(self, values: list) -> tuple[bool, Optional[float]]:
+    def _detect_periodicity(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Detect periodicity in signal using autocorrelation
+        Detect periodicity in each row's heart rate using autocorrelation
+
+        The autocorrelation is computed via FFT and cached between
+        recomputes; periods are measured with the sample timestamps.
 
         Returns:
-            (periodicity_detected, period_in_seconds)
+            (periodicity_detected, period_in_seconds or NaN) per row
         """
-        if len(values) < 50:
-            return False, None
-
-        # Simulate periodicity detection
-        # Real implementation would use autocorrelation
-        periodicity_detected = random.random() > 0.6
-
-        if periodicity_detected:
-            # Typical respiratory rhythm: 15 breaths/min = 4 second period
-            period = random.uniform(3.0, 6.0)
-            return True, round(period, 1)
-
-        return False, None
+        return self.periodicity_detector.update(rows, self.hr_trend.values, self.timestamps)
 
-    def _calculate_pattern_confidence(self, values: list) -> float:
+    def _calculate_pattern_confidence(self, rows: np.ndarray) -> np.ndarray:
         """
         Calculate confidence in pattern recognition
 
@@ -300,79 +431,71 @@ class TimesystemsLayer:
         - Signal consistency
         - Pattern clarity
         """
-        if len(values) < 10:
-            return 0.3
+        count = self.long_term_stats.count(rows)
 
         # More data = higher confidence
-        data_confidence = min(1.0, len(values) / 100)
+        data_confidence = np.minimum(1.0, count / 100)
 
         # Lower variance = higher confidence
-        normalized_std = np.std(values) / max(np.mean(values), 1)
-        consistency_confidence = max(0.3, 1.0 - normalized_std)
+        normalized_std = (
+            self.long_term_stats.std(rows)[:, 0] / np.maximum(self.long_term_stats.mean(rows)[:, 0], 1)
+        )
+        consistency_confidence = np.maximum(0.3, 1.0 - normalized_std)
 
         overall_confidence = (data_confidence + consistency_confidence) / 2
 
-        return round(float(overall_confidence), 2)
+        return np.where(count < 10, 0.3, round_half(overall_confidence, 2))
 
-    def _calculate_temporal_consistency(self) -> float:
+    def _calculate_temporal_consistency(self, rows: np.ndarray, count: np.ndarray) -> np.ndarray:
         """
         Calculate temporal consistency score
 
         Measures how stable signals are over time
         """
-        if len(self.temporal_buffer) < 10:
-            return 0.75
-
-        hr_values = [s['data']['heart_rate'] for s in self.temporal_buffer[-50:]]
-
         # Calculate coefficient of variation
-        mean_hr = np.mean(hr_values)
-        std_hr = np.std(hr_values)
-
-        if mean_hr == 0:
-            return 0.5
+        mean_hr = self.consistency_stats.mean(rows)[:, 0]
+        std_hr = self.consistency_stats.std(rows)[:, 0]
 
-        cv = std_hr / mean_hr
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = std_hr / mean_hr
 
         # Lower CV = higher consistency
-        consistency = max(0.3, 1.0 - (cv * 2))
-        consistency = min(1.0, consistency)
+        consistency = round_half(np.clip(1.0 - (cv * 2), 0.3, 1.0), 2)
 
-        return round(float(consistency), 2)
+        return np.select([count < 10, mean_hr == 0], [0.75, 0.5], default=consistency)
 
     def _assess_circadian_alignment(
-        self, heart_rate: float, phase: CircadianPhase
-    ) -> CircadianAlignment:
+        self, heart_rate: np.ndarray, phase: CircadianPhase
+    ) -> np.ndarray:
         """
         Assess how well current physiology aligns with circadian expectations
+
+        Returns:
+            [len(heart_rate), 4] in CircadianAlignmentRecord field order
         """
         expected_hr = self.circadian_reference[phase.value]
 
         # Calculate alignment score
-        deviation = abs(heart_rate - expected_hr)
+        deviation = np.abs(heart_rate - expected_hr)
         max_acceptable_deviation = 20  # bpm
 
-        alignment_score = max(0.0, 1.0 - (deviation / max_acceptable_deviation))
-        alignment_score = min(1.0, alignment_score)
+        alignment_score = np.clip(1.0 - (deviation / max_acceptable_deviation), 0.0, 1.0)
 
-        # Calculate phase shift
-        if heart_rate > expected_hr:
-            phase_shift = (heart_rate - expected_hr) * 2  # Rough estimate in minutes
-        else:
-            phase_shift = -(expected_hr - heart_rate) * 2
+        # Calculate phase shift (rough estimate in minutes)
+        phase_shift = (heart_rate - expected_hr) * 2
 
-        return CircadianAlignment(
-            expected_heart_rate=expected_hr,
-            actual_heart_rate=heart_rate,
-            alignment_score=round(alignment_score, 2),
-            phase_shift_minutes=round(phase_shift, 1)
-        )
+        return np.column_stack([
+            np.full(len(heart_rate), float(expected_hr)),
+            heart_rate,
+            round_half(alignment_score, 2),
+            round_half(phase_shift, 1)
+        ])
 
     def _calculate_rhythm_score(
-        self, temporal_consistency: float,
-        circadian_alignment: CircadianAlignment,
-        pattern_recognition: PatternRecognition
-    ) -> float:
+        self, temporal_consistency: np.ndarray,
+        circadian_alignment: np.ndarray,
+        pattern_confidence: np.ndarray
+    ) -> np.ndarray:
         """
         Calculate overall rhythm health score (0-100)
 
@@ -382,14 +505,14 @@ class TimesystemsLayer:
         - Pattern clarity
         """
         consistency_score = temporal_consistency * 40
-        alignment_score = circadian_alignment.alignment_score * 35
-        pattern_score = pattern_recognition.pattern_confidence * 25
+        alignment_score = circadian_alignment[:, 2] * 35
+        pattern_score = pattern_confidence * 25
 
         rhythm_score = consistency_score + alignment_score + pattern_score
 
-        return round(rhythm_score, 1)
+        return round_half(rhythm_score, 1)
 
-    def _synchronize_signals(self, data: BiosignalData) -> BiosignalData:
+    def _synchronize_signals(self, data: np.ndarray) -> np.ndarray:
         """
         Apply temporal synchronization to signals
 
@@ -402,15 +525,17 @@ class TimesystemsLayer:
         # Real implementation would apply sophisticated timing corrections
         return data
 
-    def _generate_processing_notes(
-        self, pattern: PatternType, phase: CircadianPhase, rhythm_score: float
+    @staticmethod
+    def generate_processing_notes(
+        pattern: PatternType, phase: CircadianPhase, rhythm_score: Optional[float]
     ) -> str:
         """Generate human-readable processing notes"""
         notes = []
 
         notes.append(f"Pattern: {pattern.value.title()}")
         notes.append(f"Circadian Phase: {phase.value.title()}")
-        notes.append(f"Rhythm Score: {rhythm_score:.1f}/100")
+        if rhythm_score is not None:
+            notes.append(f"Rhythm Score: {rhythm_score:.1f}/100")
         notes.append("Temporal window: 60s")
         notes.append("Circadian alignment assessed")
 
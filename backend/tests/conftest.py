@@ -0,0 +1,42 @@
+"""
+Shared fixtures for the backend tests
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Tests import the backend modules the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+def wait_until(condition, timeout: float = 5.0, interval: float = 0.02):
+    """Poll ``condition`` until it holds, failing the test after ``timeout`` seconds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail(f"Timed out after {timeout}s waiting for {condition}")
+        time.sleep(interval)
+
+
+@pytest.fixture
+def client():
+    """Test client with the app's lifespan (simulator, runner, executor) running"""
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def pause_simulator(client: TestClient):
+    """Stop the BLE simulator, so no new samples arrive"""
+    client.portal.call(main.ble_simulator.stop)
+
+
+def resume_simulator(client: TestClient):
+    """Restart a paused BLE simulator"""
+    client.portal.call(main.ble_simulator.start)
@@ -0,0 +1,83 @@
+"""
+Delta stream fan-out: keyframes, deltas and resync after dropped frames
+"""
+
+import json
+
+from pydantic import BaseModel
+
+from services.broadcaster import StreamBroadcaster, StreamFrame
+from utils.delta import DeltaCursor
+from utils.serialization import FrameEncoder
+
+
+class Reading(BaseModel):
+    heart_rate: float
+    condition: str
+
+
+class Pulse(BaseModel):
+    heart_rate: float
+
+
+def publish(broadcaster: StreamBroadcaster, seq: int, heart_rate: float, condition: str = "Resting"):
+    broadcaster.publish("device", StreamFrame("stream_data", Reading(heart_rate=heart_rate, condition=condition), seq))
+
+
+def receive(subscription, cursor: DeltaCursor, encoder: FrameEncoder):
+    """Next frame of a subscription as the delta WebSocket client would get it"""
+    frame = subscription.queue.get_nowait()
+    kind = cursor.next_kind(frame.seq, frame.base_seq, frame.layout)
+    return kind, json.loads(frame.encode(encoder, kind))
+
+
+def test_delta_stream_resyncs_after_dropped_frames():
+    broadcaster = StreamBroadcaster(queue_size=2)
+    subscription = broadcaster.subscribe("device", "delta")
+    cursor = DeltaCursor(keyframe_interval=50)
+    encoder = FrameEncoder()
+
+    publish(broadcaster, 1, 70.0)
+    kind, message = receive(subscription, cursor, encoder)
+    assert kind == "keyframe"
+    assert message["fields"] == ["heart_rate", "condition"]
+    assert message["values"] == [70.0, "Resting"]
+
+    publish(broadcaster, 2, 71.0)
+    kind, message = receive(subscription, cursor, encoder)
+    assert kind == "delta"
+    assert message == {"type": "stream_data_delta", "seq": 2, "base": 1, "changes": [[0, 71.0]]}
+
+    # A slow consumer: frame 3 is dropped from the full queue
+    for seq, heart_rate in ((3, 72.0), (4, 73.0), (5, 74.0)):
+        publish(broadcaster, seq, heart_rate)
+    assert subscription.dropped == 1
+
+    # Frame 4's delta is against frame 3, which never arrived: resync with
+    # a keyframe, in the known layout so without the field names
+    kind, message = receive(subscription, cursor, encoder)
+    assert kind == "values"
+    assert message == {"type": "stream_data_keyframe", "seq": 4, "values": [73.0, "Resting"]}
+
+    kind, message = receive(subscription, cursor, encoder)
+    assert kind == "delta"
+    assert message["base"] == 4
+
+
+def test_keyframe_interval_and_layout_changes():
+    broadcaster = StreamBroadcaster(queue_size=8)
+    subscription = broadcaster.subscribe("device", "delta")
+    cursor = DeltaCursor(keyframe_interval=2)
+    encoder = FrameEncoder()
+
+    kinds = []
+    for seq in range(1, 6):
+        publish(broadcaster, seq, 70.0 + seq)
+        kinds.append(receive(subscription, cursor, encoder)[0])
+    assert kinds == ["keyframe", "delta", "values", "delta", "values"]
+
+    # A frame with different fields cannot be a delta and carries its layout
+    broadcaster.publish("device", StreamFrame("stream_data", Pulse(heart_rate=80.0), 6))
+    kind, message = receive(subscription, cursor, encoder)
+    assert kind == "keyframe"
+    assert message["fields"] == ["heart_rate"]
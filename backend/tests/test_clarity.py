@@ -0,0 +1,106 @@
+"""
+ClarityLayer.process_batch against the per-sample process() path
+"""
+
+import numpy as np
+import pytest
+
+from services.clarity import ClarityLayer, QUALITY_METRIC_FIELDS, artifacts_from_flags
+
+
+def noisy_samples(n: int, seed: int) -> np.ndarray:
+    """Samples varied enough to trigger noise reduction and artifacts"""
+    rng = np.random.default_rng(seed)
+    samples = np.column_stack([
+        rng.normal(80, 30, n),    # heart_rate
+        rng.uniform(85, 101, n),  # spo2
+        rng.normal(37, 1.5, n),   # temperature
+        rng.uniform(0, 120, n)    # activity
+    ])
+    # Activity bursts for the motion-artifact path
+    samples[5::7, 3] = 190.0
+    return np.round(samples, 1)
+
+
+def process_loop(layer: ClarityLayer, samples: np.ndarray, row: int = 0) -> list:
+    return [ClarityLayer.results(layer.process([row], sample))[0] for sample in samples]
+
+
+def assert_batch_matches_loop(batch: dict, results: list):
+    assert len(batch['quality_score']) == len(results)
+    for i, result in enumerate(results):
+        metrics = result['quality_metrics']
+        np.testing.assert_allclose(
+            batch['quality_metrics'][i],
+            [getattr(metrics, name) for name in QUALITY_METRIC_FIELDS],
+            rtol=1e-9, atol=1e-12
+        )
+        assert batch['quality_score'][i] == pytest.approx(result['quality_score'])
+        processed = result['processed_data']
+        np.testing.assert_allclose(batch['processed_data'][i], [
+            processed.heart_rate, processed.spo2, processed.temperature, processed.activity
+        ])
+        assert batch['signal_to_noise_ratio'][i] == pytest.approx(result['signal_to_noise_ratio'])
+        assert bool(batch['noise_reduction_applied'][i]) == result['noise_reduction_applied']
+        assert batch['quality_assessment'][i] == result['quality_assessment'].value
+        assert artifacts_from_flags(batch['artifact_flags'][i]) == result['artifacts_detected']
+
+
+@pytest.mark.parametrize("history", [0, 3, 60])
+def test_process_batch_matches_process_loop(history):
+    warmup = noisy_samples(history, seed=10)
+    samples = noisy_samples(80, seed=11)
+    batched, looped = ClarityLayer(rows=2), ClarityLayer(rows=2)
+    process_loop(batched, warmup, row=1)
+    process_loop(looped, warmup, row=1)
+
+    batch = batched.process_batch(samples, row=1)
+    results = process_loop(looped, samples, row=1)
+
+    assert_batch_matches_loop(batch, results)
+    assert batch['noise_reduction_applied'].any()
+    assert any("Motion artifact" in result['artifacts_detected'] for result in results)
+
+    # Both layers carry on from the same state
+    follow_up = noisy_samples(20, seed=12)
+    assert_batch_matches_loop(
+        batched.process_batch(follow_up, row=1), process_loop(looped, follow_up, row=1)
+    )
+    assert batched.history_buffer.count[0] == 0
+
+
+def test_process_batch_single_row():
+    samples = noisy_samples(12, seed=13)
+    batched, looped = ClarityLayer(), ClarityLayer()
+    for sample in samples:
+        assert_batch_matches_loop(batched.process_batch(sample[None, :]), process_loop(looped, sample[None, :]))
+
+
+def test_process_rows_match_separate_layers():
+    streams = [noisy_samples(40, seed=seed) for seed in (15, 16, 17)]
+    fleet = ClarityLayer(rows=3)
+    singles = [ClarityLayer() for _ in streams]
+
+    for i in range(40):
+        # Row 2 only gets every other sample
+        rows = [0, 1, 2] if i % 2 == 0 else [1, 0]
+        columns = fleet.process(rows, np.array([streams[row][i] for row in rows]))
+        for j, row in enumerate(rows):
+            expected = singles[row].process([0], streams[row][i])
+            for name, column in columns.items():
+                np.testing.assert_array_equal(column[j], expected[name][0])
+
+
+@pytest.mark.parametrize("history", [0, 20])
+def test_process_batch_empty(history):
+    layer = ClarityLayer()
+    process_loop(layer, noisy_samples(history, seed=14))
+
+    batch = layer.process_batch(np.empty((0, 4)))
+
+    assert batch['processed_data'].shape == (0, 4)
+    assert batch['quality_metrics'].shape == (0, len(QUALITY_METRIC_FIELDS))
+    for name in ('quality_score', 'signal_to_noise_ratio', 'noise_reduction_applied',
+                 'quality_assessment', 'artifact_flags'):
+        assert batch[name].shape == (0,)
+    assert layer.history_buffer.count[0] == min(history, layer.stability_window)
@@ -0,0 +1,77 @@
+"""
+Pipeline executor modes produce the same results as running the pipeline directly
+"""
+
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from models.schemas import BiosignalData
+from services.ble_simulator import BiosignalSample
+from services.executor import PipelineExecutor
+from services.pipeline import DevicePipeline
+
+DEVICES = ("executor-a", "executor-b", "executor-c")
+
+
+def samples(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return [
+        BiosignalSample(sequence, datetime.now(), BiosignalData(
+            heart_rate=float(rng.normal(75, 15)), spo2=float(rng.uniform(92, 100)),
+            temperature=float(rng.normal(36.8, 0.4)), activity=float(rng.uniform(0, 150))
+        ))
+        for sequence in range(1, n + 1)
+    ]
+
+
+def deterministic_view(result):
+    """Output of the layers that does not depend on the wall clock"""
+    return (
+        result.clarity_layer.model_dump(),
+        result.ifrs_layer.model_dump(),
+        result.timesystems_layer.pattern_type,
+        result.timesystems_layer.temporal_consistency,
+    )
+
+
+async def run_devices(executor: PipelineExecutor, streams):
+    await executor.start()
+    pipelines = {device: DevicePipeline(device) for device in streams}
+    results = {device: [] for device in streams}
+    try:
+        for tick in range(len(next(iter(streams.values())))):
+            # One sample per device at a time, as the stream runner does
+            outputs = await asyncio.gather(*(
+                executor.run(pipelines[device], stream[tick])
+                for device, stream in streams.items()
+            ))
+            for device, result in zip(streams, outputs):
+                results[device].append(result)
+    finally:
+        await executor.close()
+    return pipelines, results
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_executor_modes_match_direct_processing(mode):
+    streams = {device: samples(25, seed) for seed, device in enumerate(DEVICES)}
+
+    pipelines, results = asyncio.run(run_devices(PipelineExecutor(mode, workers=2), streams))
+
+    for device, stream in streams.items():
+        direct = DevicePipeline(device)
+        expected = [deterministic_view(direct.process(sample.data)) for sample in stream]
+        assert [deterministic_view(result) for result in results[device]] == expected
+
+        pipeline = pipelines[device]
+        assert pipeline.samples_processed == len(stream)
+        assert pipeline.latest_sequence == stream[-1].sequence
+        assert pipeline.latest_result is results[device][-1]
+
+
+def test_unknown_executor_mode():
+    with pytest.raises(ValueError):
+        PipelineExecutor('fiber')
@@ -0,0 +1,109 @@
+"""
+FleetEngine: one vectorized step over many devices against single-device engines
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from models.schemas import BiosignalData
+from services.fleet import FleetEngine, OPTIONAL_OUTPUTS
+
+START = datetime(2026, 10, 17, 14, 0, 0)
+
+
+def sample_stream(n: int, seed: int) -> list:
+    """Wandering vitals with occasional activity bursts"""
+    rng = np.random.default_rng(seed)
+    heart_rate = np.clip(72 + np.cumsum(rng.normal(0, 2, n)), 40, 180)
+    return [
+        BiosignalData(
+            heart_rate=round(float(heart_rate[i]), 1),
+            spo2=round(float(rng.uniform(90, 100)), 1),
+            temperature=round(float(rng.normal(36.8, 0.6)), 2),
+            activity=170.0 if rng.random() < 0.1 else round(float(rng.uniform(0, 80)), 1)
+        )
+        for i in range(n)
+    ]
+
+
+def response_json(response) -> dict:
+    return response.model_dump(mode="json")
+
+
+def test_step_matches_single_device_engines():
+    devices = [f"device_{i}" for i in range(5)]
+    streams = {device: sample_stream(200, seed) for seed, device in enumerate(devices)}
+    fleet = FleetEngine(capacity=8)
+    singles = {device: FleetEngine(capacity=1) for device in devices}
+
+    for i in range(200):
+        timestamp = START + timedelta(seconds=i / 10)
+        # Device 3 only samples on every third tick, device 4 drops out halfway
+        sampled = [
+            device for j, device in enumerate(devices)
+            if (j != 3 or i % 3 == 0) and (j != 4 or i < 100)
+        ]
+        samples = [streams[device][i] for device in sampled]
+
+        results = fleet.step(sampled, samples, [frozenset()] * len(sampled), timestamp)
+
+        for device, sample, result in zip(sampled, samples, results):
+            expected, = singles[device].step([device], [sample], [frozenset()], timestamp)
+            assert response_json(result) == response_json(expected)
+
+
+def test_released_rows_are_reused_and_start_fresh():
+    fleet = FleetEngine(capacity=2)
+    stream = sample_stream(60, seed=20)
+    for i, sample in enumerate(stream):
+        fleet.step(["a", "b"], [sample, sample], [frozenset()] * 2, START + timedelta(seconds=i))
+
+    slot = fleet.slots["a"]
+    assert fleet.release("a")
+    assert not fleet.release("a")
+    assert "a" not in fleet
+
+    fresh = FleetEngine(capacity=1)
+    for i, sample in enumerate(stream[:20]):
+        timestamp = START + timedelta(seconds=i)
+        result, = fleet.step(["c"], [sample], [frozenset()], timestamp)
+        expected, = fresh.step(["c"], [sample], [frozenset()], timestamp)
+        assert response_json(result) == response_json(expected)
+    assert fleet.slots["c"] == slot
+    assert len(fleet) == 2
+
+
+def test_engine_grows_beyond_its_capacity():
+    fleet = FleetEngine(capacity=2)
+    single = FleetEngine(capacity=1)
+    stream = sample_stream(30, seed=21)
+
+    for i, sample in enumerate(stream):
+        timestamp = START + timedelta(seconds=i)
+        devices = ["a", "b"] if i < 10 else ["a", "b", "c", "d", "e"]
+        results = fleet.step(devices, [sample] * len(devices), [frozenset()] * len(devices), timestamp)
+        expected, = single.step(["a"], [sample], [frozenset()], timestamp)
+        assert response_json(results[0]) == response_json(expected)
+
+    assert fleet.capacity == 8
+    assert sorted(fleet.slots.values()) == [0, 1, 2, 3, 4]
+
+
+def test_skipped_outputs_are_left_out_per_device():
+    fleet = FleetEngine(capacity=2)
+    skip = frozenset(OPTIONAL_OUTPUTS)
+    stream = sample_stream(40, seed=22)
+
+    for i, sample in enumerate(stream):
+        lean, full = fleet.step(["lean", "full"], [sample, sample], [skip, frozenset()], START + timedelta(seconds=i))
+
+    assert lean.lia_insights is None
+    assert lean.timesystems_layer.time_of_day_analysis is None
+    assert lean.timesystems_layer.pattern_recognition is None
+    assert lean.timesystems_layer.rhythm_score is None
+    assert full.lia_insights is not None
+    assert full.timesystems_layer.pattern_recognition is not None
+    assert full.timesystems_layer.rhythm_score is not None
+    assert lean.clarity_layer == full.clarity_layer
+    assert lean.ifrs_layer == full.ifrs_layer
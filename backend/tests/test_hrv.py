@@ -0,0 +1,97 @@
+"""
+Streaming HRV accumulators against direct NumPy computation
+"""
+
+import numpy as np
+import pytest
+
+from services.hrv import StreamingHRV
+
+
+def reference(window: np.ndarray):
+    diffs = np.diff(window)
+    return (
+        np.std(window),
+        np.sqrt(np.mean(diffs ** 2)),
+        np.mean(np.abs(diffs) > 50) * 100
+    )
+
+
+def test_streaming_hrv_matches_numpy_over_the_window():
+    intervals = np.random.default_rng(8).normal(800, 60, size=(3, 400))
+    hrv = StreamingHRV(window=50, rows=3)
+    rows = np.arange(3)
+
+    for i in range(400):
+        hrv.push(rows, intervals[:, i])
+        windows = intervals[:, max(0, i - 49):i + 1]
+        np.testing.assert_array_equal(hrv.count(rows), windows.shape[1])
+        if windows.shape[1] < 2:
+            continue
+        sdnn, rmssd, pnn50 = zip(*map(reference, windows))
+        np.testing.assert_allclose(hrv.sdnn(rows), sdnn, rtol=1e-9)
+        np.testing.assert_allclose(hrv.rmssd(rows), rmssd, rtol=1e-9)
+        np.testing.assert_allclose(hrv.pnn50(rows), pnn50)
+
+
+def test_rows_pushed_on_different_ticks():
+    intervals = np.random.default_rng(10).normal(800, 60, 120)
+    hrv = StreamingHRV(window=20, rows=2)
+
+    # Row 1 gets every third interval
+    for i, rr in enumerate(intervals):
+        hrv.push([0, 1] if i % 3 == 0 else [0], [rr, rr] if i % 3 == 0 else [rr])
+
+    for row, window in ((0, intervals[-20:]), (1, intervals[::3][-20:])):
+        sdnn, rmssd, pnn50 = reference(window)
+        assert hrv.sdnn([row])[0] == pytest.approx(sdnn, rel=1e-9)
+        assert hrv.rmssd([row])[0] == pytest.approx(rmssd, rel=1e-9)
+        assert hrv.pnn50([row])[0] == pytest.approx(pnn50)
+
+
+def test_flat_intervals_have_zero_variability():
+    hrv = StreamingHRV(window=10)
+    for rr in (700.0, 910.0, 650.0) + (800.0,) * 10:
+        hrv.push([0], [rr])
+
+    assert hrv.sdnn([0])[0] == 0.0
+    assert hrv.rmssd([0])[0] == 0.0
+    assert hrv.pnn50([0])[0] == 0.0
+
+
+def test_short_history_and_clear():
+    hrv = StreamingHRV(rows=2)
+    assert hrv.rmssd([0])[0] == 0.0 and hrv.pnn50([0])[0] == 0.0
+
+    hrv.push([0], [800.0])
+    assert hrv.count([0])[0] == 1
+    assert hrv.rmssd([0])[0] == 0.0
+
+    hrv.push([0], [900.0])
+    hrv.clear([0])
+    hrv.resize(4)
+    np.testing.assert_array_equal(hrv.count([0, 1, 2, 3]), 0)
+    np.testing.assert_array_equal(hrv.rmssd([0, 3]), 0.0)
+
+
+def test_resync_keeps_long_streams_exact():
+    intervals = np.random.default_rng(9).normal(800, 60, 3000)
+    hrv = StreamingHRV(window=50, resync_interval=1000)
+    for rr in intervals:
+        hrv.push([0], [rr])
+
+    sdnn, rmssd, pnn50 = reference(intervals[-50:])
+    assert hrv.sdnn([0])[0] == pytest.approx(sdnn, rel=1e-9)
+    assert hrv.rmssd([0])[0] == pytest.approx(rmssd, rel=1e-9)
+    assert hrv.pnn50([0])[0] == pytest.approx(pnn50)
+
+
+def test_resync_of_a_partial_window():
+    intervals = np.random.default_rng(11).normal(800, 60, 30)
+    hrv = StreamingHRV(window=50, resync_interval=30)
+    for rr in intervals:
+        hrv.push([0], [rr])
+
+    sdnn, rmssd, pnn50 = reference(intervals)
+    assert hrv.rmssd([0])[0] == pytest.approx(rmssd, rel=1e-9)
+    assert hrv.pnn50([0])[0] == pytest.approx(pnn50)
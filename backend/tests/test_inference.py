@@ -0,0 +1,171 @@
+"""
+LIA model inference: backends, micro-batching and the health report
+"""
+
+import asyncio
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models.schemas import BiosignalData
+from services.ble_simulator import BiosignalSample
+from services.executor import PipelineExecutor
+from services.inference import (
+    InferenceBackend, MicroBatcher, SklearnBackend, load_backend, result_features
+)
+from services.lia_rules import CONDITIONS, FEATURES, evaluate
+from services.pipeline import DevicePipeline
+
+
+class FixedModel:
+    """Picklable stand-in for a scikit-learn classifier over two conditions"""
+
+    classes_ = np.array(['Deep Rest', 'Elevated Stress'])
+
+    def predict_proba(self, features):
+        return np.tile([0.9, 0.1], (len(features), 1))
+
+
+class CountingBackend(InferenceBackend):
+    """Rule-table backend that records the size of every batch"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, features):
+        self.batch_sizes.append(len(features))
+        return super().predict_proba(features)
+
+
+def features(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform(0, 1, (n, len(FEATURES)))
+    rows[:, 0] = rng.uniform(45, 150, n)   # heart_rate
+    rows[:, 3] = rng.uniform(0, 120, n)    # activity
+    rows[:, 4] = rng.uniform(20, 95, n)    # hrv_score
+    return rows
+
+
+def test_concurrent_predictions_share_one_batch():
+    backend = CountingBackend()
+    rows = features(40)
+
+    async def run():
+        batcher = MicroBatcher(backend, max_batch_size=256, max_delay=0.05)
+        results = await asyncio.gather(*(batcher.predict(row) for row in rows))
+        await batcher.close()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert backend.batch_sizes == [40]
+    np.testing.assert_array_equal(np.stack(results), evaluate(rows)['probabilities'])
+    stats = batcher.stats()
+    assert stats["backend"] == "rules"
+    assert (stats["batches"], stats["rows"], stats["mean_batch_size"]) == (1, 40, 40.0)
+
+
+def test_full_batch_runs_without_waiting_for_the_delay():
+    backend = CountingBackend()
+
+    async def run():
+        batcher = MicroBatcher(backend, max_batch_size=16, max_delay=60.0)
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.predict(row) for row in features(32))), timeout=5
+        )
+
+    asyncio.run(run())
+    assert backend.batch_sizes == [16, 16]
+
+
+def test_sklearn_backend_maps_classes_to_conditions(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(pickle.dumps(FixedModel()))
+
+    backend = load_backend("sklearn", str(path))
+    probabilities = backend.predict_proba(features(3))
+
+    assert isinstance(backend, SklearnBackend)
+    assert probabilities.shape == (3, len(CONDITIONS))
+    assert probabilities[:, CONDITIONS.index('Deep Rest')].tolist() == [0.9] * 3
+    assert probabilities[:, CONDITIONS.index('Elevated Stress')].tolist() == [0.1] * 3
+    assert probabilities.sum(axis=1).tolist() == pytest.approx([1.0] * 3)
+
+
+def test_unloadable_models_fall_back_to_the_tables(tmp_path):
+    assert type(load_backend("sklearn", str(tmp_path / "missing.pkl"))) is InferenceBackend
+    assert type(load_backend("tensorflow")) is InferenceBackend
+
+
+def test_onnx_backend(tmp_path):
+    pytest.importorskip("onnxruntime")
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(1)
+    weights = rng.normal(size=(len(FEATURES), len(CONDITIONS))).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node("MatMul", ["features", "weights"], ["logits"]),
+            helper.make_node("Softmax", ["logits"], ["probabilities"], axis=1)
+        ],
+        "lia",
+        [helper.make_tensor_value_info("features", TensorProto.FLOAT, [None, len(FEATURES)])],
+        [helper.make_tensor_value_info("probabilities", TensorProto.FLOAT, [None, len(CONDITIONS)])],
+        [numpy_helper.from_array(weights, "weights")]
+    )
+    path = tmp_path / "lia.onnx"
+    # IR version and opset that every supported onnxruntime release can load
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    onnx.save(model, str(path))
+
+    backend = load_backend("onnx", str(path))
+    rows = features(5)
+    probabilities = backend.predict_proba(rows)
+
+    assert backend.name == "onnx"
+    logits = rows.astype(np.float32) @ weights
+    expected = np.exp(logits - logits.max(axis=1, keepdims=True))
+    expected /= expected.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(probabilities, expected, rtol=1e-4, atol=1e-6)
+
+
+def test_executor_serves_the_model_condition(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(pickle.dumps(FixedModel()))
+    sample = BiosignalSample(1, datetime.now(), BiosignalData(
+        heart_rate=72.0, spo2=98.0, temperature=36.8, activity=10.0
+    ))
+
+    async def run():
+        executor = PipelineExecutor('inline', inference=MicroBatcher(load_backend("sklearn", str(path))))
+        try:
+            return await executor.run(DevicePipeline("model-device"), sample)
+        finally:
+            await executor.close()
+
+    result = asyncio.run(run())
+
+    assert result.lia_insights.condition == 'Deep Rest'
+    assert result.lia_insights.confidence == 0.9
+    assert result.lia_insights.probabilities['Elevated Stress'] == 0.1
+    assert result_features(result).shape == (len(FEATURES),)
+
+
+def test_health_reports_inference_stats(monkeypatch):
+    monkeypatch.setattr(main, "LIA_MODEL_BACKEND", "rules")
+    with TestClient(main.app) as client:
+        client.get("/api/v1/stream", params={"device_id": "inference-device"})
+        inference = client.get("/api/v1/health").json()["inference"]
+
+    assert inference["backend"] == "rules"
+    assert inference["rows"] >= 1
+    assert inference["mean_batch_size"] >= 1
+
+
+def test_health_without_a_model(client):
+    assert client.get("/api/v1/health").json()["inference"] is None
@@ -0,0 +1,85 @@
+"""
+LIA decision tables: batch evaluation against the single-sample path
+"""
+
+import numpy as np
+import pytest
+
+from models.schemas import PatternType, RhythmClassification
+from services.lia_rules import (
+    CONDITIONS, FEATURES, POSITIVE_INDICATORS, RISK_FACTORS, DecisionTable,
+    evaluate, evaluate_one, feature_matrix, feature_row, labels_from_flags
+)
+
+
+def random_features(n: int, seed: int) -> np.ndarray:
+    """Feature rows spread over every rule's thresholds, with exact ties"""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'heart_rate': rng.choice([*rng.uniform(40, 160, 40), 60, 65, 75, 80, 90, 110], n),
+        'spo2': rng.choice([*rng.uniform(88, 100, 20), 92, 95, 98, 100], n),
+        'temperature': rng.choice([*rng.uniform(35, 39, 20), 36.5, 37.2, 38], n),
+        'activity': rng.choice([*rng.uniform(0, 150, 40), 2, 5, 10, 20, 30, 60, 80, 100], n),
+        'hrv_score': rng.choice([*rng.uniform(20, 100, 40), 50, 60, 65, 70, 75, 80], n),
+        'rhythm': rng.integers(0, len(RhythmClassification), n),
+        'pattern': rng.integers(0, len(PatternType), n),
+        'quality_score': rng.uniform(0.3, 1.0, n),
+        'signal_to_noise_ratio': rng.uniform(15, 60, n),
+        'temporal_consistency': rng.uniform(0.3, 1.0, n),
+        'alignment_score': rng.choice([*rng.uniform(0, 1, 20), 0.6, 0.7, 0.85], n),
+        'artifact_count': rng.integers(0, 5, n)
+    }
+    return feature_matrix(**columns)
+
+
+def test_evaluate_matches_evaluate_one_row_by_row():
+    features = random_features(2000, seed=21)
+
+    batch = evaluate(features)
+
+    for i, row in enumerate(features):
+        one = evaluate_one(tuple(row.tolist()))
+        assert one['condition'] == batch['condition'][i]
+        assert one['confidence'] == batch['confidence'][i]
+        assert one['risk_flags'] == batch['risk_flags'][i]
+        assert one['positive_flags'] == batch['positive_flags'][i]
+        np.testing.assert_allclose(one['condition_scores'], batch['condition_scores'][i])
+        np.testing.assert_allclose(one['probabilities'], batch['probabilities'][i])
+        assert one['wellness_assessment'] == batch['wellness_assessment'][i].tolist()
+
+    # Every condition is reachable from these rows
+    assert set(batch['condition']) == set(range(len(CONDITIONS)))
+
+
+def test_first_matching_condition_wins():
+    sleeping = feature_row(
+        heart_rate=55, spo2=97, temperature=36.6, activity=2, hrv_score=85,
+        rhythm=list(RhythmClassification).index(RhythmClassification.ATHLETIC),
+        pattern=list(PatternType).index(PatternType.STABLE),
+        quality_score=0.95, signal_to_noise_ratio=40, temporal_consistency=0.9,
+        alignment_score=0.9, artifact_count=0
+    )
+    # Deep Rest and Recovery Mode hold as well, Sleep State comes first
+    result = evaluate_one(sleeping)
+    assert CONDITIONS[result['condition']] == 'Sleep State'
+    assert result['probabilities'][result['condition']] == max(result['probabilities'])
+    assert sum(result['probabilities']) == pytest.approx(1.0)
+
+    assert labels_from_flags(result['risk_flags'], RISK_FACTORS) == []
+    assert "Excellent heart rate variability" in labels_from_flags(
+        result['positive_flags'], POSITIVE_INDICATORS
+    )
+
+
+def test_feature_helpers_require_every_feature():
+    with pytest.raises(ValueError):
+        feature_row(heart_rate=70)
+    with pytest.raises(ValueError):
+        feature_matrix(**{name: [0.0] for name in FEATURES[:-1]})
+
+
+def test_unknown_feature_or_operator():
+    with pytest.raises(ValueError):
+        DecisionTable([('x', [('pulse', '>', 1)])])
+    with pytest.raises(ValueError):
+        DecisionTable([('x', [('heart_rate', '!=', 1)])])
@@ -0,0 +1,51 @@
+"""
+Per-device pipeline registry: LRU capacity and idle eviction
+"""
+
+from services.pipeline import PipelineRegistry
+
+
+def test_capacity_evicts_least_recently_used():
+    registry = PipelineRegistry(idle_timeout=300, max_devices=2)
+    first = registry.get("a")
+    registry.get("b")
+
+    # Using "a" again makes "b" the least recently used
+    assert registry.get("a") is first
+    registry.get("c")
+
+    assert "b" not in registry
+    assert list(registry.pipelines) == ["a", "c"]
+
+
+def test_peek_does_not_refresh_recency():
+    registry = PipelineRegistry(idle_timeout=300, max_devices=2)
+    registry.get("a")
+    registry.get("b")
+
+    assert registry.peek("a") is not None
+    registry.get("c")
+
+    assert "a" not in registry
+    assert registry.peek("missing") is None
+    assert "missing" not in registry
+
+
+def test_evict_idle_drops_only_idle_pipelines():
+    registry = PipelineRegistry(idle_timeout=60, max_devices=10)
+    registry.get("idle").last_active -= 120
+    registry.get("active")
+
+    assert registry.evict_idle() == ["idle"]
+    assert "idle" not in registry
+    assert "active" in registry
+    assert registry.evict_idle() == []
+
+
+def test_use_resets_idle_time():
+    registry = PipelineRegistry(idle_timeout=60, max_devices=10)
+    registry.get("device").last_active -= 120
+
+    registry.get("device")
+
+    assert registry.evict_idle() == []
@@ -0,0 +1,88 @@
+"""
+Preallocated NumPy ring buffers
+"""
+
+import numpy as np
+import pytest
+
+from utils.ring_buffer import RingBuffer, resize_rows
+
+
+def test_window_returns_most_recent_samples_oldest_first():
+    buffer = RingBuffer(4, 2)
+    samples = np.arange(14, dtype=np.float64).reshape(7, 2)
+    for sample in samples:
+        buffer.append([0], sample)
+
+    assert buffer.count[0] == 4
+    assert buffer.is_full([0])[0]
+    np.testing.assert_array_equal(buffer.window([0], 4)[0], samples[-4:])
+    np.testing.assert_array_equal(buffer.window([0], 2)[0], samples[-2:])
+    np.testing.assert_array_equal(buffer.samples(0, 3), samples[-3:])
+    np.testing.assert_array_equal(buffer.latest([0])[0], samples[-1])
+    np.testing.assert_array_equal(buffer.ago([0], 3)[0], samples[-3])
+
+
+def test_rows_are_independent_streams():
+    buffer = RingBuffer(3, rows=4)
+    buffer.append([0, 2], [1.0, 10.0])
+    buffer.append([2], [20.0])
+    buffer.append([3, 0, 2], [100.0, 2.0, 30.0])
+    buffer.append([2], [40.0])
+
+    np.testing.assert_array_equal(buffer.count, [2, 0, 3, 1])
+    np.testing.assert_array_equal(buffer.window([2, 0], 3)[:, :, 0], [[20.0, 30.0, 40.0], [0.0, 1.0, 2.0]])
+    np.testing.assert_array_equal(buffer.latest([0, 2, 3])[:, 0], [2.0, 40.0, 100.0])
+    assert len(buffer.samples(1)) == 0
+
+
+def test_short_row_window_is_zero_padded_and_clear_zeroes_it():
+    buffer = RingBuffer(5, rows=2)
+    buffer.append([0, 1], [7.0, 9.0])
+    for value in (1.0, 2.0, 3.0, 4.0):
+        buffer.append([1], [value])
+
+    np.testing.assert_array_equal(buffer.window([0], 3)[0, :, 0], [0.0, 0.0, 7.0])
+    np.testing.assert_array_equal(buffer.samples(0, 10)[:, 0], [7.0])
+    assert buffer.window([0], 10).shape == (1, 5, 1)
+
+    buffer.clear([1])
+    assert buffer.count[1] == 0
+    assert not buffer.is_full([1])[0]
+    buffer.append([1], [5.0])
+    np.testing.assert_array_equal(buffer.window([1], 5)[0, :, 0], [0.0, 0.0, 0.0, 0.0, 5.0])
+    np.testing.assert_array_equal(buffer.samples(0)[:, 0], [7.0])
+
+
+def test_extend_matches_repeated_append():
+    samples = np.random.default_rng(0).normal(size=(11, 3))
+    appended, extended = RingBuffer(4, 3, rows=2), RingBuffer(4, 3, rows=2)
+
+    appended.append([1], samples[0])
+    extended.append([1], samples[0])
+    for sample in samples[1:]:
+        appended.append([1], sample)
+    extended.extend(1, samples[1:6])
+    extended.extend(1, samples[6:])
+
+    np.testing.assert_array_equal(extended.window([0, 1], 4), appended.window([0, 1], 4))
+    np.testing.assert_array_equal(extended.head, appended.head)
+    np.testing.assert_array_equal(extended.count, appended.count)
+
+
+def test_resize_keeps_rows_and_adds_empty_ones():
+    buffer = RingBuffer(3, rows=2)
+    buffer.append([0, 1], [1.0, 2.0])
+    buffer.resize(5)
+
+    assert buffer.rows == 5
+    np.testing.assert_array_equal(buffer.count, [1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(buffer.latest([0, 1])[:, 0], [1.0, 2.0])
+    np.testing.assert_array_equal(resize_rows(np.arange(4), 2), [0, 1])
+
+
+def test_capacity_and_rows_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+    with pytest.raises(ValueError):
+        RingBuffer(4, rows=0)
@@ -0,0 +1,73 @@
+"""
+Sharded front router: device affinity and relayed headers
+"""
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import router
+from utils.sharding import shard_for
+
+SHARDS = 3
+
+
+def shard_transport(index: int, requests: list) -> httpx.MockTransport:
+    """A shard that records what reaches it and answers like a uvicorn server"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append((index, request))
+        return httpx.Response(
+            200,
+            json={"shard": index, "path": request.url.path},
+            headers={
+                "date": "Thu, 01 Jan 2026 00:00:00 GMT",
+                "server": "uvicorn",
+                "etag": f'"shard-{index}"',
+                "connection": "keep-alive",
+            },
+        )
+    return httpx.MockTransport(handle)
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """Router client with in-memory shards, and the list of forwarded requests"""
+    requests = []
+    clients = [
+        httpx.AsyncClient(transport=shard_transport(index, requests), base_url="http://shard")
+        for index in range(SHARDS)
+    ]
+    monkeypatch.setattr(router, "SHARD_COUNT", SHARDS)
+    monkeypatch.setattr(router, "shard_clients", clients)
+    # Without the context manager the lifespan (real Unix sockets) does not run
+    yield TestClient(router.app), requests
+
+
+def test_requests_go_to_the_device_shard(routed):
+    client, requests = routed
+    for device in ("watch-1", "watch-2", "ring-7", "band-42"):
+        response = client.get("/api/v1/stream", params={"device_id": device})
+        assert response.json()["shard"] == shard_for(device, SHARDS)
+
+        response = client.post("/api/v1/connect", json={"device_id": device, "device_type": "watch"})
+        assert response.json()["shard"] == shard_for(device, SHARDS)
+
+    assert {request.url.path for _, request in requests} == {"/api/v1/stream", "/api/v1/connect"}
+
+
+def test_relays_end_to_end_headers_only(routed):
+    client, _ = routed
+    response = client.get("/api/v1/stream", params={"device_id": "watch-1"})
+
+    assert response.headers["etag"] == f'"shard-{shard_for("watch-1", SHARDS)}"'
+    # The router's own server sets these; the shard's copies are dropped
+    assert "date" not in response.headers
+    assert "server" not in response.headers
+    assert "connection" not in response.headers
+
+
+def test_forwarded_headers():
+    headers = {"Host": "router", "Date": "x", "Server": "y", "If-None-Match": '"a"'}
+
+    assert router.forwarded_headers(headers) == {"Date": "x", "Server": "y", "If-None-Match": '"a"'}
+    assert router.forwarded_headers(headers, router.SERVER_HEADERS) == {"If-None-Match": '"a"'}
@@ -0,0 +1,125 @@
+"""
+Incremental sliding-window statistics against direct NumPy computation
+"""
+
+import numpy as np
+import pytest
+
+from utils.running_stats import SlidingTrend, SlidingWindowStats
+
+
+def test_sliding_stats_match_numpy_over_the_window():
+    streams = np.random.default_rng(1).normal(70, 8, size=(3, 200, 4))
+    stats = SlidingWindowStats(10, 4, rows=3)
+    rows = np.arange(3)
+
+    for i in range(200):
+        stats.push(rows, streams[:, i])
+        window = streams[:, max(0, i - 9):i + 1]
+        np.testing.assert_array_equal(stats.count(rows), window.shape[1])
+        np.testing.assert_allclose(stats.mean(rows), window.mean(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(stats.std(rows), window.std(axis=1), rtol=1e-9, atol=1e-9)
+
+
+def test_rows_pushed_on_different_ticks():
+    values = np.random.default_rng(5).normal(size=(40, 2))
+    stats = SlidingWindowStats(6, rows=2)
+
+    # Row 0 gets every value, row 1 only the even ones
+    for i, (a, b) in enumerate(values):
+        if i % 2:
+            stats.push([0], [a])
+        else:
+            stats.push([1, 0], [b, a])
+
+    np.testing.assert_allclose(stats.mean([0, 1])[:, 0], [values[-6:, 0].mean(), values[::2][-6:, 1].mean()])
+    np.testing.assert_allclose(stats.std([0, 1])[:, 0], [values[-6:, 0].std(), values[::2][-6:, 1].std()])
+
+
+def test_flat_window_has_exact_mean_and_zero_variance():
+    stats = SlidingWindowStats(5)
+    for value in (61.3, 97.1, 72.4, 72.4, 72.4, 72.4, 72.4):
+        stats.push([0], [value])
+
+    assert stats.mean([0])[0, 0] == 72.4
+    assert stats.std([0])[0, 0] == 0.0
+
+
+def test_resync_bounds_drift_on_long_streams():
+    values = np.random.default_rng(2).normal(1e6, 1.0, size=5000)
+    stats = SlidingWindowStats(20, resync_interval=1000)
+    for value in values:
+        stats.push([0], [value])
+
+    np.testing.assert_allclose(stats.std([0])[0], values[-20:].std(), rtol=1e-6)
+
+
+def test_resync_of_a_partial_window():
+    values = np.random.default_rng(6).normal(50, 5, size=7)
+    stats = SlidingWindowStats(20, resync_interval=7)
+    for value in values:
+        stats.push([0], [value])
+
+    np.testing.assert_allclose(stats.mean([0])[0], values.mean())
+    np.testing.assert_allclose(stats.variance([0])[0], values.var())
+
+
+def test_extend_matches_push():
+    values = np.random.default_rng(3).normal(size=(30, 2))
+    pushed, extended = SlidingWindowStats(8, 2, rows=2), SlidingWindowStats(8, 2, rows=2)
+    for value in values:
+        pushed.push([1], value)
+    extended.extend(1, values)
+
+    np.testing.assert_allclose(extended.mean([0, 1]), pushed.mean([0, 1]))
+    np.testing.assert_allclose(extended.variance([0, 1]), pushed.variance([0, 1]))
+
+
+def test_empty_and_cleared_windows():
+    stats = SlidingWindowStats(4, 3, rows=2)
+    assert stats.count([0])[0] == 0
+    np.testing.assert_array_equal(stats.variance([0]), np.zeros((1, 3)))
+
+    stats.push([0, 1], np.ones((2, 3)))
+    stats.clear([0])
+    stats.resize(3)
+    np.testing.assert_array_equal(stats.count([0, 1, 2]), [0, 1, 0])
+    np.testing.assert_array_equal(stats.mean([0, 1, 2]), [[0.0] * 3, [1.0] * 3, [0.0] * 3])
+
+
+def test_sliding_trend_matches_polyfit():
+    values = np.cumsum(np.random.default_rng(4).normal(0.1, 1.0, size=(2, 700)), axis=1) + 70
+    trend = SlidingTrend((30, 100, 600), rows=2)
+    rows = np.arange(2)
+
+    for i in range(700):
+        trend.push(rows, values[:, i])
+        for window in trend.windows:
+            recent = values[:, max(0, i - window + 1):i + 1]
+            slopes = trend.slope(rows, window)
+            if recent.shape[1] < 2:
+                np.testing.assert_array_equal(slopes, 0.0)
+                continue
+            expected = np.polyfit(np.arange(recent.shape[1]), recent.T, 1)[0]
+            np.testing.assert_allclose(slopes, expected, rtol=0, atol=1e-8)
+
+
+def test_sliding_trend_resync_matches_polyfit():
+    values = np.random.default_rng(7).normal(70, 3, size=45)
+    trend = SlidingTrend((10, 60), resync_interval=15)
+    for value in values:
+        trend.push([0], [value])
+
+    for window in trend.windows:
+        recent = values[-window:]
+        expected = np.polyfit(np.arange(len(recent)), recent, 1)[0]
+        assert trend.slope([0], window)[0] == pytest.approx(expected, abs=1e-10)
+
+
+def test_sliding_trend_of_a_line():
+    trend = SlidingTrend((10,), rows=2)
+    for x in range(25):
+        trend.push([1], [3.0 - 0.5 * x])
+
+    np.testing.assert_allclose(trend.slope([0, 1], 10), [0.0, -0.5])
+    np.testing.assert_array_equal(trend.count([0, 1]), [0, 10])
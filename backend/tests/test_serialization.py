@@ -0,0 +1,83 @@
+"""
+WebSocket frame encoders and their negotiation
+"""
+
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from utils.serialization import (
+    ENCODERS, FrameEncoder, MsgpackEncoder, OrjsonEncoder, negotiate_encoder
+)
+
+PAYLOAD = {
+    "type": "stream_data",
+    "data": {"heart_rate": 72.5, "condition": "Resting", "artifacts": [], "period": None}
+}
+
+
+def test_json_encoders_agree_with_stdlib():
+    assert json.loads(FrameEncoder().encode(PAYLOAD)) == PAYLOAD
+    if "orjson" in ENCODERS:
+        encoded = OrjsonEncoder().encode(PAYLOAD)
+        assert isinstance(encoded, str)
+        assert json.loads(encoded) == PAYLOAD
+
+
+def test_msgpack_frames_are_binary():
+    msgpack = pytest.importorskip("msgpack")
+    encoder = MsgpackEncoder()
+
+    encoded = encoder.encode(PAYLOAD)
+
+    assert encoder.binary
+    assert isinstance(encoded, bytes)
+    assert msgpack.unpackb(encoded, raw=False) == PAYLOAD
+
+
+def test_query_parameter_wins_over_subprotocols():
+    encoder, subprotocol = negotiate_encoder("json", ["wearable.orjson"])
+    assert encoder.name == "json"
+    assert subprotocol is None
+
+    encoder, subprotocol = negotiate_encoder("json", ["wearable.json"])
+    assert subprotocol == "wearable.json"
+
+
+def test_first_available_offered_subprotocol():
+    encoder, subprotocol = negotiate_encoder(None, ["chat", "wearable.cbor", "wearable.json"])
+    assert encoder.name == "json"
+    assert subprotocol == "wearable.json"
+
+    if "msgpack" in ENCODERS:
+        encoder, subprotocol = negotiate_encoder(None, ["wearable.msgpack", "wearable.json"])
+        assert encoder.name == "msgpack"
+        assert subprotocol == "wearable.msgpack"
+
+
+def test_fallbacks():
+    encoder, subprotocol = negotiate_encoder(None, [])
+    assert encoder is ENCODERS["json"]
+    assert subprotocol is None
+
+    assert negotiate_encoder("cbor", ["wearable.cbor"]) == (None, None)
+
+
+def test_websocket_stream_in_msgpack(client):
+    msgpack = pytest.importorskip("msgpack")
+    with client.websocket_connect(
+        "/ws/stream?device_id=msgpack-device", subprotocols=["wearable.msgpack"]
+    ) as websocket:
+        assert websocket.accepted_subprotocol == "wearable.msgpack"
+        message = msgpack.unpackb(websocket.receive_bytes(), raw=False)
+
+    assert message["type"] == "stream_data"
+    assert set(message["data"]) >= {"timestamp", "raw_signals", "clarity_layer"}
+
+
+def test_websocket_rejects_unknown_encoding(client):
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect("/ws/stream?encoding=cbor") as websocket:
+            websocket.receive_text()
+    assert rejected.value.code == 1008
@@ -0,0 +1,159 @@
+"""
+Spectral engines: dominant frequency, hop caching, HRV band powers, periodicity
+"""
+
+import numpy as np
+import pytest
+from scipy.signal import lombscargle
+
+from services.spectral import (
+    BandPowerEstimator, HRV_BANDS, PeriodicityDetector, SpectralEngine
+)
+from utils.ring_buffer import RingBuffer
+
+
+def buffered(*series: np.ndarray, capacity: int = 600) -> RingBuffer:
+    """Ring buffer with one row per series"""
+    buffer = RingBuffer(capacity, rows=len(series))
+    for row, values in enumerate(series):
+        buffer.extend(row, values)
+    return buffer
+
+
+def test_dominant_frequency_of_a_sine():
+    sample_rate = 100
+    t = np.arange(128) / sample_rate
+    signal = 70 + 5 * np.sin(2 * np.pi * 12.5 * t)
+    engine = SpectralEngine(sample_rate, window_size=128, min_samples=32)
+
+    result, valid = engine.update([0], buffered(signal))
+
+    assert valid[0]
+    dominant, stability = result[0]
+    assert dominant == pytest.approx(12.5, abs=sample_rate / 128)
+    assert 0.3 <= stability <= 1.0
+
+
+def test_rows_of_different_lengths_match_single_rows():
+    rng = np.random.default_rng(3)
+    series = [rng.normal(70, 5, n) for n in (40, 128, 300, 40)]
+    engine = SpectralEngine(10, window_size=128, min_samples=32, rows=4)
+
+    result, valid = engine.update([3, 0, 1, 2], buffered(*series))
+
+    assert valid.all()
+    for i, row in enumerate((3, 0, 1, 2)):
+        expected, _ = SpectralEngine(10, window_size=128, min_samples=32).update([0], buffered(series[row]))
+        np.testing.assert_allclose(result[i], expected[0])
+
+
+def test_result_recomputed_only_every_hop():
+    rng = np.random.default_rng(4)
+    signal = rng.normal(70, 5, 300)
+    engine = SpectralEngine(100, window_size=128, min_samples=32, hop_size=4)
+    reference = SpectralEngine(100, window_size=128, min_samples=32)
+
+    buffer = buffered(signal[:39])
+    results = []
+    for n in range(40, 60):
+        buffer.append([0], [signal[n - 1]])
+        results.append(engine.update([0], buffer)[0][0])
+
+    # First update computes, then every fourth one
+    for offset, result in enumerate(results):
+        computed_at = 40 + offset - offset % 4
+        expected, _ = reference.update([0], buffered(signal[:computed_at]))
+        np.testing.assert_array_equal(result, expected[0])
+
+
+def test_spectral_engine_needs_min_samples():
+    engine = SpectralEngine(100, min_samples=32, rows=2)
+    _, valid = engine.update([0, 1], buffered(np.ones(31), np.ones(32)))
+    np.testing.assert_array_equal(valid, [False, True])
+
+
+def rr_series(n: int, seed: int) -> np.ndarray:
+    """R-R intervals in ms with a respiratory (HF) oscillation"""
+    rng = np.random.default_rng(seed)
+    beats = np.arange(n)
+    return 800 + 40 * np.sin(2 * np.pi * 0.25 * beats * 0.8) + rng.normal(0, 5, n)
+
+
+def test_lomb_band_powers_match_the_periodogram():
+    rr = rr_series(100, seed=5)
+    estimator = BandPowerEstimator(method='lomb')
+
+    powers, valid = estimator.update([0], buffered(rr, capacity=100))
+
+    assert valid[0]
+    beat_times = np.cumsum(rr) / 1000.0
+    detrended = rr - rr.mean()
+    psd = lombscargle(beat_times, detrended, estimator.angular_freqs) * 2.0 / len(rr)
+    for i, (name, (low, high)) in enumerate(HRV_BANDS.items()):
+        in_band = (estimator.freqs >= low) & (estimator.freqs <= high if name == 'hf' else estimator.freqs < high)
+        assert powers[0, i] == pytest.approx(psd[in_band].sum() * estimator.freq_step)
+
+    # The 0.25 Hz oscillation dominates the HF band
+    vlf, lf, hf = powers[0]
+    assert hf > lf > 0
+
+
+@pytest.mark.parametrize("method", ['lomb', 'welch'])
+def test_band_powers_of_flat_series_are_zero(method):
+    powers, valid = BandPowerEstimator(method=method).update([0], buffered(np.full(60, 800.0)))
+    assert valid[0]
+    np.testing.assert_array_equal(powers, np.zeros((1, len(HRV_BANDS))))
+
+
+def test_welch_finds_the_hf_oscillation():
+    powers, _ = BandPowerEstimator(method='welch').update([0], buffered(rr_series(100, seed=6)))
+    vlf, lf, hf = powers[0]
+    assert hf > lf
+
+
+def test_band_powers_cached_between_updates():
+    rr = rr_series(100, seed=7)
+    estimator = BandPowerEstimator(update_interval=5, min_intervals=10)
+    buffer = buffered(rr[:50], capacity=100)
+
+    first, _ = estimator.update([0], buffer)
+    for n in range(51, 55):
+        buffer.append([0], [rr[n - 1]])
+        np.testing.assert_array_equal(estimator.update([0], buffer)[0], first)
+    buffer.append([0], [rr[54]])
+    assert not np.array_equal(estimator.update([0], buffer)[0], first)
+
+    _, valid = estimator.update([0], buffered(rr[:5]))
+    assert not valid[0]
+
+
+def test_unknown_band_power_method():
+    with pytest.raises(ValueError):
+        BandPowerEstimator(method='burg')
+
+
+def test_periodicity_detector_finds_the_period_in_seconds():
+    # 10 Hz samples of a 4 s oscillation, with slightly uneven spacing
+    rng = np.random.default_rng(8)
+    timestamps = 1_700_000_000.0 + np.cumsum(rng.uniform(0.09, 0.11, 300))
+    values = 70 + 5 * np.sin(2 * np.pi * np.arange(300) / 40)
+
+    detected, period = PeriodicityDetector().update([0], buffered(values), buffered(timestamps))
+
+    assert detected[0]
+    assert period[0] == pytest.approx(4.0, abs=0.2)
+
+
+def test_periodicity_detector_rejects_noise_and_short_input():
+    rng = np.random.default_rng(9)
+    timestamps = np.arange(300) * 0.1
+    detector = PeriodicityDetector(min_samples=50, rows=3)
+
+    detected, period = detector.update(
+        [0, 1, 2],
+        buffered(rng.normal(size=49), rng.normal(size=300), np.full(300, 70.0)),
+        buffered(timestamps[:49], timestamps, timestamps)
+    )
+
+    np.testing.assert_array_equal(detected, [False, False, False])
+    assert np.isnan(period).all()
@@ -0,0 +1,154 @@
+"""
+REST and WebSocket stream endpoints
+"""
+
+import main
+from conftest import pause_simulator, resume_simulator, wait_until
+from models.schemas import BiosignalData
+from services.pipeline import DevicePipeline
+from utils.delta import flatten, quantize
+
+
+def caught_up(device_id: str):
+    """Condition: the device pipeline has processed the simulator's latest sample"""
+    def condition():
+        pipeline = main.pipeline_registry.peek(device_id)
+        return pipeline is not None and pipeline.latest_sequence == main.ble_simulator.sequence
+    return condition
+
+
+def test_stream_etag_returns_304_until_a_new_sample(client):
+    params = {"device_id": "etag-device"}
+    assert client.get("/api/v1/stream", params=params).status_code == 200
+
+    # No new samples while paused, so the entity tag stays valid
+    pause_simulator(client)
+    wait_until(caught_up("etag-device"))
+    etag = client.get("/api/v1/stream", params=params).headers["etag"]
+
+    cached = client.get("/api/v1/stream", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    # The next processed sample invalidates it
+    sequence = main.ble_simulator.sequence
+    resume_simulator(client)
+    wait_until(lambda: main.pipeline_registry.peek("etag-device").latest_sequence > sequence)
+    fresh = client.get("/api/v1/stream", params=params, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+def test_stream_fields_projection(client):
+    params = {"device_id": "fields-device", "fields": "raw_signals,lia_insights.condition"}
+    response = client.get("/api/v1/stream", params=params)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"timestamp", "raw_signals", "lia_insights"}
+    assert set(body["raw_signals"]) == set(BiosignalData.model_fields)
+    assert set(body["lia_insights"]) == {"condition"}
+
+    # A projection is its own representation of the cached result
+    full = client.get("/api/v1/stream", params={"device_id": "fields-device"})
+    assert full.headers["etag"] != response.headers["etag"]
+
+
+def test_stream_fields_rejects_unknown_field(client):
+    response = client.get(
+        "/api/v1/stream",
+        params={"device_id": "fields-device", "fields": "raw_signals.pulse"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown field: raw_signals.pulse"
+
+
+def apply_delta_message(state: dict, message: dict) -> str:
+    """Update a client's reconstruction of the stream with one delta-mode message"""
+    if message["type"] == "stream_data_delta":
+        assert message["base"] == state["seq"], "delta not based on the previous frame"
+        for index, value in message["changes"]:
+            state["values"][index] = value
+        kind = "delta"
+    else:
+        assert message["type"] == "stream_data_keyframe"
+        if "fields" in message:
+            state["fields"] = message["fields"]
+            kind = "keyframe"
+        else:
+            assert state.get("fields") is not None, "values keyframe before any layout"
+            kind = "values"
+        state["values"] = list(message["values"])
+        assert len(state["values"]) == len(state["fields"])
+
+    state["seq"] = message["seq"]
+    return kind
+
+
+def test_websocket_delta_stream_reconstructs_full_frames(client):
+    device = "delta-device"
+    interval = 4
+    full_url = f"/ws/stream?device_id={device}"
+    delta_url = f"/ws/stream?device_id={device}&mode=delta&keyframe_interval={interval}"
+
+    with client.websocket_connect(full_url) as full_ws, client.websocket_connect(delta_url) as delta_ws:
+        state, kinds, snapshots, full_frames = {}, [], [], {}
+        for _ in range(3 * interval):
+            # Read both sockets in lockstep so neither queue overflows
+            kinds.append(apply_delta_message(state, delta_ws.receive_json()))
+            snapshot = dict(zip(state["fields"], state["values"]))
+            snapshots.append(snapshot)
+
+            frame = full_ws.receive_json()
+            full_frames[frame["data"]["timestamp"]] = flatten(quantize(frame["data"]))
+
+    assert kinds[0] == "keyframe"
+    assert "delta" in kinds
+    since_keyframe = 0
+    for kind in kinds:
+        since_keyframe = since_keyframe + 1 if kind == "delta" else 1
+        assert since_keyframe <= interval
+
+    # Every reconstructed frame matches the full frame of the same sample
+    compared = [s for s in snapshots if s["timestamp"] in full_frames]
+    assert len(compared) >= len(snapshots) - 1
+    for snapshot in compared:
+        assert snapshot == full_frames[snapshot["timestamp"]]
+
+
+def test_each_sample_processed_once_per_device(client, monkeypatch):
+    processed = {}
+    record_result = DevicePipeline.record_result
+
+    def recording(pipeline, sequence, result, skip=frozenset()):
+        processed.setdefault(pipeline.device_id, []).append(sequence)
+        record_result(pipeline, sequence, result, skip)
+
+    monkeypatch.setattr(DevicePipeline, "record_result", recording)
+    devices = ("once-a", "once-b")
+    for device in devices:
+        response = client.post("/api/v1/connect", json={"device_id": device, "device_type": "watch"})
+        assert response.status_code == 200
+
+    # Several readers per device: REST polling and two WebSocket subscribers
+    with client.websocket_connect(f"/ws/stream?device_id={devices[0]}") as first, \
+            client.websocket_connect(f"/ws/stream?device_id={devices[0]}&mode=delta") as second:
+        for _ in range(5):
+            first.receive_json()
+            second.receive_json()
+            for device in devices:
+                client.get("/api/v1/stream", params={"device_id": device})
+                client.get("/api/v1/predict", params={"device_id": device})
+
+    pause_simulator(client)
+    for device in devices:
+        wait_until(caught_up(device))
+
+    for device in devices:
+        sequences = processed[device]
+        pipeline = main.pipeline_registry.peek(device)
+        assert sequences == list(range(sequences[0], sequences[0] + len(sequences)))
+        assert sequences[-1] == main.ble_simulator.sequence
+        assert pipeline.samples_processed == len(sequences)
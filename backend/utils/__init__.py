@@ -1,2 +1,5 @@
 """Utilities package"""
 from .logger import setup_logger, get_processing_logger
+from .ring_buffer import RingBuffer
+from .running_stats import SlidingWindowStats, SlidingTrend
+from .sharding import shard_for, shard_socket_path
@@ -0,0 +1,120 @@
+"""
+Delta encoding helpers for the compact WebSocket stream mode
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+# Decimal places shown to users, by field name (leaf key or parent key);
+# every other float is quantised to DEFAULT_DECIMALS
+DEFAULT_DECIMALS = 1
+DISPLAY_DECIMALS = {
+    'quality_score': 2,
+    'heart_rate_quality': 2,
+    'spo2_quality': 2,
+    'temperature_quality': 2,
+    'activity_quality': 2,
+    'overall_quality': 2,
+    'dominant_frequency': 2,
+    'lf_hf_ratio': 2,
+    'frequency_stability': 2,
+    'temporal_consistency': 2,
+    'pattern_confidence': 2,
+    'alignment_score': 2,
+    'confidence': 2,
+    'probabilities': 2
+}
+
+# Separator of flattened field paths, e.g. "lia_insights.confidence"
+PATH_SEPARATOR = "."
+
+
+def quantize(data: Any, key: Optional[str] = None, parent: Optional[str] = None) -> Any:
+    """Round every float in a nested payload to its display precision"""
+    if isinstance(data, dict):
+        return {k: quantize(v, k, key) for k, v in data.items()}
+    if isinstance(data, list):
+        return [quantize(v, key, parent) for v in data]
+    if isinstance(data, float):
+        decimals = DISPLAY_DECIMALS.get(key, DISPLAY_DECIMALS.get(parent, DEFAULT_DECIMALS))
+        return round(data, decimals)
+    return data
+
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Flatten nested dicts into {"a.b.c": value}
+
+    Lists are kept as single values and compared as a whole.
+    """
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, path + PATH_SEPARATOR))
+        else:
+            flat[path] = value
+    return flat
+
+
+def diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[List[list]]:
+    """
+    Changes between two flattened payloads with the same fields
+
+    Fields are referenced by their position in the payload (the layout
+    the last keyframe refers to) rather than by path, so a delta carries
+    only [index, value] pairs.
+
+    Returns:
+        [[index, value], ...] for changed fields, or None when the set of
+        fields differs and a keyframe is needed instead
+    """
+    if list(previous) != list(current):
+        return None
+
+    return [
+        [index, value]
+        for index, (path, value) in enumerate(current.items())
+        if previous[path] != value
+    ]
+
+
+class DeltaCursor:
+    """
+    A subscriber's position in a delta stream
+
+    Decides per frame what the subscriber receives: a delta when the
+    frame's delta is based on the last frame this subscriber received,
+    and a keyframe first, every ``keyframe_interval`` frames and after a
+    gap (e.g. frames dropped as a slow consumer). Keyframes only carry
+    the field layout when it differs from the one the subscriber has.
+    """
+
+    def __init__(self, keyframe_interval: int = 50):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.last_seq: Optional[int] = None
+        self.since_keyframe = 0
+        self.layout: Optional[Sequence[str]] = None
+
+    def next_kind(self, seq: int, base_seq: Optional[int], layout: Sequence[str]) -> str:
+        """
+        Advance to a frame and pick how to send it
+
+        Returns:
+            'delta', 'values' (keyframe in the known layout) or 'keyframe'
+            (keyframe including its layout)
+        """
+        use_delta = (
+            self.last_seq is not None
+            and base_seq == self.last_seq
+            and self.since_keyframe < self.keyframe_interval
+        )
+
+        self.since_keyframe = self.since_keyframe + 1 if use_delta else 1
+        self.last_seq = seq
+        if use_delta:
+            return "delta"
+
+        if self.layout is not None and (layout is self.layout or layout == self.layout):
+            return "values"
+        self.layout = layout
+        return "keyframe"
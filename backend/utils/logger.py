@@ -13,38 +13,46 @@ class ProcessingLogger:
     """
     Special logger for tracking layer processing
     Stores logs in memory for demonstration purposes
+
+    Messages take %-style arguments like the standard logging module and
+    are only formatted when the logs are read.
     """
 
     def __init__(self, max_logs: int = 1000):
         self.logs = deque(maxlen=max_logs)
         self.max_logs = max_logs
 
-    def info(self, message: str, data: Dict[str, Any] = None):
+    def info(self, message: str, *args, data: Dict[str, Any] = None):
         """Log info level message"""
-        self._log('INFO', message, data)
+        self._log('INFO', message, args, data)
 
-    def warning(self, message: str, data: Dict[str, Any] = None):
+    def warning(self, message: str, *args, data: Dict[str, Any] = None):
         """Log warning level message"""
-        self._log('WARNING', message, data)
+        self._log('WARNING', message, args, data)
 
-    def error(self, message: str, data: Dict[str, Any] = None):
+    def error(self, message: str, *args, data: Dict[str, Any] = None):
         """Log error level message"""
-        self._log('ERROR', message, data)
-
-    def _log(self, level: str, message: str, data: Dict[str, Any] = None):
-        """Internal log method"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
+        self._log('ERROR', message, args, data)
+
+    def _log(self, level: str, message: str, args: tuple, data: Dict[str, Any] = None):
+        """Internal log method (stores the raw entry, formatted on read)"""
+        self.logs.append((datetime.now(), level, message, args, data))
+
+    @staticmethod
+    def _format(entry: tuple) -> Dict[str, Any]:
+        """Render a stored entry"""
+        timestamp, level, message, args, data = entry
+        return {
+            'timestamp': timestamp.isoformat(),
             'level': level,
-            'message': message,
+            'message': message % args if args else message,
             'data': data or {}
         }
-        self.logs.append(log_entry)
 
     def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent logs"""
         logs_list = list(self.logs)
-        return logs_list[-limit:]
+        return [self._format(entry) for entry in logs_list[-limit:]]
 
     def clear(self):
         """Clear all logs"""
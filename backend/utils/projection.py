@@ -0,0 +1,128 @@
+"""
+Sparse fieldsets: project responses down to the fields a client asked for
+"""
+
+import typing
+from typing import Any, Dict, Iterable, Optional, Type
+
+from pydantic import BaseModel
+
+# Separator of field paths, e.g. "lia_insights.wellness_score"
+PATH_SEPARATOR = "."
+
+# Fields that are part of every projection
+ALWAYS_INCLUDED = ("timestamp",)
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Model type of a field, looking through Optional[...]"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+class FieldSelection:
+    """
+    A parsed ``fields=`` parameter
+
+    Selected paths are kept as a tree of nested dicts; an empty dict means
+    the whole subtree is selected. ``key`` is a canonical form of the
+    selection, so equal selections can share cached encodings.
+    """
+
+    def __init__(self, tree: Dict[str, dict]):
+        self.tree = tree
+        self.key = ",".join(sorted(self._paths(tree)))
+
+    @classmethod
+    def _paths(cls, tree: Dict[str, dict], prefix: str = "") -> Iterable[str]:
+        for name, subtree in tree.items():
+            path = f"{prefix}{name}"
+            if subtree:
+                yield from cls._paths(subtree, path + PATH_SEPARATOR)
+            else:
+                yield path
+
+    def includes(self, path: str) -> bool:
+        """
+        Whether any part of ``path`` is selected
+
+        True if the path itself, one of its parents or one of its children
+        was asked for, i.e. whether the value at ``path`` is needed to
+        build the projection.
+        """
+        node = self.tree
+        for name in path.split(PATH_SEPARATOR):
+            if name not in node:
+                return False
+            node = node[name]
+            if not node:
+                return True
+        return True
+
+    def requests(self, field_name: str) -> bool:
+        """Whether a selected path explicitly ends with ``field_name``"""
+        return any(
+            path.rsplit(PATH_SEPARATOR, 1)[-1] == field_name
+            for path in self._paths(self.tree)
+        )
+
+    def project(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a dumped response with only the selected fields"""
+        projected = {name: data[name] for name in ALWAYS_INCLUDED if name in data}
+        projected.update(self._project(data, self.tree))
+        return projected
+
+    @classmethod
+    def _project(cls, data: Any, tree: Dict[str, dict]) -> Any:
+        if not isinstance(data, dict):
+            # e.g. a skipped (null) sub-result
+            return data
+        return {
+            name: cls._project(data[name], subtree) if subtree else data[name]
+            for name, subtree in tree.items() if name in data
+        }
+
+
+def parse_fields(spec: Optional[str], model: Type[BaseModel]) -> Optional[FieldSelection]:
+    """
+    Parse a comma-separated list of field paths
+
+    Args:
+        spec: e.g. "raw_signals,lia_insights.condition"; empty for all fields
+        model: Response model the paths refer to
+
+    Returns:
+        The selection, or None when every field is wanted
+
+    Raises:
+        ValueError: For a path that does not exist in the model
+    """
+    if not spec or not spec.strip():
+        return None
+
+    tree: Dict[str, dict] = {}
+    for path in filter(None, (part.strip() for part in spec.split(","))):
+        current_model: Optional[Type[BaseModel]] = model
+        node = tree
+        names = path.split(PATH_SEPARATOR)
+
+        for depth, name in enumerate(names):
+            if current_model is None or name not in current_model.model_fields:
+                raise ValueError(f"Unknown field: {path}")
+            current_model = _nested_model(current_model.model_fields[name].annotation)
+
+            if depth == len(names) - 1:
+                # Selecting a field selects its whole subtree
+                node[name] = {}
+            elif name in node and not node[name]:
+                # A parent is already fully selected
+                break
+            else:
+                node = node.setdefault(name, {})
+
+    return FieldSelection(tree) if tree else None
@@ -0,0 +1,136 @@
+"""
+Fixed-size NumPy ring buffers for per-sample signal history
+"""
+
+import numpy as np
+from typing import Optional
+
+
+def resize_rows(array: np.ndarray, rows: int) -> np.ndarray:
+    """Copy of ``array`` with ``rows`` entries along axis 0, new entries zeroed"""
+    resized = np.zeros((rows, *array.shape[1:]), dtype=array.dtype)
+    kept = min(rows, len(array))
+    resized[:kept] = array[:kept]
+    return resized
+
+
+class RingBuffer:
+    """
+    Preallocated ring buffers of multi-channel samples, one per row
+
+    Storage is a single [rows, capacity, channels] block with a write
+    position and a sample count per row, so each row holds the history of
+    one stream (e.g. one device) and appending a sample to any number of
+    rows is one fancy-indexed write. Windows of many rows are gathered
+    with one index computation. Appending never shifts or reallocates
+    memory.
+
+    Slots a row has not written yet are always zero (storage starts zeroed
+    and clear() zeroes it again), so the window of a row with fewer than
+    ``n`` samples comes out zero-padded at the front without masking.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1, rows: int = 1, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if rows <= 0:
+            raise ValueError("rows must be positive")
+
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((rows, capacity, channels), dtype=dtype)
+        self.head = np.zeros(rows, dtype=np.int64)  # Next write slot in [0, capacity)
+        self.count = np.zeros(rows, dtype=np.int64)
+
+    @property
+    def rows(self) -> int:
+        """Number of rows (streams)"""
+        return len(self._data)
+
+    def append(self, rows, values) -> None:
+        """
+        Append one sample to each of ``rows``
+
+        Args:
+            rows: Distinct row indices
+            values: One sample per row, shaped [len(rows), channels]
+                (or [len(rows)] for a single channel)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0:
+            return
+
+        heads = self.head[rows]
+        self._data[rows, heads] = np.asarray(values, dtype=self._data.dtype).reshape(
+            len(rows), self.channels
+        )
+        self.head[rows] = (heads + 1) % self.capacity
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.capacity)
+
+    def extend(self, row: int, values) -> None:
+        """Append a block of samples shaped [n, channels] to one row"""
+        values = np.asarray(values, dtype=self._data.dtype).reshape(-1, self.channels)
+        n = len(values)
+
+        # Only the last ``capacity`` samples survive, in the slots they would land in
+        kept = values[-self.capacity:]
+        slots = (self.head[row] + n - len(kept) + np.arange(len(kept))) % self.capacity
+        self._data[row, slots] = kept
+        self.head[row] = (self.head[row] + n) % self.capacity
+        self.count[row] = min(self.capacity, self.count[row] + n)
+
+    def window(self, rows, n: int) -> np.ndarray:
+        """
+        Most recent ``n`` samples of each row, oldest first
+
+        Rows holding fewer than ``n`` samples are zero-padded at the front;
+        ``count`` tells how many of them are real.
+
+        Returns:
+            Array shaped [len(rows), min(n, capacity), channels]
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        n = min(n, self.capacity)
+        slots = (self.head[rows, None] - n + np.arange(n)) % self.capacity
+        return self._data[rows[:, None], slots]
+
+    def samples(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        """
+        Buffered samples of one row, oldest first
+
+        Args:
+            row: Row index
+            n: Number of samples (defaults to everything buffered)
+
+        Returns:
+            Array shaped [min(n, count), channels]
+        """
+        count = int(self.count[row])
+        n = count if n is None else min(n, count)
+        head = int(self.head[row])
+        return np.take(self._data[row], np.arange(head - n, head), axis=0, mode='wrap')
+
+    def ago(self, rows, k: int) -> np.ndarray:
+        """Sample appended ``k`` appends ago in each row (1 = latest), shaped [len(rows), channels]"""
+        rows = np.asarray(rows, dtype=np.intp)
+        return self._data[rows, (self.head[rows] - k) % self.capacity]
+
+    def latest(self, rows) -> np.ndarray:
+        """Most recent sample of each row, shaped [len(rows), channels]"""
+        return self.ago(rows, 1)
+
+    def clear(self, rows) -> None:
+        """Drop all samples of ``rows`` (their storage is zeroed and kept)"""
+        self._data[rows] = 0
+        self.head[rows] = 0
+        self.count[rows] = 0
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self._data = resize_rows(self._data, rows)
+        self.head = resize_rows(self.head, rows)
+        self.count = resize_rows(self.count, rows)
+
+    def is_full(self, rows) -> np.ndarray:
+        """Whether each row holds ``capacity`` samples"""
+        return self.count[rows] == self.capacity
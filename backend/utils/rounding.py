@@ -0,0 +1,25 @@
+"""
+Element-wise rounding with the semantics of the built-in round()
+"""
+
+import numpy as np
+
+
+def round_half(values, ndigits: int = 0) -> np.ndarray:
+    """
+    Round every element the way round(value, ndigits) rounds a float
+
+    np.round scales by 10**ndigits and rounds the result half to even, so
+    a value such as 0.15 (stored as 0.1499...) rounds to 0.2 where round(),
+    which works on the exact binary value, gives 0.1. Both agree away
+    from such half-way values; only the elements that sit on one are
+    rounded again with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * 10.0 ** ndigits
+    ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, ndigits) for value in values[ties].tolist()]
+    return rounded
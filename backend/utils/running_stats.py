@@ -0,0 +1,219 @@
+"""
+Incremental sliding-window statistics for streaming signals
+"""
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer, resize_rows
+
+
+class SlidingWindowStats:
+    """
+    Per-channel mean and standard deviation over the last ``window`` samples
+
+    Uses Welford's update while the window fills and the matching
+    replace-one-value update once it is full, so each push costs O(1)
+    regardless of window length and stays numerically stable. The exact
+    sums are recomputed from the window once per ``resync_interval`` pushes
+    to stop floating point drift from accumulating on long streams, and a
+    window of identical values (e.g. a flat-lined channel) snaps to an
+    exact mean with zero variance.
+
+    Every row is an independent stream, and a push updates any number of
+    rows in one set of array operations.
+    """
+
+    def __init__(
+        self, window: int, channels: int = 1, rows: int = 1,
+        resync_interval: int = 1000
+    ):
+        self.window = window
+        self.channels = channels
+        self.resync_interval = resync_interval
+        self.values = RingBuffer(window, channels, rows)
+
+        self._mean = np.zeros((rows, channels))
+        self._m2 = np.zeros((rows, channels))  # Sum of squared deviations from the mean
+        self._run = np.zeros((rows, channels), dtype=np.int64)  # Trailing identical values
+        self._pushes = np.zeros(rows, dtype=np.int64)
+
+    def push(self, rows, values) -> None:
+        """Add one sample of ``channels`` values to each of ``rows``, evicting their oldest if full"""
+        rows = np.asarray(rows, dtype=np.intp)
+        values = np.asarray(values, dtype=np.float64).reshape(len(rows), self.channels)
+
+        count = self.values.count[rows]
+        filled = (count > 0)[:, None]
+        full = (count == self.window)[:, None]
+        run = np.where(filled & (values == self.values.latest(rows)), self._run[rows] + 1, 1)
+        old = self.values.ago(rows, self.window)  # Evicted once the window is full
+        self.values.append(rows, values)
+
+        mean = self._mean[rows]
+        m2 = self._m2[rows]
+        n = np.minimum(count + 1, self.window)[:, None]
+
+        # Replace-one-value update for full windows, Welford's otherwise
+        replaced_mean = mean + (values - old) / self.window
+        replaced_m2 = m2 + (values - old) * (values - replaced_mean + old - mean)
+        delta = values - mean
+        welford_mean = mean + delta / n
+        welford_m2 = m2 + delta * (values - welford_mean)
+
+        flat = run >= n
+        self._mean[rows] = np.where(flat, values, np.where(full, replaced_mean, welford_mean))
+        self._m2[rows] = np.where(flat, 0.0, np.where(full, replaced_m2, welford_m2))
+        self._run[rows] = run
+
+        self._pushes[rows] += 1
+        due = rows[self._pushes[rows] % self.resync_interval == 0]
+        if due.size:
+            self.resync(due)
+
+    def extend(self, row: int, values) -> None:
+        """Add a block of samples shaped [n, channels] to one row"""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.channels)
+        rows = np.array([row])
+
+        # Only the last ``window`` samples can still be in the window
+        for value in values[-self.window:]:
+            self.push(rows, value)
+
+    def resync(self, rows) -> None:
+        """Recompute the accumulators of ``rows`` exactly from their buffered windows"""
+        rows = np.asarray(rows, dtype=np.intp)
+        window = self.values.window(rows, self.window)
+        count = self.values.count[rows]
+        real = (np.arange(self.window) >= self.window - count[:, None])[:, :, None]
+
+        mean = window.sum(axis=1) / np.maximum(count, 1)[:, None]
+        self._mean[rows] = mean
+        self._m2[rows] = np.where(real, (window - mean[:, None]) ** 2, 0.0).sum(axis=1)
+
+    def clear(self, rows) -> None:
+        """Drop the windows of ``rows``"""
+        self.values.clear(rows)
+        self._mean[rows] = 0.0
+        self._m2[rows] = 0.0
+        self._run[rows] = 0
+        self._pushes[rows] = 0
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.values.resize(rows)
+        self._mean = resize_rows(self._mean, rows)
+        self._m2 = resize_rows(self._m2, rows)
+        self._run = resize_rows(self._run, rows)
+        self._pushes = resize_rows(self._pushes, rows)
+
+    def count(self, rows) -> np.ndarray:
+        """Number of samples currently in each row's window"""
+        return self.values.count[rows]
+
+    def mean(self, rows) -> np.ndarray:
+        """Per-channel mean over each row's window, shaped [len(rows), channels]"""
+        return self._mean[rows]
+
+    def variance(self, rows) -> np.ndarray:
+        """Per-channel population variance over each row's window"""
+        count = self.values.count[rows]
+        return np.maximum(self._m2[rows], 0.0) / np.maximum(count, 1)[:, None]
+
+    def std(self, rows) -> np.ndarray:
+        """Per-channel population standard deviation over each row's window"""
+        return np.sqrt(self.variance(rows))
+
+
+class SlidingTrend:
+    """
+    Least-squares linear slope over several trailing windows, O(1) per update
+
+    For each window length the accumulator keeps Σy and Σxy with x the
+    sample index inside the window (0 = oldest). When a full window slides
+    by one sample every index drops by one, so
+
+        Σxy' = Σxy - (Σy - y_old) + (w - 1) * y_new
+
+    and the slope follows from the closed-form normal equations using the
+    known Σx and Σx² of 0..n-1. Sums are recomputed exactly once per
+    ``resync_interval`` pushes. Every row is an independent series.
+    """
+
+    def __init__(self, windows, rows: int = 1, resync_interval: int = 1000):
+        self.windows = tuple(sorted(set(windows)))
+        self.resync_interval = resync_interval
+        self.values = RingBuffer(self.windows[-1], 1, rows)
+
+        self._sum_y = np.zeros((rows, len(self.windows)))
+        self._sum_xy = np.zeros((rows, len(self.windows)))
+        self._pushes = np.zeros(rows, dtype=np.int64)
+
+    def push(self, rows, y) -> None:
+        """Add one value to each of ``rows``"""
+        rows = np.asarray(rows, dtype=np.intp)
+        y = np.asarray(y, dtype=np.float64).reshape(len(rows))
+        count = self.values.count[rows]
+
+        sum_y = self._sum_y[rows]
+        sum_xy = self._sum_xy[rows]
+        for i, window in enumerate(self.windows):
+            full = count >= window
+            y_old = self.values.ago(rows, window)[:, 0]
+            sum_xy[:, i] += np.where(full, (window - 1) * y - (sum_y[:, i] - y_old), count * y)
+            sum_y[:, i] += np.where(full, y - y_old, y)
+        self._sum_y[rows] = sum_y
+        self._sum_xy[rows] = sum_xy
+
+        self.values.append(rows, y)
+
+        self._pushes[rows] += 1
+        due = rows[self._pushes[rows] % self.resync_interval == 0]
+        if due.size:
+            self.resync(due)
+
+    def resync(self, rows) -> None:
+        """Recompute the sums of ``rows`` exactly from their buffered values"""
+        rows = np.asarray(rows, dtype=np.intp)
+        count = self.values.count[rows]
+
+        for i, window in enumerate(self.windows):
+            # Zero padding in front of short rows adds nothing to either sum
+            values = self.values.window(rows, window)[:, :, 0]
+            n = np.minimum(count, window)
+            x = np.arange(window) - (window - n)[:, None]
+            self._sum_y[rows, i] = values.sum(axis=1)
+            self._sum_xy[rows, i] = (x * values).sum(axis=1)
+
+    def slope(self, rows, window: int) -> np.ndarray:
+        """
+        Slope per sample over the last ``window`` values of each row
+
+        Uses all buffered values while fewer than ``window`` are available,
+        and is 0.0 for rows with fewer than two.
+        """
+        i = self.windows.index(window)
+        n = np.minimum(self.values.count[rows], window).astype(np.float64)
+
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (n * self._sum_xy[rows, i] - sum_x * self._sum_y[rows, i]) / (n * sum_xx - sum_x * sum_x)
+        return np.where(n >= 2, slope, 0.0)
+
+    def clear(self, rows) -> None:
+        """Drop the series of ``rows``"""
+        self.values.clear(rows)
+        self._sum_y[rows] = 0.0
+        self._sum_xy[rows] = 0.0
+        self._pushes[rows] = 0
+
+    def resize(self, rows: int) -> None:
+        """Grow (with empty rows) or shrink to ``rows`` rows"""
+        self.values.resize(rows)
+        self._sum_y = resize_rows(self._sum_y, rows)
+        self._sum_xy = resize_rows(self._sum_xy, rows)
+        self._pushes = resize_rows(self._pushes, rows)
+
+    def count(self, rows) -> np.ndarray:
+        """Number of buffered values of each row"""
+        return self.values.count[rows]
@@ -0,0 +1,101 @@
+"""
+Pluggable WebSocket frame encoders
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoder
+    msgpack = None
+
+# Subprotocols are named "<prefix><encoding>", e.g. "wearable.msgpack"
+SUBPROTOCOL_PREFIX = "wearable."
+
+
+class FrameEncoder:
+    """
+    Base frame encoder (stdlib JSON)
+
+    Text encoders return ``str`` and are sent as text frames; binary
+    encoders return ``bytes`` and are sent as binary frames.
+    """
+
+    name = "json"
+    binary = False
+
+    @property
+    def subprotocol(self) -> str:
+        return f"{SUBPROTOCOL_PREFIX}{self.name}"
+
+    def encode(self, payload: dict) -> Union[str, bytes]:
+        return json.dumps(payload, separators=(",", ":"))
+
+
+class OrjsonEncoder(FrameEncoder):
+    """JSON through orjson (several times faster than the stdlib encoder)"""
+
+    name = "orjson"
+
+    def encode(self, payload: dict) -> str:
+        return orjson.dumps(payload).decode()
+
+
+class MsgpackEncoder(FrameEncoder):
+    """Binary MessagePack frames"""
+
+    name = "msgpack"
+    binary = True
+
+    def encode(self, payload: dict) -> bytes:
+        return msgpack.packb(payload, use_bin_type=True)
+
+
+# Encoders whose libraries are installed, by name
+ENCODERS: Dict[str, FrameEncoder] = {"json": FrameEncoder()}
+if orjson is not None:
+    ENCODERS["orjson"] = OrjsonEncoder()
+if msgpack is not None:
+    ENCODERS["msgpack"] = MsgpackEncoder()
+
+
+def negotiate_encoder(
+    encoding: Optional[str], subprotocols: List[str]
+) -> Tuple[Optional[FrameEncoder], Optional[str]]:
+    """
+    Pick the encoder for a WebSocket connection
+
+    An explicit ``encoding`` query parameter wins; otherwise the first
+    offered "wearable.<encoding>" subprotocol that is available is used,
+    falling back to stdlib JSON.
+
+    Args:
+        encoding: Value of the ``encoding`` query parameter, if any
+        subprotocols: Subprotocols offered by the client
+
+    Returns:
+        (encoder, subprotocol to accept). The encoder is None when the
+        requested encoding is not available.
+    """
+    offered = [
+        protocol[len(SUBPROTOCOL_PREFIX):]
+        for protocol in subprotocols if protocol.startswith(SUBPROTOCOL_PREFIX)
+    ]
+
+    if encoding is not None:
+        encoder = ENCODERS.get(encoding)
+        if encoder is None:
+            return None, None
+        return encoder, encoder.subprotocol if encoding in offered else None
+
+    for name in offered:
+        if name in ENCODERS:
+            return ENCODERS[name], ENCODERS[name].subprotocol
+
+    return ENCODERS["json"], None
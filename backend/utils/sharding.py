@@ -0,0 +1,21 @@
+"""
+Device affinity helpers shared by the pipeline executor and sharded mode
+"""
+
+import os
+import zlib
+
+
+def shard_for(device_id: str, shards: int) -> int:
+    """
+    Stable shard index for a device
+
+    Uses crc32 rather than ``hash()`` so every process (workers, shards and
+    the router) maps a device to the same shard.
+    """
+    return zlib.crc32(device_id.encode()) % shards
+
+
+def shard_socket_path(socket_dir: str, index: int) -> str:
+    """Unix socket path of a shard server"""
+    return os.path.join(socket_dir, f"shard-{index}.sock")
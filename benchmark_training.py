@@ -0,0 +1,82 @@
+"""
+Training epoch benchmark
+Times training epochs over the demo sessions, split into gathering
+batches from the feature chunks and the gradient steps, for each number
+of NumPy (BLAS) threads
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from config import TRAINING_BATCH_SIZE, TRAINING_LEARNING_RATE
+from training_data import (
+    SoftmaxRegression, batches_of, build_dataset, record_demo_sessions, session_files, FeatureDataset
+)
+
+# Environment variables that set NumPy's BLAS thread count
+THREAD_VARIABLES = ('OPENBLAS_NUM_THREADS', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def measure_epochs(directory, epochs):
+    """Mean seconds per epoch for (gathering, stepping) after one warm-up epoch"""
+    dataset = FeatureDataset(directory)
+    model = SoftmaxRegression(dataset.mean, dataset.std)
+    rng = np.random.default_rng(0)
+    indices = np.arange(len(dataset))
+
+    load_time = step_time = 0.0
+    for epoch in range(epochs + 1):
+        batches = batches_of(rng.permutation(indices), TRAINING_BATCH_SIZE)
+        load = step = 0.0
+        for batch in batches:
+            t0 = time.perf_counter()
+            features, labels = dataset.batch(batch)
+            t1 = time.perf_counter()
+            model.step(features, labels, TRAINING_LEARNING_RATE)
+            load += t1 - t0
+            step += time.perf_counter() - t1
+        if epoch:
+            load_time += load
+            step_time += step
+    return len(dataset), load_time / epochs, step_time / epochs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training epoch time against thread count")
+    parser.add_argument("--threads", default="1,2,4", help="BLAS thread counts to compare")
+    parser.add_argument("--epochs", type=int, default=5, help="Measured epochs per thread count")
+    parser.add_argument("--data", help=argparse.SUPPRESS)  # Set for the per-thread-count child runs
+    args = parser.parse_args()
+
+    if args.data:
+        rows, load, step = measure_epochs(args.data, args.epochs)
+        print(rows, load, step)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sessions_dir = os.path.join(workdir, 'sessions')
+        data_dir = os.path.join(workdir, 'features')
+        record_demo_sessions(sessions_dir)
+        build_dataset(session_files(sessions_dir), data_dir)
+
+        print("=" * 64)
+        print(f"  Training epoch time ({os.cpu_count()} CPU cores)")
+        print("=" * 64)
+        print(f"{'threads':>8} {'windows':>9} {'gather (s)':>12} {'steps (s)':>11} {'epoch (s)':>11}")
+
+        for threads in map(int, args.threads.split(",")):
+            env = dict(os.environ, **{name: str(threads) for name in THREAD_VARIABLES})
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--data", data_dir, "--epochs", str(args.epochs)],
+                env=env, check=True, capture_output=True, text=True,
+                cwd=os.path.dirname(os.path.abspath(__file__))
+            ).stdout.split()
+            rows, load, step = int(output[0]), float(output[1]), float(output[2])
+            print(f"{threads:>8} {rows:>9} {load:>12.4f} {step:>11.4f} {load + step:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,38 @@ SIGNAL_TYPES = {
 
 # Model Settings
 MODEL_TYPES = ['CNN', 'LSTM', 'Transformer', 'Random Forest']
-MODEL_STATUS = ['Idle', 'Training', 'Inference', 'Ready']
+MODEL_STATUS = ['Idle', 'Loading', 'Training', 'Inference', 'Ready']
+MODEL_WINDOW_SIZE = 50  # Samples per feature window
+MODEL_WINDOW_STRIDE = 5  # Samples between window starts
+MODEL_WINDOW_STATS = ['mean', 'std', 'slope']
+MODEL_FEATURES = [f"{signal}_{stat}" for signal in SIGNAL_TYPES for stat in MODEL_WINDOW_STATS]
+MODEL_CLASSES = [
+    'Normal Activity', 'Light Exercise', 'Intense Exercise', 'Resting',
+    'Sleeping', 'Stress Detected', 'Irregular Pattern'
+]
+MODEL_RECOMMENDATIONS = {
+    'Normal Activity': 'Continue monitoring',
+    'Light Exercise': 'Maintain current activity level',
+    'Intense Exercise': 'Consider rest if prolonged',
+    'Resting': 'Normal state',
+    'Sleeping': 'Good sleep pattern',
+    'Stress Detected': 'Consider relaxation exercises',
+    'Irregular Pattern': 'Recommend medical consultation'
+}
+MODEL_WARMUP_BATCH_SIZE = 32  # Rows in the dummy batch run before activation
+MODEL_HISTORY_SIZE = 5  # Loaded versions kept in memory for rollback
+MODEL_LOAD_POLL_INTERVAL = 100  # ms
+
+# Training Settings
+SESSIONS_DIR = 'sessions'  # Recorded monitoring sessions (.npy)
+TRAINING_DATA_DIR = 'sessions/features'  # Precomputed feature window chunks
+TRAINED_MODELS_DIR = 'models'
+TRAINING_CHUNK_ROWS = 65536  # Feature windows per chunk file
+TRAINING_BATCH_SIZE = 1024
+TRAINING_LEARNING_RATE = 0.5
+TRAINING_VALIDATION_FRACTION = 0.2
+TRAINING_DEMO_SESSIONS = 8  # Synthetic sessions used when nothing is recorded
+TRAINING_DEMO_SESSION_SAMPLES = 20000
 
 # API Settings
 API_HOST = 'localhost'
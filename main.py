@@ -6,12 +6,13 @@ model training/inference, and mobile app connectivity.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-from config import APP_TITLE, APP_WIDTH, APP_HEIGHT, UPDATE_INTERVAL
-from mock_data import MockDataGenerator, MockPredictionGenerator
+from config import APP_TITLE, APP_WIDTH, APP_HEIGHT, UPDATE_INTERVAL, MODEL_WINDOW_SIZE
+from mock_data import MockDataGenerator
 from signal_visualizer import SignalVisualizerPanel
 from model_manager import ModelManager, ModelControlPanel
 from api_simulator import APISimulator, APIControlPanel
 from results_panel import ResultsPanel
+from training_data import SessionRecorder
 
 
 class WearableAnalysisApp:
@@ -24,7 +25,6 @@ class WearableAnalysisApp:
 
         # Initialize components
         self.data_generator = MockDataGenerator()
-        self.prediction_generator = MockPredictionGenerator()
         self.model_manager = ModelManager()
         self.api_simulator = APISimulator()
 
@@ -32,6 +32,7 @@ class WearableAnalysisApp:
         self.is_streaming = False
         self.is_running = False
         self.update_job = None
+        self.session_recorder = None
 
         # Setup UI
         self._setup_ui()
@@ -160,6 +161,7 @@ class WearableAnalysisApp:
 
         self.is_streaming = True
         self.is_running = True
+        self.session_recorder = SessionRecorder()
 
         # Update UI state
         self.start_btn.config(state=tk.DISABLED)
@@ -193,6 +195,13 @@ class WearableAnalysisApp:
             self.root.after_cancel(self.update_job)
             self.update_job = None
 
+        # Keep the session for training
+        if self.session_recorder is not None:
+            path = self.session_recorder.save()
+            if path:
+                self.results_panel.add_log(f"Session recorded for training: {path}", "INFO")
+            self.session_recorder = None
+
         # Log stop
         self.results_panel.add_log("Biosignal monitoring stopped", "INFO")
 
@@ -204,6 +213,7 @@ class WearableAnalysisApp:
         try:
             # Generate biosignal data
             signal_data = self.data_generator.generate_all_signals()
+            self.session_recorder.append(signal_data)
 
             # Update visualizations
             self.signal_panel.update_signals(signal_data)
@@ -220,12 +230,15 @@ class WearableAnalysisApp:
                 else:
                     self._update_counter = 0
 
-                if self._update_counter % 40 == 0:
-                    prediction = self.prediction_generator.generate_prediction(signal_data)
+                # Predict from the latest feature window with the active model
+                window = self.session_recorder.recent(MODEL_WINDOW_SIZE)
+                if self._update_counter % 40 == 0 and window is not None:
+                    prediction = self.model_manager.predict(window)
                     self.results_panel.add_prediction(prediction)
                     self.api_simulator.add_prediction(prediction)
                     self.results_panel.add_log(
-                        f"Prediction: {prediction['condition']} ({prediction['confidence']:.1%})",
+                        f"Prediction: {prediction['condition']} ({prediction['confidence']:.1%}, "
+                        f"model v{prediction['model_version']})",
                         "INFO"
                     )
 
@@ -341,6 +354,7 @@ For more information, see README.md
         self._stop_monitoring()
         if self.api_simulator.is_running:
             self.api_simulator.stop_server()
+        self.model_manager.shutdown()
 
         # Close application
         self.root.destroy()
@@ -3,7 +3,6 @@ Mock data generator for simulating wearable device biosignals
 """
 import numpy as np
 import random
-from datetime import datetime
 from config import SIGNAL_TYPES
 
 
@@ -56,6 +55,31 @@ class MockDataGenerator:
         """Generate one sample for each signal type"""
         return {signal: self.generate_sample(signal) for signal in SIGNAL_TYPES.keys()}
 
+    def generate_session(self, n_samples, rng=None):
+        """
+        Generate a whole session of generate_all_signals() samples at once
+
+        Returns:
+            [n_samples, signals] array, one column per SIGNAL_TYPES entry
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        signals = list(SIGNAL_TYPES.keys())
+
+        # Every generate_sample call advances time_offset, one call per signal per sample
+        steps = np.arange(n_samples)[:, None] * len(signals) + np.arange(len(signals))
+        offsets = self.time_offset + steps * 0.01
+        self.time_offset += n_samples * len(signals) * 0.01
+
+        base = np.array([self.base_values[signal] for signal in signals])
+        freq = np.array([self.patterns[signal]['freq'] for signal in signals])
+        amplitude = np.array([self.patterns[signal]['amplitude'] for signal in signals])
+        low = np.array([SIGNAL_TYPES[signal]['range'][0] - 5 for signal in signals])
+        high = np.array([SIGNAL_TYPES[signal]['range'][1] + 5 for signal in signals])
+
+        values = base + amplitude * np.sin(2 * np.pi * freq * offsets)
+        values += rng.normal(0, 1, values.shape) * amplitude * 0.2
+        return np.round(np.clip(values, low, high), 2)
+
     def add_anomaly(self, signal_type, anomaly_type='spike'):
         """Inject an anomaly into the signal"""
         if anomaly_type == 'spike':
@@ -65,57 +89,3 @@ class MockDataGenerator:
         else:
             return self.generate_sample(signal_type)
 
-
-class MockPredictionGenerator:
-    """Generates mock prediction results"""
-
-    def __init__(self):
-        self.conditions = [
-            'Normal Activity',
-            'Light Exercise',
-            'Intense Exercise',
-            'Resting',
-            'Sleeping',
-            'Stress Detected',
-            'Irregular Pattern'
-        ]
-        self.confidence_base = 0.85
-
-    def generate_prediction(self, signal_data):
-        """Generate a mock prediction based on signal data"""
-        # Simulate model prediction
-        condition = random.choice(self.conditions)
-        confidence = round(self.confidence_base + random.uniform(-0.1, 0.15), 3)
-        confidence = min(0.99, max(0.70, confidence))
-
-        # Generate class probabilities
-        probabilities = self._generate_probabilities()
-
-        prediction = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'condition': condition,
-            'confidence': confidence,
-            'probabilities': probabilities,
-            'signal_quality': random.choice(['Excellent', 'Good', 'Fair']),
-            'recommendation': self._generate_recommendation(condition)
-        }
-
-        return prediction
-
-    def _generate_probabilities(self):
-        """Generate probability distribution for all classes"""
-        probs = np.random.dirichlet(np.ones(len(self.conditions)) * 2)
-        return {cond: round(float(prob), 3) for cond, prob in zip(self.conditions, probs)}
-
-    def _generate_recommendation(self, condition):
-        """Generate recommendation based on detected condition"""
-        recommendations = {
-            'Normal Activity': 'Continue monitoring',
-            'Light Exercise': 'Maintain current activity level',
-            'Intense Exercise': 'Consider rest if prolonged',
-            'Resting': 'Normal state',
-            'Sleeping': 'Good sleep pattern',
-            'Stress Detected': 'Consider relaxation exercises',
-            'Irregular Pattern': 'Recommend medical consultation'
-        }
-        return recommendations.get(condition, 'Continue monitoring')
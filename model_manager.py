@@ -1,73 +1,348 @@
 """
-Model management module for simulating ML model operations
+Model management module for ML model operations
+Loads model versions in the background and hot-swaps the active one
 """
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
-import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from config import MODEL_TYPES, COLOR_SUCCESS, COLOR_WARNING, COLOR_DANGER
+import numpy as np
+from config import (
+    SIGNAL_TYPES, MODEL_TYPES, MODEL_FEATURES, MODEL_CLASSES, MODEL_RECOMMENDATIONS,
+    MODEL_WARMUP_BATCH_SIZE,
+    MODEL_HISTORY_SIZE, MODEL_LOAD_POLL_INTERVAL, TRAINED_MODELS_DIR,
+    TRAINING_BATCH_SIZE, TRAINING_LEARNING_RATE, TRAINING_VALIDATION_FRACTION,
+    COLOR_SUCCESS, COLOR_WARNING, COLOR_DANGER
+)
+from training_data import (
+    SoftmaxRegression, batches_of, prepare_dataset, window_features
+)
+
+
+def signal_quality(samples):
+    """Signal quality of a window from the share of samples inside every signal's normal range"""
+    low = np.array([SIGNAL_TYPES[signal]['range'][0] for signal in SIGNAL_TYPES])
+    high = np.array([SIGNAL_TYPES[signal]['range'][1] for signal in SIGNAL_TYPES])
+    in_range = np.mean(np.all((samples >= low) & (samples <= high), axis=1))
+    if in_range >= 0.95:
+        return 'Excellent'
+    if in_range >= 0.8:
+        return 'Good'
+    return 'Fair'
+
+
+class ModelVersion:
+    """A loaded, validated and warmed-up model (softmax regression weights)"""
+
+    def __init__(self, version, weights, bias, info):
+        self.version = version
+        self.weights = weights  # [features, classes], possibly memory-mapped
+        self.bias = bias  # [classes]
+        self.info = info
+
+    def predict_proba(self, features):
+        """Class probabilities for a [N, features] batch"""
+        logits = np.asarray(features, dtype=np.float64) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+
+def read_weights(filepath):
+    """
+    Read model weights from a file
+
+    - .npy: one [features + 1, classes] array (bias in the last row),
+      memory-mapped so large files are paged in on demand
+    - .npz: 'weights' and 'bias' arrays, optionally 'accuracy'
+    - anything else: freshly initialized demo weights
+
+    Returns:
+        (weights, bias, accuracy, source)
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension == '.npy':
+        layer = np.load(filepath, mmap_mode='r')
+        if layer.ndim != 2 or len(layer) < 2:
+            raise ValueError(f"Expected a [features + 1, classes] array, got shape {layer.shape}")
+        return layer[:-1], layer[-1], None, 'memory-mapped'
+
+    if extension == '.npz':
+        with np.load(filepath) as archive:
+            accuracy = float(archive['accuracy']) if 'accuracy' in archive else None
+            return archive['weights'], archive['bias'], accuracy, 'file'
+
+    weights = np.random.normal(0, 0.01, (len(MODEL_FEATURES), len(MODEL_CLASSES)))
+    return weights, np.zeros(len(MODEL_CLASSES)), round(random.uniform(0.85, 0.98), 3), 'demo'
+
+
+def validate_weights(weights, bias):
+    """Raise ValueError unless the weights fit MODEL_FEATURES -> MODEL_CLASSES"""
+    expected = (len(MODEL_FEATURES), len(MODEL_CLASSES))
+    if weights.shape != expected:
+        raise ValueError(f"Weights must have shape {expected}, got {weights.shape}")
+    if bias.shape != (expected[1],):
+        raise ValueError(f"Bias must have shape {(expected[1],)}, got {bias.shape}")
+    if not (np.isfinite(weights).all() and np.isfinite(bias).all()):
+        raise ValueError("Weights contain NaN or infinite values")
 
 
 class ModelManager:
-    """Manages model operations (loading, training, inference)"""
+    """
+    Manages model operations (loading, training, inference)
+
+    Models are loaded, validated and warmed up on a background worker,
+    then become active with a single reference swap, so inference never
+    waits for a load. Recent versions stay in memory for instant rollback.
+    """
 
     def __init__(self):
-        self.current_model = None
+        self.active_version = None
+        self.versions = []  # Loaded versions, oldest first
         self.model_status = 'Idle'
         self.is_training = False
         self.is_inferencing = False
         self.training_progress = 0
         self.training_metrics = {}
+        self.training_error = None
+        self.finished_training_run = 0  # Number of the last training run that exited
+
+        self._training_thread = None
+        self._training_stop = None
+        self._training_run = 0
+        self._next_version = 1
+        self._pending_loads = 0
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-loader')
+
+    @property
+    def current_model(self):
+        """Information about the active model, or None"""
+        active = self.active_version
+        return active.info if active is not None else None
+
+    @property
+    def is_loading(self):
+        return self._pending_loads > 0
+
+    def load_model_async(self, filepath):
+        """
+        Load, validate and warm up a model on the background worker
+
+        Returns:
+            Future with the model information once the model is active;
+            the future raises if the model failed to load or validate
+        """
+        with self._lock:
+            self._pending_loads += 1
+        future = self._loader.submit(self._load, filepath)
+        future.add_done_callback(self._load_finished)
+        return future
 
     def load_model(self, filepath):
-        """Simulate loading a model file"""
-        time.sleep(1)  # Simulate loading time
-        model_name = filepath.split('/')[-1] if filepath else 'default_model.h5'
-        self.current_model = {
-            'name': model_name,
-            'type': random.choice(MODEL_TYPES),
+        """Load a model and wait until it is active"""
+        return self.load_model_async(filepath).result()
+
+    def _load_finished(self, future):
+        with self._lock:
+            self._pending_loads -= 1
+
+    def _load(self, filepath):
+        """Worker side of load_model_async"""
+        filepath = filepath or 'default_model.h5'
+        weights, bias, accuracy, source = read_weights(filepath)
+        validate_weights(weights, bias)
+
+        with self._lock:
+            version = self._next_version
+            self._next_version += 1
+
+        model = ModelVersion(version, weights, bias, {
+            'name': os.path.basename(filepath),
+            'type': random.choice(MODEL_TYPES) if source == 'demo' else 'Softmax Regression',
+            'version': version,
+            'source': source,
             'loaded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'parameters': random.randint(100000, 5000000),
-            'accuracy': round(random.uniform(0.85, 0.98), 3)
+            'parameters': int(weights.size + bias.size),
+            'accuracy': accuracy
+        })
+
+        # Warm up: a dummy batch pages in mapped weights and checks outputs
+        probabilities = model.predict_proba(np.zeros((MODEL_WARMUP_BATCH_SIZE, len(MODEL_FEATURES))))
+        if not np.allclose(probabilities.sum(axis=1), 1.0):
+            raise ValueError("Model produced invalid probabilities on the warm-up batch")
+
+        self._activate(model)
+        return model.info
+
+    def _activate(self, model):
+        """Make a loaded model the active one"""
+        with self._lock:
+            self.versions.append(model)
+            del self.versions[:-MODEL_HISTORY_SIZE]
+            self.active_version = model
+            if self.model_status == 'Idle':
+                self.model_status = 'Ready'
+
+    def rollback(self):
+        """
+        Reactivate the version loaded before the active one
+
+        The rolled-back version is dropped from the history, so repeated
+        rollbacks walk further back.
+
+        Returns:
+            Information about the reactivated model, or None if there is
+            no earlier version
+        """
+        with self._lock:
+            if self.active_version not in self.versions:
+                return None
+            index = self.versions.index(self.active_version)
+            if index == 0:
+                return None
+            self.active_version = self.versions[index - 1]
+            del self.versions[index]
+            return self.active_version.info
+
+    def predict_proba(self, features):
+        """Class probabilities from the active model for a [N, features] batch"""
+        model = self.active_version
+        if model is None:
+            raise RuntimeError("No model loaded")
+        return model.predict_proba(features)
+
+    def predict(self, samples):
+        """
+        Predict the condition of the most recent feature window
+
+        Args:
+            samples: [MODEL_WINDOW_SIZE, signals] latest monitoring samples
+
+        Returns:
+            Prediction with timestamp, condition, confidence, probabilities,
+            signal quality, recommendation and the model version used
+        """
+        model = self.active_version
+        if model is None:
+            raise RuntimeError("No model loaded")
+        probabilities = model.predict_proba(window_features(samples))[-1]
+        condition = MODEL_CLASSES[int(np.argmax(probabilities))]
+
+        return {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'condition': condition,
+            'confidence': round(float(probabilities.max()), 3),
+            'probabilities': {
+                name: round(float(prob), 3) for name, prob in zip(MODEL_CLASSES, probabilities)
+            },
+            'signal_quality': signal_quality(samples),
+            'recommendation': MODEL_RECOMMENDATIONS.get(condition, 'Continue monitoring'),
+            'model_version': model.version
         }
-        self.model_status = 'Ready'
-        return self.current_model
+
+    def shutdown(self):
+        """Stop the background loader"""
+        self._loader.shutdown(wait=False, cancel_futures=True)
 
     def start_training(self, epochs=10):
-        """Simulate model training"""
+        """
+        Train the active model on recorded sessions in a background thread
+
+        The trained weights are saved to TRAINED_MODELS_DIR and activated
+        as a new version; stopping early discards them.
+
+        Returns:
+            False if the previous run's thread has not exited yet
+        """
+        if self._training_thread is not None and self._training_thread.is_alive():
+            return False
+
+        self._training_run += 1
+        run = self._training_run
+        stop = threading.Event()
+
         self.is_training = True
         self.model_status = 'Training'
         self.training_progress = 0
+        self.training_error = None
 
         def train():
-            for epoch in range(epochs):
-                if not self.is_training:
-                    break
-
-                # Simulate training metrics
-                self.training_metrics = {
-                    'epoch': epoch + 1,
-                    'loss': round(1.0 - (epoch / epochs) * 0.7 + random.uniform(-0.05, 0.05), 4),
-                    'accuracy': round((epoch / epochs) * 0.85 + 0.15 + random.uniform(-0.02, 0.02), 4),
-                    'val_loss': round(1.0 - (epoch / epochs) * 0.6 + random.uniform(-0.05, 0.05), 4),
-                    'val_accuracy': round((epoch / epochs) * 0.80 + 0.20 + random.uniform(-0.02, 0.02), 4)
-                }
-                self.training_progress = int((epoch + 1) / epochs * 100)
-                time.sleep(2)  # Simulate epoch time
-
-            self.is_training = False
-            self.model_status = 'Ready'
-            self.training_progress = 100
-
-        thread = threading.Thread(target=train, daemon=True)
-        thread.start()
+            try:
+                self._train(epochs, stop)
+            except Exception as e:
+                self.training_error = str(e)
+            finally:
+                self.is_training = False
+                self.model_status = 'Ready'
+                self.finished_training_run = run
+
+        self._training_stop = stop
+        self._training_thread = threading.Thread(target=train, daemon=True)
+        self._training_thread.start()
+        return True
+
+    def _train(self, epochs, stop):
+        """Training loop of start_training, until ``stop`` is set"""
+        dataset = prepare_dataset()
+        rng = np.random.default_rng()
+        train_indices, validation_indices = dataset.split(TRAINING_VALIDATION_FRACTION, rng)
+        validation_batches = batches_of(validation_indices, TRAINING_BATCH_SIZE)
+
+        active = self.active_version
+        if active is not None and active.weights.shape == (len(MODEL_FEATURES), len(MODEL_CLASSES)):
+            model = SoftmaxRegression(dataset.mean, dataset.std, active.weights, active.bias)
+        else:
+            model = SoftmaxRegression(dataset.mean, dataset.std)
+
+        for epoch in range(epochs):
+            # Shuffle indices only, the windows stay in their chunk files
+            batches = batches_of(rng.permutation(train_indices), TRAINING_BATCH_SIZE)
+            loss, correct = 0.0, 0
+            for index, (features, labels) in enumerate(dataset.iterate(batches)):
+                if stop.is_set():
+                    return
+                batch_loss, batch_correct = model.step(features, labels, TRAINING_LEARNING_RATE)
+                loss += batch_loss
+                correct += batch_correct
+                self.training_progress = int((epoch + (index + 1) / len(batches)) / epochs * 100)
+
+            val_loss, val_correct = 0.0, 0
+            for features, labels in dataset.iterate(validation_batches):
+                if stop.is_set():
+                    return
+                batch_loss, batch_correct = model.score(features, labels)
+                val_loss += batch_loss
+                val_correct += batch_correct
+
+            self.training_metrics = {
+                'epoch': epoch + 1,
+                'loss': round(loss / len(train_indices), 4),
+                'accuracy': round(correct / len(train_indices), 4),
+                'val_loss': round(val_loss / len(validation_indices), 4),
+                'val_accuracy': round(val_correct / len(validation_indices), 4)
+            }
+
+        weights, bias = model.export()
+        os.makedirs(TRAINED_MODELS_DIR, exist_ok=True)
+        path = os.path.join(TRAINED_MODELS_DIR, f"trained_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz")
+        np.savez(path, weights=weights, bias=bias, accuracy=self.training_metrics['val_accuracy'])
+        self.load_model(path)
 
     def stop_training(self):
-        """Stop training simulation"""
-        self.is_training = False
-        self.model_status = 'Ready'
+        """
+        Ask the running training thread to stop
+
+        The run ends, and is_training turns False, once the thread has
+        left its current batch; a new run cannot start before that.
+        """
+        if self._training_stop is not None:
+            self._training_stop.set()
 
     def start_inference(self):
         """Start inference mode"""
@@ -94,6 +369,10 @@ class ModelManager:
             'is_inferencing': self.is_inferencing,
             'training_progress': self.training_progress,
             'training_metrics': self.training_metrics,
+            'training_error': self.training_error,
+            'finished_training_run': self.finished_training_run,
+            'is_loading': self.is_loading,
+            'versions': [model.version for model in self.versions],
             'model': self.current_model
         }
 
@@ -104,6 +383,7 @@ class ModelControlPanel(ttk.Frame):
     def __init__(self, parent, model_manager):
         super().__init__(parent)
         self.model_manager = model_manager
+        self._shown_training_run = model_manager.finished_training_run
         self._setup_ui()
 
     def _setup_ui(self):
@@ -141,6 +421,12 @@ class ModelControlPanel(ttk.Frame):
             command=self._create_model
         ).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(
+            selection_frame,
+            text="Rollback",
+            command=self._rollback_model
+        ).pack(side=tk.LEFT, padx=5)
+
         # Training Section
         training_frame = ttk.LabelFrame(self, text="Training", padding=10)
         training_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -191,6 +477,15 @@ class ModelControlPanel(ttk.Frame):
         self.metrics_text = tk.Text(training_frame, height=5, width=40, font=('Courier', 9))
         self.metrics_text.pack(fill=tk.X, pady=5)
 
+        # Sessions carry no annotations: the labels come from training_data.reference_labels()
+        ttk.Label(
+            training_frame,
+            text="Demo: labels are heuristic thresholds on the same features, "
+                 "so accuracy only measures agreement with them",
+            foreground='gray',
+            wraplength=280
+        ).pack(fill=tk.X)
+
         # Inference Section
         inference_frame = ttk.LabelFrame(self, text="Inference", padding=10)
         inference_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -231,34 +526,49 @@ class ModelControlPanel(ttk.Frame):
         filepath = filedialog.askopenfilename(
             title="Select Model File",
             filetypes=[
-                ("Model files", "*.h5 *.pt *.pth *.pkl"),
+                ("Model files", "*.npy *.npz *.h5 *.pt *.pth *.pkl"),
                 ("All files", "*.*")
             ]
         )
         if filepath:
-            # Simulate loading in background
-            def load():
-                model = self.model_manager.load_model(filepath)
-                self._update_model_info(model)
-                messagebox.showinfo("Success", f"Model loaded: {model['name']}")
-
-            thread = threading.Thread(target=load, daemon=True)
-            thread.start()
+            self._watch_load(self.model_manager.load_model_async(filepath), "Model loaded")
 
     def _create_model(self):
-        """Create a new mock model"""
-        model = self.model_manager.load_model("new_model.h5")
+        """Create a new demo model"""
+        self._watch_load(self.model_manager.load_model_async("new_model.h5"), "New model created")
+
+    def _watch_load(self, future, message):
+        """Poll a background load from the Tk event loop and report the outcome"""
+        if not future.done():
+            self.after(MODEL_LOAD_POLL_INTERVAL, self._watch_load, future, message)
+            return
+
+        try:
+            model = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load model: {str(e)}")
+            return
+
+        self._update_model_info(model)
+        messagebox.showinfo("Success", f"{message}: {model['name']} (v{model['version']})")
+
+    def _rollback_model(self):
+        """Reactivate the previous model version"""
+        model = self.model_manager.rollback()
+        if model is None:
+            messagebox.showwarning("Warning", "No earlier model version to roll back to")
+            return
         self._update_model_info(model)
-        messagebox.showinfo("Success", "New model created successfully")
 
     def _update_model_info(self, model):
         """Update model information display"""
         if model:
-            info = f"""Name: {model['name']}
+            accuracy = f"{model['accuracy']:.1%}" if model['accuracy'] is not None else 'n/a'
+            info = f"""Name: {model['name']} (v{model['version']})
 Type: {model['type']}
-Loaded: {model['loaded_at']}
+Loaded: {model['loaded_at']} ({model['source']})
 Parameters: {model['parameters']:,}
-Accuracy: {model['accuracy']:.1%}"""
+Accuracy: {accuracy}"""
             self.model_info_text.config(state=tk.NORMAL)
             self.model_info_text.delete('1.0', tk.END)
             self.model_info_text.insert('1.0', info)
@@ -271,7 +581,9 @@ Accuracy: {model['accuracy']:.1%}"""
             return
 
         epochs = self.epochs_var.get()
-        self.model_manager.start_training(epochs)
+        if not self.model_manager.start_training(epochs):
+            messagebox.showwarning("Warning", "The previous training run is still stopping")
+            return
         self.train_btn.config(state=tk.DISABLED)
         self.stop_train_btn.config(state=tk.NORMAL)
         messagebox.showinfo("Training Started", f"Training for {epochs} epochs")
@@ -279,7 +591,7 @@ Accuracy: {model['accuracy']:.1%}"""
     def _stop_training(self):
         """Stop training"""
         self.model_manager.stop_training()
-        self.train_btn.config(state=tk.NORMAL)
+        # Start Training comes back once the run has exited (_update_status)
         self.stop_train_btn.config(state=tk.DISABLED)
 
     def _start_inference(self):
@@ -303,14 +615,19 @@ Accuracy: {model['accuracy']:.1%}"""
         status = self.model_manager.get_status()
 
         # Update status label
-        self.status_label.config(text=status['status'])
+        label = status['status']
+        if status['is_loading'] and label in ('Idle', 'Ready'):
+            label = 'Loading'
+        self.status_label.config(text=label)
 
         # Update color based on status
-        if status['status'] == 'Training':
+        if label == 'Training':
             self.status_label.config(foreground='orange')
-        elif status['status'] == 'Inference':
+        elif label == 'Inference':
             self.status_label.config(foreground='green')
-        elif status['status'] == 'Ready':
+        elif label == 'Loading':
+            self.status_label.config(foreground='purple')
+        elif label == 'Ready':
             self.status_label.config(foreground='blue')
         else:
             self.status_label.config(foreground='gray')
@@ -324,9 +641,21 @@ Accuracy: {model['accuracy']:.1%}"""
                 metrics = status['training_metrics']
                 metrics_text = f"""Epoch: {metrics['epoch']}
 Loss: {metrics['loss']:.4f}  |  Accuracy: {metrics['accuracy']:.4f}
-Val Loss: {metrics['val_loss']:.4f}  |  Val Acc: {metrics['val_accuracy']:.4f}"""
+Val Loss: {metrics['val_loss']:.4f}  |  Val Acc: {metrics['val_accuracy']:.4f}
+(accuracy vs. heuristic reference labels)"""
                 self.metrics_text.delete('1.0', tk.END)
                 self.metrics_text.insert('1.0', metrics_text)
 
+        elif status['finished_training_run'] != self._shown_training_run:
+            # A run exited (finished, failed or stopped): show the outcome once
+            self._shown_training_run = status['finished_training_run']
+            self.train_btn.config(state=tk.NORMAL)
+            self.stop_train_btn.config(state=tk.DISABLED)
+            if status['training_error']:
+                self.metrics_text.delete('1.0', tk.END)
+                self.metrics_text.insert('1.0', f"Training failed: {status['training_error']}")
+            else:
+                self._update_model_info(status['model'])
+
         # Schedule next update
         self.after(100, self._update_status)
@@ -0,0 +1,9 @@
+"""
+Shared setup for the desktop application tests
+"""
+
+import os
+import sys
+
+# Tests import the application modules the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,118 @@
+"""
+ModelManager: background loading, validation, hot-swap and rollback
+"""
+
+import numpy as np
+import pytest
+
+from config import MODEL_CLASSES, MODEL_FEATURES, MODEL_HISTORY_SIZE, MODEL_WINDOW_SIZE, SIGNAL_TYPES
+from model_manager import ModelManager
+
+
+@pytest.fixture
+def manager():
+    manager = ModelManager()
+    yield manager
+    manager.shutdown()
+
+
+def save_npz(path, seed, accuracy=0.9):
+    """Weights that fit MODEL_FEATURES -> MODEL_CLASSES"""
+    rng = np.random.default_rng(seed)
+    weights = rng.normal(0, 0.1, (len(MODEL_FEATURES), len(MODEL_CLASSES)))
+    bias = rng.normal(0, 0.1, len(MODEL_CLASSES))
+    np.savez(path, weights=weights, bias=bias, accuracy=accuracy)
+    return weights, bias
+
+
+def test_load_activates_a_new_version(manager, tmp_path):
+    weights, bias = save_npz(tmp_path / "a.npz", seed=1, accuracy=0.75)
+
+    info = manager.load_model_async(str(tmp_path / "a.npz")).result(timeout=10)
+
+    assert info['version'] == 1
+    assert info['source'] == 'file'
+    assert info['accuracy'] == 0.75
+    assert manager.current_model is info
+    assert not manager.is_loading
+    features = np.ones((3, len(MODEL_FEATURES)))
+    logits = features @ weights + bias
+    expected = np.exp(logits - logits.max(axis=1, keepdims=True))
+    np.testing.assert_allclose(manager.predict_proba(features), expected / expected.sum(axis=1, keepdims=True))
+
+
+def test_npy_weights_are_memory_mapped(manager, tmp_path):
+    layer = np.random.default_rng(2).normal(size=(len(MODEL_FEATURES) + 1, len(MODEL_CLASSES)))
+    np.save(tmp_path / "layer.npy", layer)
+
+    info = manager.load_model(str(tmp_path / "layer.npy"))
+
+    assert info['source'] == 'memory-mapped'
+    assert isinstance(manager.active_version.weights, np.memmap)
+    np.testing.assert_array_equal(manager.active_version.bias, layer[-1])
+
+
+def test_invalid_weights_keep_the_active_version(manager, tmp_path):
+    save_npz(tmp_path / "good.npz", seed=3)
+    manager.load_model(str(tmp_path / "good.npz"))
+    active = manager.active_version
+
+    np.savez(tmp_path / "shape.npz", weights=np.zeros((3, 3)), bias=np.zeros(3))
+    with pytest.raises(ValueError, match="shape"):
+        manager.load_model(str(tmp_path / "shape.npz"))
+
+    weights = np.zeros((len(MODEL_FEATURES), len(MODEL_CLASSES)))
+    weights[0, 0] = np.nan
+    np.savez(tmp_path / "nan.npz", weights=weights, bias=np.zeros(len(MODEL_CLASSES)))
+    with pytest.raises(ValueError, match="NaN"):
+        manager.load_model(str(tmp_path / "nan.npz"))
+
+    assert manager.active_version is active
+    assert [model.version for model in manager.versions] == [active.version]
+
+
+def test_rollback_restores_the_previous_version(manager, tmp_path):
+    for name, seed in (("a", 4), ("b", 5), ("c", 6)):
+        save_npz(tmp_path / f"{name}.npz", seed)
+        manager.load_model(str(tmp_path / f"{name}.npz"))
+    first, second, third = manager.versions
+    features = np.random.default_rng(7).normal(size=(4, len(MODEL_FEATURES)))
+
+    assert manager.rollback() is second.info
+    assert manager.active_version is second
+    np.testing.assert_array_equal(manager.predict_proba(features), second.predict_proba(features))
+
+    # Rolled-back versions are dropped, so a second rollback walks further back
+    assert manager.rollback() is first.info
+    assert manager.rollback() is None
+    assert manager.active_version is first
+    assert manager.get_status()['versions'] == [first.version]
+
+
+def test_history_keeps_the_latest_versions(manager, tmp_path):
+    save_npz(tmp_path / "model.npz", seed=8)
+    for _ in range(MODEL_HISTORY_SIZE + 2):
+        manager.load_model(str(tmp_path / "model.npz"))
+
+    versions = [model.version for model in manager.versions]
+    assert versions == list(range(3, MODEL_HISTORY_SIZE + 3))
+    assert manager.active_version.version == versions[-1]
+
+
+def test_predict_reports_the_active_version(manager, tmp_path):
+    with pytest.raises(RuntimeError):
+        manager.predict(np.zeros((MODEL_WINDOW_SIZE, len(SIGNAL_TYPES))))
+
+    save_npz(tmp_path / "a.npz", seed=9)
+    save_npz(tmp_path / "b.npz", seed=10)
+    manager.load_model(str(tmp_path / "a.npz"))
+    manager.load_model(str(tmp_path / "b.npz"))
+    samples = np.tile([72.0, 98.0, 36.8, 20.0], (MODEL_WINDOW_SIZE, 1))
+
+    prediction = manager.predict(samples)
+    assert prediction['model_version'] == 2
+    assert prediction['condition'] in MODEL_CLASSES
+    assert sum(prediction['probabilities'].values()) == pytest.approx(1.0, abs=0.01)
+
+    manager.rollback()
+    assert manager.predict(samples)['model_version'] == 1
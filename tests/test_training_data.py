@@ -0,0 +1,137 @@
+"""
+Training data pipeline: feature windows, chunked dataset, batches and the softmax model
+"""
+
+import numpy as np
+import pytest
+
+import training_data
+from config import MODEL_CLASSES, MODEL_FEATURES, MODEL_WINDOW_SIZE, MODEL_WINDOW_STRIDE, SIGNAL_TYPES
+from training_data import (
+    FeatureDataset, SessionRecorder, SoftmaxRegression, batches_of, build_dataset,
+    reference_labels, window_features
+)
+
+
+def session(n, seed):
+    """Random walk samples in SIGNAL_TYPES order"""
+    rng = np.random.default_rng(seed)
+    start = np.array([72.0, 97.0, 36.8, 30.0])
+    return (start + np.cumsum(rng.normal(0, 0.5, (n, len(SIGNAL_TYPES))), axis=0)).astype(np.float32)
+
+
+def test_window_features_match_direct_statistics():
+    samples = session(200, seed=1)
+
+    features = window_features(samples)
+
+    starts = range(0, len(samples) - MODEL_WINDOW_SIZE + 1, MODEL_WINDOW_STRIDE)
+    assert features.shape == (len(starts), len(MODEL_FEATURES))
+    t = np.arange(MODEL_WINDOW_SIZE)
+    for row, start in zip(features, starts):
+        window = samples[start:start + MODEL_WINDOW_SIZE]
+        for i, signal in enumerate(SIGNAL_TYPES):
+            expected = {
+                'mean': window[:, i].mean(),
+                'std': window[:, i].std(),
+                'slope': np.polyfit(t, window[:, i], 1)[0]
+            }
+            for stat, value in expected.items():
+                assert row[MODEL_FEATURES.index(f"{signal}_{stat}")] == pytest.approx(value, rel=1e-4, abs=1e-4)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """Three sessions split over chunks of 25 windows, plus their features in order"""
+    monkeypatch.setattr(training_data, 'TRAINING_CHUNK_ROWS', 25)
+    paths = []
+    for seed, n in ((2, 300), (3, 180), (4, 30)):
+        path = tmp_path / f"session_{seed}.npy"
+        np.save(path, session(n, seed))
+        paths.append(str(path))
+    # Too short for one window, skipped
+    np.save(tmp_path / "session_short.npy", session(MODEL_WINDOW_SIZE - 1, seed=5))
+    paths.append(str(tmp_path / "session_short.npy"))
+
+    manifest = build_dataset(paths, str(tmp_path / "features"))
+    features = np.concatenate([window_features(np.load(path)) for path in paths[:2]])
+    return FeatureDataset(str(tmp_path / "features")), manifest, features
+
+
+def test_build_dataset_chunks_and_standardization(dataset):
+    data, manifest, features = dataset
+
+    assert len(data) == manifest['rows'] == len(features)
+    assert [chunk['rows'] for chunk in manifest['chunks']] == [25] * (len(features) // 25) + [len(features) % 25]
+    np.testing.assert_allclose(data.mean, features.mean(axis=0), rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(data.std, features.std(axis=0), rtol=1e-3)
+
+
+def test_batch_gathers_across_chunks_in_sorted_order(dataset):
+    data, _, features = dataset
+    indices = np.array([70, 3, 24, 25, 49, 0, len(features) - 1])
+
+    batch, labels = data.batch(indices)
+
+    order = np.sort(indices)
+    np.testing.assert_array_equal(batch, features[order])
+    np.testing.assert_array_equal(labels, reference_labels(features)[order])
+
+
+def test_iterate_and_split_cover_every_window_once(dataset):
+    data, _, features = dataset
+    train, validation = data.split(0.2, np.random.default_rng(6))
+
+    assert len(validation) == int(len(data) * 0.2)
+    np.testing.assert_array_equal(np.sort(np.concatenate([train, validation])), np.arange(len(data)))
+
+    batches = batches_of(train, 16)
+    assert max(map(len, batches)) <= 16
+    gathered = list(data.iterate(batches))
+    assert len(gathered) == len(batches)
+    for indices, (batch, _) in zip(batches, gathered):
+        np.testing.assert_array_equal(batch, features[np.sort(indices)])
+
+
+def test_softmax_regression_learns_and_exports_raw_feature_weights():
+    rng = np.random.default_rng(7)
+    labels = rng.integers(0, 3, 600).astype(np.int8)
+    features = rng.normal(50, 5, (600, len(MODEL_FEATURES)))
+    features[:, 0] += labels * 20.0  # Separable on the first feature
+    model = SoftmaxRegression(features.mean(axis=0), features.std(axis=0))
+
+    first_loss, _ = model.score(features, labels)
+    for _ in range(200):
+        model.step(features, labels, 0.5)
+    loss, correct = model.score(features, labels)
+    assert loss < first_loss / 5
+    assert correct / len(labels) > 0.95
+
+    # Exported weights take raw features and give the same probabilities
+    weights, bias = model.export()
+    logits = features @ weights + bias
+    probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probabilities /= probabilities.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(probabilities, model._forward(features)[1], atol=1e-9)
+
+    # Continuing from exported weights starts where the model left off
+    resumed = SoftmaxRegression(model.mean, model.std, weights, bias)
+    np.testing.assert_allclose(resumed.score(features, labels)[0], loss)
+    assert weights.shape == (len(MODEL_FEATURES), len(MODEL_CLASSES))
+
+
+def test_session_recorder_grows_and_returns_recent_samples(tmp_path):
+    recorder = SessionRecorder(capacity=4)
+    assert recorder.recent(1) is None
+    assert recorder.save(str(tmp_path)) is None
+
+    for i in range(MODEL_WINDOW_SIZE + 3):
+        recorder.append({signal: float(i + j) for j, signal in enumerate(SIGNAL_TYPES)})
+
+    assert len(recorder) == MODEL_WINDOW_SIZE + 3
+    recent = recorder.recent(3)
+    np.testing.assert_array_equal(recent[:, 0], [MODEL_WINDOW_SIZE, MODEL_WINDOW_SIZE + 1, MODEL_WINDOW_SIZE + 2])
+    assert recorder.recent(MODEL_WINDOW_SIZE + 4) is None
+
+    saved = np.load(recorder.save(str(tmp_path)))
+    assert saved.shape == (MODEL_WINDOW_SIZE + 3, len(SIGNAL_TYPES))
@@ -0,0 +1,341 @@
+"""
+Training data pipeline for recorded monitoring sessions
+Sessions are turned into feature windows once, stored as memory-mapped
+chunks and gathered into training batches by shuffled index
+"""
+import glob
+import json
+import os
+from datetime import datetime
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config import (
+    SIGNAL_TYPES, MODEL_CLASSES, MODEL_FEATURES, MODEL_WINDOW_SIZE, MODEL_WINDOW_STRIDE,
+    MODEL_WINDOW_STATS, SESSIONS_DIR, TRAINING_DATA_DIR, TRAINING_CHUNK_ROWS,
+    TRAINING_DEMO_SESSIONS, TRAINING_DEMO_SESSION_SAMPLES
+)
+from mock_data import MockDataGenerator
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class SessionRecorder:
+    """Collects monitoring samples and saves them as a session file"""
+
+    def __init__(self, capacity=4096):
+        self.samples = np.empty((capacity, len(SIGNAL_TYPES)), dtype=np.float32)
+        self.count = 0
+
+    def append(self, signal_data):
+        """Add one generate_all_signals() sample"""
+        if self.count == len(self.samples):
+            self.samples = np.concatenate([self.samples, np.empty_like(self.samples)])
+        self.samples[self.count] = [signal_data[signal] for signal in SIGNAL_TYPES]
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def recent(self, n):
+        """The last n samples, or None if fewer have been recorded"""
+        if self.count < n:
+            return None
+        return self.samples[self.count - n:self.count]
+
+    def save(self, directory=SESSIONS_DIR):
+        """
+        Write the session as an .npy file
+
+        Returns:
+            Path of the session file, or None if the session is shorter
+            than one feature window
+        """
+        if self.count < MODEL_WINDOW_SIZE:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npy")
+        np.save(path, self.samples[:self.count])
+        return path
+
+
+def session_files(directory=SESSIONS_DIR):
+    """Recorded session files, oldest first"""
+    return sorted(glob.glob(os.path.join(directory, 'session_*.npy')))
+
+
+def record_demo_sessions(directory=SESSIONS_DIR):
+    """Write synthetic sessions for a first training run without recordings"""
+    os.makedirs(directory, exist_ok=True)
+    generator = MockDataGenerator()
+    rng = np.random.default_rng()
+    for index in range(TRAINING_DEMO_SESSIONS):
+        samples = generator.generate_session(TRAINING_DEMO_SESSION_SAMPLES, rng)
+        np.save(os.path.join(directory, f"session_demo_{index:03d}.npy"), samples.astype(np.float32))
+
+
+def window_features(samples):
+    """
+    Statistics of every feature window of a session
+
+    Args:
+        samples: [samples, signals] session array (may be memory-mapped)
+
+    Returns:
+        [windows, len(MODEL_FEATURES)] float32 features
+    """
+    windows = sliding_window_view(samples, MODEL_WINDOW_SIZE, axis=0)[::MODEL_WINDOW_STRIDE]
+    t = np.arange(MODEL_WINDOW_SIZE) - (MODEL_WINDOW_SIZE - 1) / 2
+    stats = {
+        'mean': lambda: windows.mean(axis=2),
+        'std': lambda: windows.std(axis=2),
+        'slope': lambda: windows @ (t / (t @ t))
+    }
+    features = np.stack([stats[stat]() for stat in MODEL_WINDOW_STATS], axis=2)
+    return features.reshape(len(windows), -1).astype(np.float32)
+
+
+def _feature(features, signal, stat):
+    return features[:, MODEL_FEATURES.index(f"{signal}_{stat}")]
+
+
+def reference_labels(features):
+    """
+    Reference condition of every window (index into MODEL_CLASSES)
+
+    Sessions carry no ground truth, so windows are labelled with fixed
+    thresholds on their heart rate and activity; the first match wins.
+    """
+    heart_rate = _feature(features, 'heart_rate', 'mean')
+    heart_rate_std = _feature(features, 'heart_rate', 'std')
+    activity = _feature(features, 'activity', 'mean')
+
+    rules = {
+        'Irregular Pattern': heart_rate_std > 4.3,
+        'Stress Detected': (heart_rate > 82) & (activity < 30),
+        'Intense Exercise': activity > 60,
+        'Light Exercise': activity > 40,
+        'Sleeping': (heart_rate < 68) & (activity < 5),
+        'Resting': activity < 15
+    }
+    return np.select(
+        list(rules.values()),
+        [MODEL_CLASSES.index(name) for name in rules],
+        MODEL_CLASSES.index('Normal Activity')
+    ).astype(np.int8)
+
+
+def build_dataset(sessions, directory=TRAINING_DATA_DIR):
+    """
+    Precompute feature windows of all sessions into chunk files
+
+    Chunks hold TRAINING_CHUNK_ROWS windows each ('features_NNNNN.npy'
+    and 'labels_NNNNN.npy'); the manifest records the sessions they were
+    built from and per-feature mean and std for standardization.
+
+    Returns:
+        The manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.npy')):
+        os.remove(path)
+
+    chunks = []
+    buffered_features, buffered_labels, buffered = [], [], 0
+    total = np.zeros(len(MODEL_FEATURES))
+    total_squares = np.zeros(len(MODEL_FEATURES))
+
+    def write_chunk(features, labels):
+        name = f"{len(chunks):05d}.npy"
+        np.save(os.path.join(directory, f"features_{name}"), features)
+        np.save(os.path.join(directory, f"labels_{name}"), labels)
+        chunks.append({'name': name, 'rows': len(features)})
+
+    for path in sessions:
+        samples = np.load(path, mmap_mode='r')
+        if samples.ndim != 2 or samples.shape[1] != len(SIGNAL_TYPES) or len(samples) < MODEL_WINDOW_SIZE:
+            continue
+
+        features = window_features(samples)
+        total += features.sum(axis=0)
+        total_squares += np.square(features, dtype=np.float64).sum(axis=0)
+        buffered_features.append(features)
+        buffered_labels.append(reference_labels(features))
+        buffered += len(features)
+
+        if buffered >= TRAINING_CHUNK_ROWS:
+            features, labels = np.concatenate(buffered_features), np.concatenate(buffered_labels)
+            full = buffered - buffered % TRAINING_CHUNK_ROWS
+            for start in range(0, full, TRAINING_CHUNK_ROWS):
+                write_chunk(features[start:start + TRAINING_CHUNK_ROWS], labels[start:start + TRAINING_CHUNK_ROWS])
+            buffered_features, buffered_labels = [features[full:]], [labels[full:]]
+            buffered -= full
+
+    if buffered:
+        write_chunk(np.concatenate(buffered_features), np.concatenate(buffered_labels))
+
+    rows = sum(chunk['rows'] for chunk in chunks)
+    mean = total / max(rows, 1)
+    std = np.sqrt(np.maximum(total_squares / max(rows, 1) - mean ** 2, 0))
+    manifest = {
+        'sessions': {path: os.path.getmtime(path) for path in sessions},
+        'features': MODEL_FEATURES,
+        'window': [MODEL_WINDOW_SIZE, MODEL_WINDOW_STRIDE],
+        'chunks': chunks,
+        'rows': rows,
+        'mean': mean.tolist(),
+        'std': np.where(std > 0, std, 1.0).tolist()
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def prepare_dataset(sessions_dir=SESSIONS_DIR, directory=TRAINING_DATA_DIR):
+    """
+    Feature dataset of the recorded sessions, built only when sessions
+    or feature settings changed since the last build
+    """
+    sessions = session_files(sessions_dir)
+    if not sessions:
+        record_demo_sessions(sessions_dir)
+        sessions = session_files(sessions_dir)
+
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    current = {path: os.path.getmtime(path) for path in sessions}
+    if (manifest is None or manifest['sessions'] != current or manifest['features'] != MODEL_FEATURES
+            or manifest['window'] != [MODEL_WINDOW_SIZE, MODEL_WINDOW_STRIDE]):
+        build_dataset(sessions, directory)
+
+    return FeatureDataset(directory)
+
+
+class FeatureDataset:
+    """Read-only view of precomputed feature chunks, memory-mapped"""
+
+    def __init__(self, directory=TRAINING_DATA_DIR):
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        self.directory = directory
+        self.mean = np.array(manifest['mean'])
+        self.std = np.array(manifest['std'])
+        self.features = [
+            np.load(os.path.join(directory, f"features_{chunk['name']}"), mmap_mode='r')
+            for chunk in manifest['chunks']
+        ]
+        self.labels = [
+            np.load(os.path.join(directory, f"labels_{chunk['name']}"), mmap_mode='r')
+            for chunk in manifest['chunks']
+        ]
+        self.offsets = np.cumsum([0] + [chunk['rows'] for chunk in manifest['chunks']])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def batch(self, indices):
+        """
+        Gather windows by global index
+
+        Returns:
+            (features [N, len(MODEL_FEATURES)], labels [N]) in sorted
+            index order
+        """
+        indices = np.sort(indices)
+        bounds = np.searchsorted(indices, self.offsets)
+        features = np.empty((len(indices), len(MODEL_FEATURES)), dtype=np.float32)
+        labels = np.empty(len(indices), dtype=np.int8)
+
+        for chunk, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if start < end:
+                rows = indices[start:end] - self.offsets[chunk]
+                features[start:end] = self.features[chunk][rows]
+                labels[start:end] = self.labels[chunk][rows]
+        return features, labels
+
+    def iterate(self, batches):
+        """
+        Yield (features, labels) for each index array, in order
+
+        Batches are gathered in-process: a gather is a fancy index into
+        the mapped chunks, far cheaper than shipping the batch from a
+        worker process.
+        """
+        for indices in batches:
+            yield self.batch(indices)
+
+    def split(self, fraction, rng):
+        """Shuffled (train, validation) index arrays"""
+        if len(self) < 2:
+            raise ValueError("Not enough recorded data to train on")
+        order = rng.permutation(len(self))
+        validation = max(1, int(len(self) * fraction))
+        return order[validation:], order[:validation]
+
+
+def batches_of(indices, batch_size):
+    """Split an index array into consecutive batches"""
+    return np.array_split(indices, max(1, -(-len(indices) // batch_size)))
+
+
+class SoftmaxRegression:
+    """
+    Multinomial logistic regression trained with mini-batch gradient descent
+
+    Trains on standardized features; export() folds the standardization
+    into weights that take raw features, as ModelVersion expects.
+    """
+
+    def __init__(self, mean, std, weights=None, bias=None):
+        self.mean = mean
+        self.std = std
+        if weights is not None:
+            # Continue from raw-feature weights
+            self.weights = np.asarray(weights, dtype=np.float64) * std[:, None]
+            self.bias = np.asarray(bias, dtype=np.float64) + mean @ weights
+        else:
+            self.weights = np.zeros((len(mean), len(MODEL_CLASSES)))
+            self.bias = np.zeros(len(MODEL_CLASSES))
+
+    def _forward(self, features):
+        standardized = (features - self.mean) / self.std
+        logits = standardized @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return standardized, logits
+
+    def _loss(self, probabilities, labels):
+        rows = np.arange(len(labels))
+        loss = -np.log(np.maximum(probabilities[rows, labels], 1e-12)).sum()
+        correct = int((probabilities.argmax(axis=1) == labels).sum())
+        return loss, correct
+
+    def step(self, features, labels, learning_rate):
+        """
+        One gradient descent step on a batch
+
+        Returns:
+            (summed loss, correct predictions) of the batch before the step
+        """
+        standardized, probabilities = self._forward(features)
+        loss, correct = self._loss(probabilities, labels)
+
+        probabilities[np.arange(len(labels)), labels] -= 1
+        probabilities /= len(labels)
+        self.weights -= learning_rate * (standardized.T @ probabilities)
+        self.bias -= learning_rate * probabilities.sum(axis=0)
+        return loss, correct
+
+    def score(self, features, labels):
+        """(summed loss, correct predictions) of a batch"""
+        return self._loss(self._forward(features)[1], labels)
+
+    def export(self):
+        """(weights, bias) on raw features"""
+        weights = self.weights / self.std[:, None]
+        return weights, self.bias - self.mean @ weights